@@ -7,6 +7,9 @@ Implements Right to Withdraw Consent
 
 import json
 import os
+import sqlite3
+import threading
+from contextlib import contextmanager
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -45,16 +48,180 @@ class UserData:
         return asdict(self)
 
 
+REQUEST_FIELDS = ("request_id", "user_id", "request_type", "status", "timestamp",
+                  "completion_timestamp", "reason", "notes")
+ERASURE_FIELDS = ("request_id", "user_id", "erasure_timestamp", "reason", "status")
+
+
+class DataSubjectRequestStore:
+    """
+    SQLite-backed store of data subject requests and erasure records.
+
+    Requests are keyed by request_id and indexed by user_id, status and
+    type, so status lookups and per-user listings no longer scan the whole
+    history, and updating a request writes one row instead of the full log.
+    `transaction()` groups many writes into a single commit for batch runs.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._depth = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_database()
+
+    def _init_database(self):
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS dsr_requests (
+                request_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                request_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                completion_timestamp TEXT,
+                reason TEXT DEFAULT '',
+                notes TEXT DEFAULT ''
+            )
+        ''')
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dsr_requests_user ON dsr_requests (user_id, timestamp)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dsr_requests_status ON dsr_requests (status, request_type)")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS dsr_erasures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                request_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                erasure_timestamp TEXT NOT NULL,
+                reason TEXT DEFAULT '',
+                status TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dsr_erasures_user ON dsr_erasures (user_id)")
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one commit; nested uses join the outer transaction."""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self
+            except Exception:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("COMMIT")
+
+    def add_requests(self, requests: List[Dict[str, Any]]):
+        rows = [tuple(req.get(f) for f in REQUEST_FIELDS) for req in requests]
+        with self.transaction():
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO dsr_requests ({', '.join(REQUEST_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(REQUEST_FIELDS))})", rows)
+
+    def update_requests(self, updates: List[Tuple[str, Dict[str, Any]]]):
+        """Apply (request_id, fields) updates."""
+        with self.transaction():
+            for request_id, fields in updates:
+                columns = [f for f in fields if f in REQUEST_FIELDS and f != "request_id"]
+                if not columns:
+                    continue
+                self._conn.execute(
+                    f"UPDATE dsr_requests SET {', '.join(f'{c} = ?' for c in columns)} WHERE request_id = ?",
+                    [fields[c] for c in columns] + [request_id])
+
+    def update_request(self, request_id: str, **fields):
+        self.update_requests([(request_id, fields)])
+
+    def add_erasures(self, erasures: List[Dict[str, Any]]):
+        rows = [tuple(record.get(f) for f in ERASURE_FIELDS) for record in erasures]
+        with self.transaction():
+            self._conn.executemany(
+                f"INSERT INTO dsr_erasures ({', '.join(ERASURE_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(ERASURE_FIELDS))})", rows)
+
+    def get_request(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM dsr_requests WHERE request_id = ?", (request_id,)).fetchone()
+        return dict(row) if row else None
+
+    def has_request(self, request_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM dsr_requests WHERE request_id = ?", (request_id,)).fetchone() is not None
+
+    def user_requests(self, user_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM dsr_requests WHERE user_id = ? ORDER BY timestamp", (user_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def all_requests(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM dsr_requests ORDER BY timestamp").fetchall()
+        return [dict(row) for row in rows]
+
+    def all_erasures(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(ERASURE_FIELDS)} FROM dsr_erasures ORDER BY id").fetchall()
+        return [dict(row) for row in rows]
+
+    def count_requests(self, column: str = None) -> Any:
+        """Total request count, or counts grouped by `column` (status / request_type)."""
+        with self._lock:
+            if column is None:
+                return self._conn.execute("SELECT COUNT(*) FROM dsr_requests").fetchone()[0]
+            if column not in ("status", "request_type"):
+                raise ValueError(f"Cannot group requests by {column}")
+            rows = self._conn.execute(
+                f"SELECT {column}, COUNT(*) FROM dsr_requests GROUP BY {column}").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def count_erasures(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM dsr_erasures").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 class GDPRRightsManager:
     """Manages GDPR data subject rights"""
 
-    def __init__(self, data_dir: str = "data/gdpr", request_log_path: str = None):
+    REQUEST_PREFIXES = {
+        "access": "ACCESS",
+        "erasure": "ERASE",
+        "withdraw_consent": "CONSENT",
+    }
+
+    def __init__(self, data_dir: str = "data/gdpr", request_log_path: str = None,
+                 request_db_path: str = None):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
+        # Requests and erasures live in an indexed SQLite store; the JSON
+        # logs of earlier versions are imported once
         self.request_log_path = Path(
             request_log_path or f"{data_dir}/requests.json")
-        self.requests = self._load_requests()
+        self.store = DataSubjectRequestStore(
+            str(request_db_path or self.data_dir / "requests.db"))
 
         # User data directory
         self.user_data_dir = self.data_dir / "user_data"
@@ -62,45 +229,42 @@ class GDPRRightsManager:
 
         # Erasure log (audit trail)
         self.erasure_log_path = self.data_dir / "erasures.json"
-        self.erasures = self._load_erasures()
-
-    def _load_requests(self) -> List[Dict[str, Any]]:
-        """Load request log"""
-        if self.request_log_path.exists():
-            try:
-                with open(self.request_log_path, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading requests: {e}")
-                return []
-        return []
-
-    def _save_requests(self):
-        """Save request log"""
-        try:
-            with open(self.request_log_path, "w") as f:
-                json.dump(self.requests, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving requests: {e}")
-
-    def _load_erasures(self) -> List[Dict[str, Any]]:
-        """Load erasure audit log"""
-        if self.erasure_log_path.exists():
+        self._migrate_legacy_logs()
+
+    def _migrate_legacy_logs(self):
+        """Import requests.json / erasures.json into the store and retire them"""
+        for path, add in ((self.request_log_path, self.store.add_requests),
+                          (self.erasure_log_path, self.store.add_erasures)):
+            if not path.exists():
+                continue
             try:
-                with open(self.erasure_log_path, "r") as f:
-                    return json.load(f)
+                with open(path, "r") as f:
+                    records = json.load(f)
+                add(records)
+                os.replace(path, f"{path}.migrated")
+                logger.info(f"Migrated {len(records)} records from {path}")
             except Exception as e:
-                logger.error(f"Error loading erasures: {e}")
-                return []
-        return []
-
-    def _save_erasures(self):
-        """Save erasure audit log"""
-        try:
-            with open(self.erasure_log_path, "w") as f:
-                json.dump(self.erasures, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving erasures: {e}")
+                logger.error(f"Error migrating {path}: {e}")
+
+    @property
+    def requests(self) -> List[Dict[str, Any]]:
+        """All requests (full read; prefer the indexed lookups)"""
+        return self.store.all_requests()
+
+    @property
+    def erasures(self) -> List[Dict[str, Any]]:
+        """All erasure audit records (full read)"""
+        return self.store.all_erasures()
+
+    def _new_request_id(self, request_type: str, user_id: str, taken: set) -> str:
+        """Timestamped request ID, suffixed when the same second is already used"""
+        base = f"{self.REQUEST_PREFIXES[request_type]}_{user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        request_id, n = base, 1
+        while request_id in taken or self.store.has_request(request_id):
+            n += 1
+            request_id = f"{base}_{n}"
+        taken.add(request_id)
+        return request_id
 
     def get_user_data_file(self, user_id: str) -> Path:
         """Get path to user data file"""
@@ -163,6 +327,153 @@ class GDPRRightsManager:
             logger.error(f"Error retrieving user data: {e}")
             return None
 
+    def process_requests_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process many data subject requests (e.g. a bulk DSAR campaign).
+
+        Args:
+            requests: Dicts with user_id, request_type ("access", "erasure",
+                "withdraw_consent") and optional reason / data_category
+
+        Returns:
+            One result per request with request_id, user_id, request_type,
+            success, message and data (user data for access requests)
+
+        Every request is first recorded as "processing" in one commit, so an
+        interrupted run still leaves an audit trail. All outcomes and erasure
+        audit records are then written in a single transaction.
+        """
+        handlers = {
+            "access": self._process_access,
+            "erasure": self._process_erasure,
+            "withdraw_consent": self._process_consent,
+        }
+
+        taken: set = set()
+        now = datetime.now().isoformat()
+        records = []
+        for item in requests:
+            request_type = item.get("request_type")
+            if request_type not in handlers:
+                raise ValueError(f"Unknown request type: {request_type}")
+            reason = item.get("reason", "")
+            if request_type == "withdraw_consent":
+                reason = f"Consent withdrawn for: {item.get('data_category', 'all')}"
+            records.append(DataSubjectRequest(
+                request_id=self._new_request_id(request_type, item["user_id"], taken),
+                user_id=item["user_id"],
+                request_type=request_type,
+                status="processing",
+                timestamp=now,
+                reason=reason
+            ))
+        self.store.add_requests([record.to_dict() for record in records])
+
+        results, updates, erasures = [], [], []
+        for item, record in zip(requests, records):
+            success, message, data, fields = handlers[record.request_type](record, item)
+            updates.append((record.request_id, fields))
+            if record.request_type == "erasure" and success:
+                erasures.append({
+                    "request_id": record.request_id,
+                    "user_id": record.user_id,
+                    "erasure_timestamp": fields["completion_timestamp"],
+                    "reason": record.reason,
+                    "status": "completed"
+                })
+            results.append({
+                "request_id": record.request_id,
+                "user_id": record.user_id,
+                "request_type": record.request_type,
+                "success": success,
+                "message": message,
+                "data": data
+            })
+
+        with self.store.transaction():
+            self.store.update_requests(updates)
+            if erasures:
+                self.store.add_erasures(erasures)
+
+        if len(results) > 1:
+            succeeded = sum(1 for r in results if r["success"])
+            logger.info(f"Processed {len(results)} data subject requests "
+                        f"({succeeded} succeeded, {len(erasures)} erasures)")
+        return results
+
+    def _process_access(self, request: DataSubjectRequest,
+                        item: Dict[str, Any]) -> Tuple[bool, str, Optional[Dict[str, Any]], Dict[str, Any]]:
+        user_data = self.get_user_data(request.user_id)
+        completed = {"status": "completed", "completion_timestamp": datetime.now().isoformat()}
+
+        if user_data is None:
+            return False, "No data found for user", None, {**completed, "notes": "No data found for user"}
+        return True, "Access request completed", user_data.to_dict(), completed
+
+    def _process_erasure(self, request: DataSubjectRequest,
+                         item: Dict[str, Any]) -> Tuple[bool, str, None, Dict[str, Any]]:
+        try:
+            # Delete from primary storage
+            data_file = self.get_user_data_file(request.user_id)
+            if data_file.exists():
+                os.remove(data_file)
+                logger.info(f"User data file deleted: {data_file}")
+        except Exception as e:
+            logger.error(f"Error during erasure: {e}")
+            return False, f"Erasure failed: {str(e)}", None, {
+                "status": "denied", "notes": f"Deletion failed: {str(e)}"}
+
+        return True, f"User data for {request.user_id} has been permanently deleted", None, {
+            "status": "completed",
+            "completion_timestamp": datetime.now().isoformat(),
+            "notes": "All user data successfully deleted"
+        }
+
+    def _process_consent(self, request: DataSubjectRequest,
+                         item: Dict[str, Any]) -> Tuple[bool, str, None, Dict[str, Any]]:
+        data_category = item.get("data_category", "all")
+        try:
+            user_data = self.get_user_data(request.user_id)
+
+            if user_data is None:
+                return False, f"No data found for user {request.user_id}", None, {
+                    "status": "completed",
+                    "completion_timestamp": datetime.now().isoformat(),
+                    "notes": "No data found for user"
+                }
+
+            # Update consent status
+            if data_category == "all":
+                user_data.consent_status = {
+                    k: False for k in user_data.consent_status}
+            else:
+                user_data.consent_status[data_category] = False
+
+            user_data.last_modified = datetime.now().isoformat()
+
+            # Save updated data
+            data_file = self.get_user_data_file(request.user_id)
+            with open(data_file, "w") as f:
+                json.dump(user_data.to_dict(), f, indent=2)
+
+        except Exception as e:
+            logger.error(f"Error withdrawing consent: {e}")
+            return False, f"Error: {str(e)}", None, {
+                "status": "denied", "notes": f"Consent update failed: {str(e)}"}
+
+        return True, f"Consent withdrawn for {data_category}", None, {
+            "status": "completed", "completion_timestamp": datetime.now().isoformat()}
+
+    def batch_right_to_access(self, user_ids: List[str]) -> List[Dict[str, Any]]:
+        """Right to Access for many users in one batch"""
+        return self.process_requests_batch(
+            [{"user_id": user_id, "request_type": "access"} for user_id in user_ids])
+
+    def batch_right_to_erasure(self, user_ids: List[str], reason: str = "") -> List[Dict[str, Any]]:
+        """Right to Erasure for many users in one batch"""
+        return self.process_requests_batch(
+            [{"user_id": user_id, "request_type": "erasure", "reason": reason} for user_id in user_ids])
+
     def right_to_access(self, user_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """
         Implement Right to Access (GDPR Article 15).
@@ -177,36 +488,13 @@ class GDPRRightsManager:
         """
         logger.info(f"Right to Access request: {user_id}")
 
-        request_id = f"ACCESS_{user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-
-        request = DataSubjectRequest(
-            request_id=request_id,
-            user_id=user_id,
-            request_type="access",
-            status="processing",
-            timestamp=datetime.now().isoformat()
-        )
-
-        self.requests.append(request.to_dict())
-        self._save_requests()
-
-        # Retrieve all user data
-        user_data = self.get_user_data(user_id)
-
-        if user_data is None:
-            request["status"] = "completed"
-            request["notes"] = "No data found for user"
-            self._save_requests()
-            return False, None
+        result = self.process_requests_batch(
+            [{"user_id": user_id, "request_type": "access"}])[0]
 
-        # Mark as completed
-        request["status"] = "completed"
-        request["completion_timestamp"] = datetime.now().isoformat()
-        self._save_requests()
+        if result["success"]:
+            logger.info(f"Right to Access completed: {result['request_id']}")
 
-        logger.info(f"Right to Access completed: {request_id}")
-
-        return True, user_data.to_dict()
+        return result["success"], result["data"]
 
     def right_to_erasure(self, user_id: str, reason: str = "") -> Tuple[bool, str]:
         """
@@ -223,63 +511,13 @@ class GDPRRightsManager:
         """
         logger.info(f"Right to Erasure request: {user_id} (reason: {reason})")
 
-        request_id = f"ERASE_{user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-
-        request = DataSubjectRequest(
-            request_id=request_id,
-            user_id=user_id,
-            request_type="erasure",
-            status="processing",
-            timestamp=datetime.now().isoformat(),
-            reason=reason
-        )
-
-        self.requests.append(request.to_dict())
-        self._save_requests()
-
-        try:
-            # Step 1: Delete from primary storage
-            data_file = self.get_user_data_file(user_id)
-            if data_file.exists():
-                os.remove(data_file)
-                logger.info(f"User data file deleted: {data_file}")
-
-            # Step 2: Log the erasure (for audit)
-            erasure_record = {
-                "request_id": request_id,
-                "user_id": user_id,
-                "erasure_timestamp": datetime.now().isoformat(),
-                "reason": reason,
-                "status": "completed"
-            }
-
-            self.erasures.append(erasure_record)
-            self._save_erasures()
-
-            # Step 3: Update request status
-            for req in self.requests:
-                if req["request_id"] == request_id:
-                    req["status"] = "completed"
-                    req["completion_timestamp"] = datetime.now().isoformat()
-                    req["notes"] = "All user data successfully deleted"
-
-            self._save_requests()
-
-            logger.info(f"Right to Erasure completed: {request_id}")
-            return True, f"User data for {user_id} has been permanently deleted"
-
-        except Exception as e:
-            logger.error(f"Error during erasure: {e}")
-
-            # Update request to failed
-            for req in self.requests:
-                if req["request_id"] == request_id:
-                    req["status"] = "denied"
-                    req["notes"] = f"Deletion failed: {str(e)}"
+        result = self.process_requests_batch(
+            [{"user_id": user_id, "request_type": "erasure", "reason": reason}])[0]
 
-            self._save_requests()
+        if result["success"]:
+            logger.info(f"Right to Erasure completed: {result['request_id']}")
 
-            return False, f"Erasure failed: {str(e)}"
+        return result["success"], result["message"]
 
     def right_to_rectification(self, user_id: str, updated_data: Dict[str, Any]) -> Tuple[bool, str]:
         """
@@ -329,53 +567,16 @@ class GDPRRightsManager:
         Returns:
             Tuple of (success, message)
         """
-        request_id = f"CONSENT_{user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-
-        request = DataSubjectRequest(
-            request_id=request_id,
-            user_id=user_id,
-            request_type="withdraw_consent",
-            status="processing",
-            timestamp=datetime.now().isoformat(),
-            reason=f"Consent withdrawn for: {data_category}"
-        )
-
-        self.requests.append(request.to_dict())
-
-        try:
-            user_data = self.get_user_data(user_id)
-
-            if user_data is None:
-                return False, f"No data found for user {user_id}"
-
-            # Update consent status
-            if data_category == "all":
-                user_data.consent_status = {
-                    k: False for k in user_data.consent_status}
-            else:
-                user_data.consent_status[data_category] = False
-
-            user_data.last_modified = datetime.now().isoformat()
-
-            # Save updated data
-            data_file = self.get_user_data_file(user_id)
-            with open(data_file, "w") as f:
-                json.dump(user_data.to_dict(), f, indent=2)
-
-            # Update request status
-            for req in self.requests:
-                if req["request_id"] == request_id:
-                    req["status"] = "completed"
-                    req["completion_timestamp"] = datetime.now().isoformat()
-
-            self._save_requests()
+        result = self.process_requests_batch([{
+            "user_id": user_id,
+            "request_type": "withdraw_consent",
+            "data_category": data_category
+        }])[0]
 
+        if result["success"]:
             logger.info(f"Consent withdrawn for {user_id}: {data_category}")
-            return True, f"Consent withdrawn for {data_category}"
 
-        except Exception as e:
-            logger.error(f"Error withdrawing consent: {e}")
-            return False, f"Error: {str(e)}"
+        return result["success"], result["message"]
 
     def data_portability_export(self, user_id: str, format: str = "json") -> Tuple[bool, Optional[str]]:
         """
@@ -425,14 +626,11 @@ class GDPRRightsManager:
 
     def get_request_status(self, request_id: str) -> Optional[Dict[str, Any]]:
         """Get status of data subject request"""
-        for req in self.requests:
-            if req["request_id"] == request_id:
-                return req
-        return None
+        return self.store.get_request(request_id)
 
     def get_user_requests(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all requests for a user"""
-        return [req for req in self.requests if req["user_id"] == user_id]
+        return self.store.user_requests(user_id)
 
     def generate_compliance_report(self) -> str:
         """Generate GDPR compliance report"""
@@ -443,18 +641,16 @@ Generated: {datetime.now().isoformat()}
 
 Summary:
 {'-'*60}
-Total Requests: {len(self.requests)}
-Total Erasures: {len(self.erasures)}
+Total Requests: {self.store.count_requests()}
+Total Erasures: {self.store.count_erasures()}
 
 Request Types:
 """
 
-        access_count = sum(
-            1 for r in self.requests if r["request_type"] == "access")
-        erasure_count = sum(
-            1 for r in self.requests if r["request_type"] == "erasure")
-        consent_count = sum(
-            1 for r in self.requests if r["request_type"] == "withdraw_consent")
+        by_type = self.store.count_requests("request_type")
+        access_count = by_type.get("access", 0)
+        erasure_count = by_type.get("erasure", 0)
+        consent_count = by_type.get("withdraw_consent", 0)
 
         report += f"""
   - Right to Access: {access_count}
@@ -464,10 +660,10 @@ Request Types:
 Request Status:
 """
 
-        pending = sum(1 for r in self.requests if r["status"] == "pending")
-        processing = sum(
-            1 for r in self.requests if r["status"] == "processing")
-        completed = sum(1 for r in self.requests if r["status"] == "completed")
+        by_status = self.store.count_requests("status")
+        pending = by_status.get("pending", 0)
+        processing = by_status.get("processing", 0)
+        completed = by_status.get("completed", 0)
 
         report += f"""
   - Pending: {pending}
@@ -54,8 +54,17 @@ class RateLimitConfig:
         'file_upload': {'max_calls': 10, 'window_seconds': 60},
         'export': {'max_calls': 20, 'window_seconds': 60},
         'api_calls': {'max_calls': 100, 'window_seconds': 60},
+        'login_ip': {'max_calls': 20, 'window_seconds': 60},
+        'login_user': {'max_calls': 10, 'window_seconds': 60},
     })
 
+    def get_limit(self, name: str) -> Dict[str, int]:
+        """Limit for `name`, falling back to the built-in default when the YAML omits it."""
+        limit = self.limits.get(name)
+        if limit is None:
+            limit = RateLimitConfig().limits.get(name, {})
+        return dict(limit)
+
 
 @dataclass
 class PolicyConfig:
@@ -9,7 +9,7 @@ import smtplib
 import schedule
 import time
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from email.mime.multipart import MIMEMultipart
@@ -31,6 +31,8 @@ from reportlab.graphics.charts.piecharts import Pie
 # Template engine
 from jinja2 import Template, Environment, FileSystemLoader
 
+from module5.rollups import get_rollup_store
+
 logger = logging.getLogger(__name__)
 
 class ReportGenerator:
@@ -201,7 +203,7 @@ class ReportGenerator:
         hub_data = self.collect_hub_data()
         
         # Load historical data for trends
-        historical_data = self._load_historical_data(days=7)
+        historical_data = self._load_trend_series(days=7)
         
         report_data = {
             "report_type": "Weekly QA Report",
@@ -224,7 +226,7 @@ class ReportGenerator:
         logger.info("Generating monthly compliance report")
         
         hub_data = self.collect_hub_data()
-        historical_data = self._load_historical_data(days=30)
+        historical_data = self._load_trend_series(days=30)
         
         report_data = {
             "report_type": "Monthly Compliance Report",
@@ -248,7 +250,7 @@ class ReportGenerator:
         logger.info("Generating quarterly executive report")
         
         hub_data = self.collect_hub_data()
-        historical_data = self._load_historical_data(days=90)
+        historical_data = self._load_trend_series(days=90)
         
         report_data = {
             "report_type": "Quarterly Executive Report",
@@ -373,29 +375,12 @@ class ReportGenerator:
         
         return summary
     
-    def _load_historical_data(self, days: int) -> List[Dict]:
-        """Load historical QA data"""
+    def _load_trend_series(self, days: int) -> List[Dict]:
+        """Load pre-aggregated QA history buckets covering the last `days`"""
         try:
-            history_file = Path("qa_history/qa_history.jsonl")
-            if not history_file.exists():
-                return []
-            
-            cutoff_date = datetime.now() - timedelta(days=days)
-            historical_data = []
-            
-            with open(history_file, 'r') as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line.strip())
-                        entry_date = datetime.fromisoformat(entry["timestamp"])
-                        if entry_date >= cutoff_date:
-                            historical_data.append(entry)
-                    except (json.JSONDecodeError, KeyError, ValueError):
-                        continue
-            
-            return historical_data
+            return get_rollup_store().get_recent_series(days)
         except Exception as e:
-            logger.error(f"Error loading historical data: {e}")
+            logger.error(f"Error loading trend rollups: {e}")
             return []
     
     def send_report(self, filepath: str, recipients: List[str], subject: str):
@@ -441,19 +426,23 @@ class ReportGenerator:
             logger.error(f"Error sending report: {e}")
     
     def _calculate_trends(self, historical_data: List[Dict]) -> Dict:
-        """Calculate trends from historical data"""
+        """Calculate trends from bucketed historical data (see _load_trend_series)"""
         if len(historical_data) < 2:
             return {"trend": "insufficient_data"}
         
-        # Calculate CQS trend
-        cqs_values = [entry.get("cqs", 0) for entry in historical_data if "cqs" in entry]
-        if len(cqs_values) >= 2:
-            trend = "improving" if cqs_values[-1] > cqs_values[0] else "declining"
-            change = cqs_values[-1] - cqs_values[0]
+        # Calculate CQS trend from the first and last bucket means
+        cqs_buckets = [b for b in historical_data if b.get("cqs", {}).get("count")]
+        if len(cqs_buckets) >= 2:
+            first = cqs_buckets[0]["cqs"]["mean"]
+            last = cqs_buckets[-1]["cqs"]["mean"]
+            trend = "improving" if last > first else "declining"
             return {
                 "cqs_trend": trend,
-                "cqs_change": change,
-                "data_points": len(cqs_values)
+                "cqs_change": round(last - first, 2),
+                "cqs_min": min(b["cqs"]["min"] for b in cqs_buckets),
+                "cqs_max": max(b["cqs"]["max"] for b in cqs_buckets),
+                "data_points": sum(b["cqs"]["count"] for b in cqs_buckets),
+                "buckets": len(cqs_buckets)
             }
         
         return {"trend": "no_data"}
@@ -79,6 +79,26 @@ except ImportError as e:
     logger.error(f"Failed to load authentication system: {e}")
     auth_manager = None
 
+# Revalidating fetcher for hub polling (If-None-Match / 304)
+try:
+    from module5.conditional import ConditionalFetcher
+    hub_fetcher = ConditionalFetcher()
+except ImportError as e:
+    logger.warning(f"Conditional hub fetching not available: {e}")
+    hub_fetcher = None
+
+# Pre-aggregated CQS history for trend charts
+try:
+    from module5.rollups import CQSRollupStore
+    rollup_store = CQSRollupStore(
+        rollup_dir=str(project_root / 'qa_history' / 'rollups'),
+        history_file=str(project_root / 'qa_history' / 'qa_history.jsonl'),
+        read_only=True
+    )
+except Exception as e:
+    logger.warning(f"CQS history rollups not available: {e}")
+    rollup_store = None
+
 # ============================================================================
 # SESSION MANAGEMENT (Authentication Removed)
 
@@ -142,10 +162,16 @@ def fetch_live_hub_data():
     for hub_name, url in hub_endpoints.items():
         try:
             start_time = time.time()
-            response = requests.get(url, timeout=3)
+            if hub_fetcher:
+                response = hub_fetcher.get(url, timeout=3)
+            else:
+                response = requests.get(url, timeout=3)
             response_time = (time.time() - start_time) * 1000
             
-            if response.status_code == 200:
+            if response.status_code in (200, 304) and hub_fetcher:
+                live_data[hub_name] = hub_fetcher.json_for(response)
+                response_times[hub_name] = response_time
+            elif response.status_code == 200:
                 live_data[hub_name] = response.json()
                 response_times[hub_name] = response_time
             else:
@@ -382,9 +408,8 @@ def create_compliance_radar_chart(live_data):
     
     return fig
 
-def create_trend_chart():
-    """Create quality trends chart"""
-    # Generate mock historical data
+def generate_mock_trend_series():
+    """Generate mock historical data when no QA history has been recorded yet"""
     dates = pd.date_range(start='2024-10-01', end='2024-11-21', freq='D')
     
     np.random.seed(42)
@@ -399,6 +424,39 @@ def create_trend_chart():
     base_fi = np.clip(base_fi, 30, 95)
     base_ts = np.clip(base_ts, 60, 95)
     
+    return dates, base_crs, base_sai, base_fi, base_ts
+
+def load_trend_series(days=30):
+    """Load daily CQS component means from the history rollups"""
+    if not rollup_store:
+        return None
+    try:
+        buckets = rollup_store.get_series(
+            'day',
+            start=datetime.now() - timedelta(days=days),
+            metrics=['crs', 'sai', 'fi', 'ts']
+        )
+    except Exception as e:
+        logger.warning(f"Failed to load trend rollups: {e}")
+        return None
+    if len(buckets) < 2:
+        return None
+    
+    dates = pd.to_datetime([b['bucket'] for b in buckets])
+    series = {
+        metric: np.array([b[metric]['mean'] if b[metric]['mean'] is not None else np.nan for b in buckets])
+        for metric in ('crs', 'sai', 'fi', 'ts')
+    }
+    return dates, series['crs'], series['sai'], series['fi'], series['ts']
+
+def create_trend_chart():
+    """Create quality trends chart"""
+    trend_series = load_trend_series(days=30)
+    if trend_series:
+        dates, base_crs, base_sai, base_fi, base_ts = trend_series
+    else:
+        dates, base_crs, base_sai, base_fi, base_ts = generate_mock_trend_series()
+    
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
@@ -496,6 +554,14 @@ def login():
             response.headers['Expires'] = '0'
             return response
         
+        elif result and result.get('rate_limited'):
+            # Throttled before any password check
+            retry_after = max(1, round(result.get('retry_after', 1)))
+            flash(f'Too many login attempts. Try again in {retry_after} seconds', 'error')
+            response = make_response(render_template('login.html'), 429)
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        
         elif result and result.get('requires_2fa'):
             # 2FA required
             session['pending_username'] = username
@@ -607,6 +673,14 @@ def manage_users():
     # For now, just redirect to settings
     return redirect(url_for('settings'))
 
+@app.route('/api/auth/metrics')
+@admin_required
+def api_auth_metrics():
+    """Password hashing pool and login rate limiter metrics (admin only)"""
+    if not auth_manager:
+        return jsonify({'error': 'Authentication system not available'}), 503
+    return jsonify(auth_manager.get_login_metrics())
+
 # ============================================================================
 # FLASK ROUTES
 # ============================================================================
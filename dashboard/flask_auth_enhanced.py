@@ -4,21 +4,34 @@ Advanced security features including 2FA, session management, and audit logging
 Adapted for Flask from the Streamlit version
 """
 
+import gzip
 import json
 import logging
+import os
+import sqlite3
+import threading
+import time
 import hashlib
 import hmac
 import secrets
+import shutil
 import pyotp
 import qrcode
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from flask import session, request, redirect, url_for, render_template
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from flask import session, request, redirect, url_for, render_template, has_request_context
 from io import BytesIO
 import base64
 from functools import wraps
 
+try:
+    from core.config import config as dashboard_config
+except ImportError:
+    dashboard_config = None
+
 logger = logging.getLogger(__name__)
 
 class EnhancedUser:
@@ -112,11 +125,134 @@ class EnhancedUser:
         )
 
 class SecurityAuditLogger:
-    """Security audit logging system"""
+    """
+    Security audit logging system
+    
+    Events are appended to daily segments (security_audit.YYYY-MM-DD.log),
+    so a time-range query only opens the days it covers. Finished days are
+    gzip-compressed. Every `index_every`-th event of a segment writes a
+    (timestamp, byte offset) entry to the segment's .idx file, so a query
+    starting mid-day seeks near its start instead of reading from the top.
+    A legacy single-file security_audit.log is split into segments once.
+    """
     
-    def __init__(self, log_file: str = "data/auth/security_audit.log"):
+    def __init__(self, log_file: str = "data/auth/security_audit.log", 
+                 compress: bool = True, retention_days: int = None,
+                 index_every: int = 256):
         self.log_file = Path(log_file)
-        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.log_dir = self.log_file.parent
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.compress = compress
+        self.retention_days = retention_days
+        self.index_every = index_every
+        
+        self._lock = threading.Lock()
+        self._segment_date: Optional[str] = None
+        self._segment_events = 0
+        self._migrate_legacy_log()
+    
+    # -- segments --
+    
+    def _segment_path(self, date: str, compressed: bool = False) -> Path:
+        name = f"{self.log_file.stem}.{date}{self.log_file.suffix}"
+        return self.log_dir / (name + ".gz" if compressed else name)
+    
+    def _index_path(self, date: str) -> Path:
+        return self.log_dir / f"{self.log_file.stem}.{date}.idx"
+    
+    def _segments(self) -> List[Tuple[str, Path]]:
+        """(date, path) of every segment, oldest first"""
+        prefix = f"{self.log_file.stem}."
+        segments = {}
+        for path in self.log_dir.glob(f"{prefix}*{self.log_file.suffix}*"):
+            name = path.name
+            compressed = name.endswith(".gz")
+            date = name[len(prefix):].split(".", 1)[0]
+            if len(date) != 10 or name != self._segment_path(date, compressed).name:
+                continue
+            # A plain segment wins over a half-written .gz
+            if date not in segments or not compressed:
+                segments[date] = path
+        return sorted(segments.items())
+    
+    def _roll_to(self, date: str):
+        """Switch the active segment; compress finished days and apply retention"""
+        self._segment_date = date
+        self._segment_events = 0
+        
+        for segment_date, path in self._segments():
+            if segment_date >= date:
+                continue
+            if self.retention_days is not None and \
+                    segment_date < (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d"):
+                path.unlink(missing_ok=True)
+                self._index_path(segment_date).unlink(missing_ok=True)
+            elif self.compress and not path.name.endswith(".gz"):
+                self._compress_segment(segment_date, path)
+    
+    def _compress_segment(self, date: str, path: Path):
+        target = self._segment_path(date, compressed=True)
+        temp_path = target.with_name(target.name + ".tmp")
+        try:
+            with open(path, "rb") as src, gzip.open(temp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(temp_path, target)
+            path.unlink()
+        except Exception as e:
+            logger.error(f"Failed to compress audit segment {path}: {e}")
+    
+    def _write_lines(self, date: str, entries: List[Tuple[str, str]]):
+        """Append (timestamp, line) pairs to a segment, updating its time index"""
+        count = self._segment_events if date == self._segment_date else 0
+        index_lines = []
+        with open(self._segment_path(date), "ab") as f:
+            for timestamp, line in entries:
+                if count % self.index_every == 0:
+                    index_lines.append(f"{timestamp}\t{f.tell()}\n")
+                f.write(line.encode("utf-8"))
+                count += 1
+        if date == self._segment_date:
+            self._segment_events = count
+        if index_lines:
+            with open(self._index_path(date), "a", encoding="utf-8") as f:
+                f.writelines(index_lines)
+    
+    def _migrate_legacy_log(self):
+        """Split a pre-segmentation security_audit.log into daily segments"""
+        if not self.log_file.exists():
+            return
+        
+        by_date: Dict[str, List[Tuple[str, str]]] = {}
+        try:
+            with open(self.log_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    timestamp = self._line_timestamp(line)
+                    if timestamp is None:
+                        continue
+                    by_date.setdefault(timestamp[:10], []).append(
+                        (timestamp, line if line.endswith("\n") else line + "\n"))
+            
+            with self._lock:
+                for date, entries in sorted(by_date.items()):
+                    entries.sort(key=lambda entry: entry[0])
+                    self._write_lines(date, entries)
+                self._roll_to(datetime.now().strftime("%Y-%m-%d"))
+            os.replace(self.log_file, f"{self.log_file}.migrated")
+            logger.info(f"Migrated {sum(map(len, by_date.values()))} audit events into daily segments")
+        except Exception as e:
+            logger.error(f"Failed to migrate audit log: {e}")
+    
+    @staticmethod
+    def _line_timestamp(line: str) -> Optional[str]:
+        """Timestamp of a log line, without a full JSON parse for our own lines"""
+        if line.startswith('{"timestamp": "'):
+            end = line.find('"', 15)
+            if end > 15:
+                return line[15:end]
+        try:
+            return json.loads(line)["timestamp"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return None
     
     def log_event(self, event_type: str, username: str, details: Dict = None, 
                   ip_address: str = None, user_agent: str = None):
@@ -139,36 +275,117 @@ class SecurityAuditLogger:
         }
         
         try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(log_entry) + "\n")
+            line = json.dumps(log_entry) + "\n"
+            date = log_entry["timestamp"][:10]
+            with self._lock:
+                if date != self._segment_date:
+                    self._roll_to(date)
+                self._write_lines(date, [(log_entry["timestamp"], line)])
         except Exception as e:
             logger.error(f"Failed to write audit log: {e}")
     
-    def get_recent_events(self, hours: int = 24, username: str = None) -> List[Dict]:
-        """Get recent security events"""
+    # -- queries --
+    
+    def _seek_offset(self, date: str, start: Optional[str]) -> int:
+        """Byte offset to start reading a segment from for events >= start"""
+        if not start or start[:10] < date:
+            return 0
+        offsets = []
+        try:
+            with open(self._index_path(date), "r", encoding="utf-8") as f:
+                for entry in f:
+                    timestamp, _, offset = entry.rstrip("\n").partition("\t")
+                    if timestamp >= start:
+                        break
+                    offsets.append(int(offset))
+        except (OSError, ValueError):
+            return 0
+        # Step back one extra index entry to absorb slightly out-of-order writes
+        return offsets[-2] if len(offsets) > 1 else 0
+    
+    def _read_segment(self, date: str, path: Path, start: Optional[str], 
+                      end: Optional[str]) -> Iterator[Tuple[str, str]]:
+        """(timestamp, line) pairs of a segment within [start, end]"""
+        offset = self._seek_offset(date, start)
+        opener = gzip.open if path.name.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            if offset:
+                # Realign on a line boundary in case the index is stale
+                f.seek(offset - 1)
+                if f.read(1) != b"\n":
+                    f.readline()
+            for raw in f:
+                line = raw.decode("utf-8", "replace")
+                timestamp = self._line_timestamp(line)
+                if timestamp is None or (start and timestamp < start):
+                    continue
+                if end and timestamp > end:
+                    break
+                yield timestamp, line
+    
+    def query(self, start: datetime = None, end: datetime = None, 
+              username: str = None, event_types: List[str] = None,
+              limit: int = None, newest_first: bool = False) -> Iterator[Dict]:
+        """
+        Stream events in time order
         
-        if not self.log_file.exists():
-            return []
+        Args:
+            start, end: Inclusive bounds (naive local time, like the log)
+            username: Only events for this user
+            event_types: Only these event types
+            limit: Stop after this many events
+            newest_first: Stream from `end` backwards instead
         
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        events = []
+        Only segments overlapping [start, end] are opened, and events are
+        sorted one segment (day) at a time, so memory stays bounded by a
+        day's matches regardless of how much history is retained.
+        """
+        start_s = start.isoformat() if isinstance(start, datetime) else start
+        end_s = end.isoformat() if isinstance(end, datetime) else end
+        types = set(event_types) if event_types else None
+        user_marker = f'"username": {json.dumps(username)}' if username is not None else None
         
-        try:
-            with open(self.log_file, "r", encoding="utf-8") as f:
-                for line in f:
+        segments = [
+            (date, path) for date, path in self._segments()
+            if (not start_s or date >= start_s[:10]) and (not end_s or date <= end_s[:10])
+        ]
+        if newest_first:
+            segments.reverse()
+        
+        emitted = 0
+        for date, path in segments:
+            matches = []
+            try:
+                for timestamp, line in self._read_segment(date, path, start_s, end_s):
+                    if user_marker is not None and user_marker not in line:
+                        continue
                     try:
-                        event = json.loads(line.strip())
-                        event_time = datetime.fromisoformat(event["timestamp"])
-                        
-                        if event_time >= cutoff_time:
-                            if username is None or event["username"] == username:
-                                events.append(event)
-                    except (json.JSONDecodeError, KeyError, ValueError):
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
                         continue
-        except Exception as e:
-            logger.error(f"Failed to read audit log: {e}")
+                    if username is not None and event.get("username") != username:
+                        continue
+                    if types is not None and event.get("event_type") not in types:
+                        continue
+                    matches.append((timestamp, event))
+            except (OSError, EOFError) as e:
+                logger.error(f"Failed to read audit segment {path}: {e}")
+                continue
+            
+            matches.sort(key=lambda match: match[0], reverse=newest_first)
+            for _, event in matches:
+                yield event
+                emitted += 1
+                if limit is not None and emitted >= limit:
+                    return
+    
+    def get_recent_events(self, hours: int = 24, username: str = None, 
+                          limit: int = None) -> List[Dict]:
+        """Get recent security events (newest first)"""
         
-        return sorted(events, key=lambda x: x["timestamp"], reverse=True)
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        return list(self.query(start=cutoff_time, username=username, 
+                               limit=limit, newest_first=True))
 
 class TwoFactorAuth:
     """Two-Factor Authentication manager"""
@@ -214,19 +431,393 @@ class TwoFactorAuth:
         """Generate backup codes for 2FA recovery"""
         return [secrets.token_hex(4).upper() for _ in range(count)]
 
+class HashingOverloaded(Exception):
+    """Raised when the password-hashing queue is full."""
+
+
+class PasswordHashingPool:
+    """
+    Bounded executor for PBKDF2 password hashing.
+
+    Hashing runs on a fixed number of worker threads (hashlib releases the
+    GIL, so they use real cores) and at most `max_pending` hashes may be
+    queued or running. A login storm therefore costs at most `workers` cores
+    and is shed with HashingOverloaded once the queue is full, instead of
+    tying up every Flask worker serving the dashboards.
+    """
+
+    def __init__(self, hash_func: Callable[[str, str], str], workers: int = None,
+                 max_pending: int = 32):
+        self.hash_func = hash_func
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="pbkdf2")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._stats = {"submitted": 0, "completed": 0, "rejected": 0, "timed_out": 0,
+                       "max_queue_depth": 0, "total_wait_ms": 0.0, "total_hash_ms": 0.0}
+
+    def _run(self, password: str, salt: str, enqueued: float) -> str:
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._stats["total_wait_ms"] += (started - enqueued) * 1000
+        try:
+            return self.hash_func(password, salt)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._stats["completed"] += 1
+                self._stats["total_hash_ms"] += (time.perf_counter() - started) * 1000
+            self._slots.release()
+
+    def hash(self, password: str, salt: str, timeout: float = 30.0) -> str:
+        """
+        Hash on the pool, raising HashingOverloaded if the queue is full.
+
+        Raises concurrent.futures.TimeoutError if the hash does not finish
+        within `timeout`; a hash that never started is withdrawn from the queue.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise HashingOverloaded("password hashing queue is full")
+        with self._lock:
+            self._pending += 1
+            self._stats["submitted"] += 1
+            depth = self._pending - self._running
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+        future = self._executor.submit(self._run, password, salt, time.perf_counter())
+        try:
+            return future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            with self._lock:
+                self._stats["timed_out"] += 1
+                if future.cancel():
+                    # _run never started, so its slot must be returned here
+                    self._pending -= 1
+                    self._slots.release()
+            raise
+
+    def get_metrics(self) -> Dict:
+        """Queue depth, throughput and latency counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            running = self._running
+            pending = self._pending
+        completed = stats["completed"]
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "running": running,
+            "queue_depth": pending - running,
+            "max_queue_depth": stats["max_queue_depth"],
+            "submitted": stats["submitted"],
+            "completed": completed,
+            "rejected": stats["rejected"],
+            "timed_out": stats["timed_out"],
+            "avg_wait_ms": round(stats["total_wait_ms"] / completed, 2) if completed else 0.0,
+            "avg_hash_ms": round(stats["total_hash_ms"] / completed, 2) if completed else 0.0,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by client (IP address, username, ...).
+
+    Each key may burst up to `max_calls` requests and regains tokens at
+    max_calls / window_seconds per second. Only the `max_keys` most recently
+    seen keys are tracked, so a flood of distinct keys cannot exhaust memory.
+    """
+
+    def __init__(self, max_calls: int, window_seconds: float, max_keys: int = 10000):
+        self.capacity = float(max_calls)
+        self.rate = max_calls / float(window_seconds)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, limit: Dict[str, int]) -> 'TokenBucketLimiter':
+        return cls(limit.get("max_calls", 10), limit.get("window_seconds", 60))
+
+    def allow(self, key: str) -> Tuple[bool, float]:
+        """Take a token for `key`; returns (allowed, seconds until the next token)."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.capacity, now]
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0.0
+            self.rejected += 1
+            return False, (1 - bucket[0]) / self.rate
+
+    def tracked_keys(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+
+class UserRepository:
+    """
+    User records with an in-memory index over a SQLite store.
+
+    Each user is one row, so a login only updates its own record instead of
+    rewriting every user. users_enhanced.json remains the human-editable
+    view: it is imported whenever its mtime changes behind our back, and
+    re-exported atomically (write + rename) when accounts are created,
+    locked or change their 2FA setup. Reads are served from memory and only
+    revalidated with a stat() and SQLite's data_version, so other processes'
+    writes and hand edits of the JSON file are still picked up.
+    """
+
+    def __init__(self, users_file: str = "data/auth/users_enhanced.json",
+                 db_file: str = None):
+        self.users_file = Path(users_file)
+        self.users_file.parent.mkdir(parents=True, exist_ok=True)
+        self.db_file = Path(db_file) if db_file else self.users_file.with_suffix(".db")
+
+        self._lock = threading.RLock()
+        self._user_locks: Dict[str, threading.Lock] = {}
+        self._users: Dict[str, Dict] = {}
+        self._emails: Dict[str, str] = {}
+        self._json_mtime_ns: Optional[int] = None
+        self._data_version: Optional[int] = None
+
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._init_database()
+        with self._lock:
+            self._reload()
+            self._sync()
+
+    def _init_database(self):
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                username TEXT PRIMARY KEY,
+                email TEXT,
+                record TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users (email)")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS users_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+
+    # -- cache maintenance (callers hold self._lock) --
+
+    def _reload(self):
+        """Rebuild the in-memory index from SQLite."""
+        users = {}
+        for username, record in self._conn.execute("SELECT username, record FROM users"):
+            try:
+                users[username] = json.loads(record)
+            except json.JSONDecodeError:
+                logger.error(f"Corrupt user record for {username}")
+        self._users = users
+        self._emails = {data.get("email"): name for name, data in users.items() if data.get("email")}
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM users_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _sync(self):
+        """Pick up hand edits of the JSON file and writes from other processes."""
+        try:
+            mtime_ns = os.stat(self.users_file).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if mtime_ns is not None and mtime_ns != self._json_mtime_ns:
+            if self._meta("json_mtime_ns") != str(mtime_ns):
+                self._import_json(mtime_ns)
+            self._json_mtime_ns = mtime_ns
+
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._reload()
+
+    def _import_json(self, mtime_ns: int):
+        """Replace the stored users with the contents of the JSON file."""
+        try:
+            with open(self.users_file, 'r', encoding='utf-8') as f:
+                users_data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load users: {e}")
+            return
+
+        now = datetime.now().isoformat()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DELETE FROM users")
+            self._conn.executemany(
+                "INSERT INTO users (username, email, record, updated_at) VALUES (?, ?, ?, ?)",
+                [(name, data.get("email"), json.dumps(data), now) for name, data in users_data.items()])
+            self._conn.execute("INSERT OR REPLACE INTO users_meta (key, value) VALUES ('json_mtime_ns', ?)",
+                               (str(mtime_ns),))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._reload()
+        logger.info(f"Imported {len(users_data)} users from {self.users_file}")
+
+    def _write(self, username: str, record: Dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO users (username, email, record, updated_at) VALUES (?, ?, ?, ?)",
+            (username, record.get("email"), json.dumps(record), datetime.now().isoformat()))
+        previous = self._users.get(username)
+        if previous and previous.get("email") != record.get("email"):
+            self._emails.pop(previous.get("email"), None)
+        self._users[username] = record
+        if record.get("email"):
+            self._emails[record["email"]] = username
+
+    # -- public API --
+
+    def user_lock(self, username: str) -> threading.Lock:
+        """Lock serializing read-modify-write cycles on one user's record."""
+        with self._lock:
+            lock = self._user_locks.get(username)
+            if lock is None:
+                lock = self._user_locks[username] = threading.Lock()
+            return lock
+
+    def get(self, username: str) -> Optional[Dict]:
+        """Copy of a user's record, or None."""
+        with self._lock:
+            self._sync()
+            record = self._users.get(username)
+            return dict(record) if record is not None else None
+
+    def email_exists(self, email: str) -> bool:
+        with self._lock:
+            self._sync()
+            return email in self._emails
+
+    def count(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._users)
+
+    def all(self) -> Dict[str, Dict]:
+        with self._lock:
+            self._sync()
+            return {name: dict(record) for name, record in self._users.items()}
+
+    def add(self, username: str, record: Dict) -> bool:
+        """Insert a new user; False if the username is taken."""
+        with self._lock:
+            self._sync()
+            if username in self._users:
+                return False
+            self._write(username, record)
+            self.export()
+        return True
+
+    def update(self, username: str, changes: Union[Dict, Callable[[Dict], Dict]],
+               export: bool = False) -> Optional[Dict]:
+        """
+        Apply field changes to one user's record.
+
+        `changes` is either a dict of fields or a function computing them from
+        the current record; it runs inside a write transaction on the freshly
+        read row, so increments from concurrent processes are not lost. Only
+        that record is written. Pass export=True for changes that should also
+        show up in the JSON file (lockouts, 2FA setup).
+        """
+        with self._lock:
+            self._sync()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT record FROM users WHERE username = ?",
+                                         (username,)).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                record = json.loads(row[0])
+                record.update(changes(record) if callable(changes) else changes)
+                self._write(username, record)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if export:
+                self.export()
+            return dict(record)
+
+    def export(self):
+        """Write all users to the JSON file atomically."""
+        with self._lock:
+            temp_path = self.users_file.with_name(f"{self.users_file.name}.{os.getpid()}.tmp")
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._users, f, indent=2, ensure_ascii=False)
+                os.replace(temp_path, self.users_file)
+                mtime_ns = os.stat(self.users_file).st_mtime_ns
+                self._conn.execute("INSERT OR REPLACE INTO users_meta (key, value) VALUES ('json_mtime_ns', ?)",
+                                   (str(mtime_ns),))
+                self._json_mtime_ns = mtime_ns
+            except Exception as e:
+                logger.error(f"Failed to save users: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
 class FlaskAuthenticationManager:
     """Flask Enhanced authentication manager with advanced security features"""
     
-    def __init__(self, users_file: str = "data/auth/users_enhanced.json"):
+    def __init__(self, users_file: str = "data/auth/users_enhanced.json",
+                 users_db: str = None, rate_limits=None,
+                 hash_workers: int = None, max_pending_hashes: int = 32):
         self.users_file = Path(users_file)
         self.users_file.parent.mkdir(parents=True, exist_ok=True)
+        self.users = UserRepository(users_file, users_db)
         self.audit_logger = SecurityAuditLogger()
+        self.hasher = PasswordHashingPool(self._hash_password, hash_workers, max_pending_hashes)
+        
+        # Login throttling from RateLimitConfig (login_ip / login_user)
+        if rate_limits is None and dashboard_config is not None \
+                and dashboard_config.security.enable_rate_limiting:
+            rate_limits = dashboard_config.rate_limits
+        if rate_limits is not None:
+            self.ip_limiter = TokenBucketLimiter.from_config(rate_limits.get_limit("login_ip"))
+            self.user_limiter = TokenBucketLimiter.from_config(rate_limits.get_limit("login_user"))
+        else:
+            self.ip_limiter = None
+            self.user_limiter = None
+        
         self._ensure_default_users()
     
     def _ensure_default_users(self):
         """Ensure default admin user exists"""
         
-        if not self.users_file.exists():
+        if self.users.count() == 0:
             # Create default admin user
             admin_user = EnhancedUser(
                 username="admin",
@@ -241,10 +832,8 @@ class FlaskAuthenticationManager:
             admin_user.password_hash = password_hash
             
             # Save user
-            users_data = {"admin": admin_user.to_dict()}
-            self._save_users(users_data)
-            
-            logger.info("Created default admin user (admin/admin123)")
+            if self.users.add("admin", admin_user.to_dict()):
+                logger.info("Created default admin user (admin/admin123)")
     
     def _hash_password(self, password: str, salt: str) -> str:
         """Hash password with salt using PBKDF2"""
@@ -256,39 +845,41 @@ class FlaskAuthenticationManager:
         ).hex()
     
     def _load_users(self) -> Dict[str, Dict]:
-        """Load users from file"""
-        
-        if not self.users_file.exists():
-            return {}
-        
-        try:
-            with open(self.users_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load users: {e}")
-            return {}
+        """Load all users (served from the repository's in-memory index)"""
+        return self.users.all()
     
-    def _save_users(self, users_data: Dict[str, Dict]):
-        """Save users to file"""
-        
-        try:
-            with open(self.users_file, 'w', encoding='utf-8') as f:
-                json.dump(users_data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Failed to save users: {e}")
+    def _rate_limited(self, username: str, scope: str, retry_after: float) -> Tuple[bool, Dict]:
+        self.audit_logger.log_event("LOGIN_RATE_LIMITED", username, 
+                                  {"scope": scope, "retry_after": round(retry_after, 1)})
+        return False, {"rate_limited": True, "retry_after": round(retry_after, 1)}
     
     def authenticate(self, username: str, password: str, 
-                    two_fa_token: str = None) -> Tuple[bool, Optional[Dict]]:
-        """Enhanced authentication with 2FA support"""
+                    two_fa_token: str = None, 
+                    ip_address: str = None) -> Tuple[bool, Optional[Dict]]:
+        """
+        Enhanced authentication with 2FA support
+        
+        Cheap checks (per-IP bucket, unknown user, locked account, per-user
+        bucket) run before any password hashing. Throttled or shed attempts
+        return (False, {"rate_limited": True, "retry_after": seconds}) and do
+        not count as failed attempts.
+        """
+        
+        if ip_address is None:
+            ip_address = request.remote_addr if has_request_context() else "unknown"
         
-        users_data = self._load_users()
+        if self.ip_limiter is not None:
+            allowed, retry_after = self.ip_limiter.allow(ip_address or "unknown")
+            if not allowed:
+                return self._rate_limited(username, "ip", retry_after)
         
-        if username not in users_data:
+        user_data = self.users.get(username)
+        
+        if user_data is None:
             self.audit_logger.log_event("LOGIN_FAILED", username, 
                                       {"reason": "user_not_found"})
             return False, None
         
-        user_data = users_data[username]
         user = EnhancedUser.from_dict(user_data)
         
         # Check if account is locked
@@ -297,25 +888,41 @@ class FlaskAuthenticationManager:
                                       {"reason": "account_locked"})
             return False, None
         
-        # Verify password
-        password_hash = self._hash_password(password, user.salt)
-        if password_hash != user.password_hash:
-            # Increment failed attempts
-            user.failed_attempts += 1
+        if self.user_limiter is not None:
+            allowed, retry_after = self.user_limiter.allow(username)
+            if not allowed:
+                return self._rate_limited(username, "user", retry_after)
+        
+        # Verify password on the bounded hashing pool (outside any lock)
+        try:
+            password_hash = self.hasher.hash(password, user.salt)
+        except HashingOverloaded:
+            return self._rate_limited(username, "hashing_queue", 1.0)
+        except FuturesTimeoutError:
+            logger.warning(f"Password hashing timed out for {username}; hashing pool saturated")
+            return self._rate_limited(username, "hashing_timeout", 1.0)
+        if not hmac.compare_digest(password_hash, user.password_hash):
+            def count_failure(current: Dict) -> Dict:
+                failed_attempts = current.get("failed_attempts", 0) + 1
+                changes = {"failed_attempts": failed_attempts}
+                # Lock account after 5 failed attempts
+                if failed_attempts >= 5:
+                    changes["account_locked"] = True
+                return changes
             
-            # Lock account after 5 failed attempts
-            if user.failed_attempts >= 5:
-                user.account_locked = True
-                self.audit_logger.log_event("ACCOUNT_LOCKED", username, 
-                                          {"failed_attempts": user.failed_attempts})
+            with self.users.user_lock(username):
+                updated = self.users.update(username, count_failure) or user_data
+                failed_attempts = updated.get("failed_attempts", 0)
+                if updated.get("account_locked"):
+                    self.users.export()
             
-            # Update user data
-            users_data[username] = user.to_dict()
-            self._save_users(users_data)
+            if failed_attempts >= 5:
+                self.audit_logger.log_event("ACCOUNT_LOCKED", username, 
+                                          {"failed_attempts": failed_attempts})
             
             self.audit_logger.log_event("LOGIN_FAILED", username, 
                                       {"reason": "invalid_password", 
-                                       "failed_attempts": user.failed_attempts})
+                                       "failed_attempts": failed_attempts})
             return False, None
         
         # Check 2FA if enabled
@@ -329,10 +936,12 @@ class FlaskAuthenticationManager:
                 return False, None
         
         # Successful login - reset failed attempts
-        user.failed_attempts = 0
-        user.last_login = datetime.now().isoformat()
-        users_data[username] = user.to_dict()
-        self._save_users(users_data)
+        with self.users.user_lock(username):
+            user_data = self.users.update(username, {
+                "failed_attempts": 0,
+                "last_login": datetime.now().isoformat()
+            }) or user.to_dict()
+        user = EnhancedUser.from_dict(user_data)
         
         self.audit_logger.log_event("LOGIN_SUCCESS", username, 
                                   {"2fa_used": user.two_fa_enabled})
@@ -343,16 +952,13 @@ class FlaskAuthenticationManager:
                    role: str = "viewer") -> Tuple[bool, str]:
         """Create new user with enhanced validation"""
         
-        users_data = self._load_users()
-        
         # Check if user already exists
-        if username in users_data:
+        if self.users.get(username) is not None:
             return False, "Username already exists"
         
         # Check if email already exists
-        for existing_user in users_data.values():
-            if existing_user.get("email") == email:
-                return False, "Email already registered"
+        if self.users.email_exists(email):
+            return False, "Email already registered"
         
         # Validate password strength
         if len(password) < 8:
@@ -363,13 +969,17 @@ class FlaskAuthenticationManager:
         
         # Hash password
         salt = secrets.token_hex(32)
-        password_hash = self._hash_password(password, salt)
+        try:
+            password_hash = self.hasher.hash(password, salt)
+        except (HashingOverloaded, FuturesTimeoutError):
+            logger.warning(f"Password hashing unavailable while creating user {username}")
+            return False, "Server busy, please try again"
         user.salt = salt
         user.password_hash = password_hash
         
         # Save user
-        users_data[username] = user.to_dict()
-        self._save_users(users_data)
+        if not self.users.add(username, user.to_dict()):
+            return False, "Username already exists"
         
         self.audit_logger.log_event("USER_CREATED", username, 
                                   {"role": role, "email": email})
@@ -379,25 +989,20 @@ class FlaskAuthenticationManager:
     def setup_2fa(self, username: str) -> Tuple[bool, Dict]:
         """Setup 2FA for user"""
         
-        users_data = self._load_users()
-        
-        if username not in users_data:
+        if self.users.get(username) is None:
             return False, {"error": "User not found"}
         
-        user_data = users_data[username]
-        user = EnhancedUser.from_dict(user_data)
-        
         # Generate 2FA secret and backup codes
         secret = TwoFactorAuth.generate_secret()
         backup_codes = TwoFactorAuth.generate_backup_codes()
         qr_code = TwoFactorAuth.generate_qr_code(username, secret)
         
         # Store secret (not enabled yet)
-        user.two_fa_secret = secret
-        user.backup_codes = backup_codes
-        
-        users_data[username] = user.to_dict()
-        self._save_users(users_data)
+        with self.users.user_lock(username):
+            self.users.update(username, {
+                "two_fa_secret": secret,
+                "backup_codes": backup_codes
+            }, export=True)
         
         self.audit_logger.log_event("2FA_SETUP_INITIATED", username)
         
@@ -410,36 +1015,52 @@ class FlaskAuthenticationManager:
     def enable_2fa(self, username: str, verification_token: str) -> Tuple[bool, str]:
         """Enable 2FA after verification"""
         
-        users_data = self._load_users()
-        
-        if username not in users_data:
-            return False, "User not found"
-        
-        user_data = users_data[username]
-        user = EnhancedUser.from_dict(user_data)
-        
-        # Verify token
-        if not TwoFactorAuth.verify_token(user.two_fa_secret, verification_token):
-            return False, "Invalid verification token"
-        
-        # Enable 2FA
-        user.two_fa_enabled = True
-        users_data[username] = user.to_dict()
-        self._save_users(users_data)
+        with self.users.user_lock(username):
+            user_data = self.users.get(username)
+            
+            if user_data is None:
+                return False, "User not found"
+            
+            user = EnhancedUser.from_dict(user_data)
+            
+            # Verify token
+            if not TwoFactorAuth.verify_token(user.two_fa_secret, verification_token):
+                return False, "Invalid verification token"
+            
+            # Enable 2FA
+            self.users.update(username, {"two_fa_enabled": True}, export=True)
         
         self.audit_logger.log_event("2FA_ENABLED", username)
         
         return True, "2FA enabled successfully"
     
+    def get_login_metrics(self) -> Dict:
+        """Hashing pool and login rate limiter metrics"""
+        
+        limiters = {}
+        for scope, limiter in (("ip", self.ip_limiter), ("user", self.user_limiter)):
+            if limiter is not None:
+                limiters[scope] = {
+                    "max_calls": int(limiter.capacity),
+                    "refill_per_second": round(limiter.rate, 4),
+                    "tracked_keys": limiter.tracked_keys(),
+                    "rejected": limiter.rejected
+                }
+        
+        return {
+            "hashing": self.hasher.get_metrics(),
+            "rate_limits": limiters,
+            "timestamp": datetime.now().isoformat()
+        }
+    
     def get_user_info(self, username: str) -> Optional[Dict]:
         """Get user information"""
         
-        users_data = self._load_users()
+        user_data = self.users.get(username)
         
-        if username not in users_data:
+        if user_data is None:
             return None
         
-        user_data = users_data[username]
         user = EnhancedUser.from_dict(user_data)
         
         # Remove sensitive data
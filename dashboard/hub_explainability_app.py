@@ -5,6 +5,7 @@ Comprehensive Assessment Tool for AI System Transparency
 Enhanced with detailed explanations, calculations, and visualizations
 """
 
+import os
 import sys
 import io
 import json
@@ -25,6 +26,19 @@ matplotlib.use('Agg')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Module 5 integration: score-change push and conditional (ETag) responses
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from module5.events import HubEventPublisher
+    from module5.conditional import conditional_json
+    event_publisher = HubEventPublisher("L4")
+except ImportError as e:
+    logger.warning(f"Module 5 integration disabled: {e}")
+    event_publisher = None
+
+    def conditional_json(view):
+        return view
+
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False
 
@@ -949,6 +963,7 @@ def get_categories():
 
 
 @app.route('/api/transparency-score')
+@conditional_json
 def get_score():
     """Get Transparency Score (TS) using formal weighted formula."""
     try:
@@ -963,6 +978,8 @@ def get_score():
             "timestamp": datetime.now().isoformat()
         }
         logger.info(f"Returning transparency score: {ts}")
+        if event_publisher:
+            event_publisher.publish_score(ts)
         return jsonify(response_data)
     except Exception as e:
         logger.error(f"Error in /api/transparency-score: {e}", exc_info=True)
@@ -970,6 +987,7 @@ def get_score():
 
 
 @app.route('/api/explainability-metrics', methods=['GET'])
+@conditional_json
 def get_explainability_metrics():
     """
     Returns all key explainability metrics:
@@ -1783,6 +1801,10 @@ HTML_TEMPLATE = '''
 '''
 
 if __name__ == '__main__':
+    # Category scores are fixed for the life of the process: push TS once at startup
+    if event_publisher:
+        event_publisher.publish_score(compute_transparency_score(get_explainability_block_scores()))
+
     try:
         app.run(host='0.0.0.0', port=5000, debug=False,
                 use_reloader=False, threaded=True)
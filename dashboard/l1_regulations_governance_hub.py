@@ -16,6 +16,7 @@ Features:
 from flask import Flask, render_template_string, jsonify, request
 import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -45,6 +46,19 @@ except ImportError as e:
     EvidenceManager = None
     RegulationUpdateService = None
 
+# Module 5 integration: score-change push and conditional (ETag) responses
+sys.path.insert(0, str(Path(__file__).parent.parent))
+try:
+    from module5.events import HubEventPublisher
+    from module5.conditional import conditional_json
+    event_publisher = HubEventPublisher("L1")
+except ImportError as e:
+    print(f"Warning: Module 5 integration disabled: {e}")
+    event_publisher = None
+
+    def conditional_json(view):
+        return view
+
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max upload
 
@@ -58,6 +72,11 @@ update_service = RegulationUpdateService() if RegulationUpdateService else None
 drift_monitor = ComplianceDriftMonitor(update_service=update_service) if ComplianceDriftMonitor else None
 evidence_manager = EvidenceManager() if EvidenceManager else None
 
+# Memoized compliance snapshot (compliance map, SDLC status, GMI, CRS) shared by
+# all endpoints; rebuilt lazily after evidence uploads or regulation changes
+_compliance_snapshot = None
+_compliance_snapshot_lock = threading.Lock()
+
 # Start update service scheduler if available
 if update_service:
     try:
@@ -109,47 +128,40 @@ def api_compliance_map():
     if not mapping_engine:
         return jsonify({"error": "Mapping engine not available"}), 500
     
-    compliance_map = mapping_engine.get_compliance_map()
+    compliance_map = get_compliance_snapshot()["compliance_map"]
     return jsonify(compliance_map)
 
 @app.route('/api/crs')
+@conditional_json
 def api_crs():
     """Get Compliance Readiness Score (CRS)."""
     if not crs_engine:
         return jsonify({"error": "CRS engine not available"}), 500
     
-    # Get required data
-    compliance_map = mapping_engine.get_compliance_map() if mapping_engine else None
-    sdlc_status = sdlc_tracker.get_sdlc_status(compliance_map) if sdlc_tracker else None
-    gmi_result = governance_maturity.assess_maturity(get_governance_indicators()) if governance_maturity else None
-    gmi_score = gmi_result.get("gmi", 3.0) if gmi_result else 3.0
-    
-    crs_result = crs_engine.calculate_crs(
-        compliance_map=compliance_map,
-        sdlc_status=sdlc_status,
-        gmi_score=gmi_score
-    )
+    crs_result = calculate_current_crs()
+    if event_publisher:
+        event_publisher.publish_score(crs_result.get("crs"))
     
     return jsonify(crs_result)
 
 @app.route('/api/sdlc-status')
+@conditional_json
 def api_sdlc_status():
     """Get SDLC compliance status."""
     if not sdlc_tracker:
         return jsonify({"error": "SDLC tracker not available"}), 500
     
-    compliance_map = mapping_engine.get_compliance_map() if mapping_engine else None
-    sdlc_status = sdlc_tracker.get_sdlc_status(compliance_map)
+    sdlc_status = get_compliance_snapshot()["sdlc_status"]
     return jsonify(sdlc_status)
 
 @app.route('/api/gmi')
+@conditional_json
 def api_gmi():
     """Get Governance Maturity Index."""
     if not governance_maturity:
         return jsonify({"error": "Governance maturity engine not available"}), 500
     
-    indicators = get_governance_indicators()
-    gmi_result = governance_maturity.assess_maturity(indicators)
+    gmi_result = get_compliance_snapshot()["gmi"]
     return jsonify(gmi_result)
 
 @app.route('/api/risk-classification', methods=['GET', 'POST'])
@@ -258,6 +270,8 @@ def api_approve_regulation(change_id):
         success = update_service.approve_change(change_id, reviewed_by)
         
         if success:
+            invalidate_compliance_snapshot(reload_clauses=True)
+            publish_crs_change()
             return jsonify({
                 "success": True,
                 "message": f"Change {change_id} approved and version activated",
@@ -279,6 +293,8 @@ def api_reject_regulation(change_id):
         success = update_service.reject_change(change_id, reviewed_by)
         
         if success:
+            invalidate_compliance_snapshot()
+            publish_crs_change()
             return jsonify({
                 "success": True,
                 "message": f"Change {change_id} rejected",
@@ -340,6 +356,8 @@ def api_evidence_upload():
         # Clean up temp file
         os.unlink(tmp_path)
         
+        invalidate_compliance_snapshot()
+        publish_crs_change()
         return jsonify(evidence)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -366,6 +384,7 @@ def api_evidence_list():
     return jsonify({"evidence": evidence})
 
 @app.route('/api/summary')
+@conditional_json
 def api_summary():
     """Get comprehensive summary for Module 5 integration."""
     summary = {
@@ -381,16 +400,8 @@ def api_summary():
     # Get CRS
     if crs_engine:
         try:
-            compliance_map = mapping_engine.get_compliance_map() if mapping_engine else None
-            sdlc_status = sdlc_tracker.get_sdlc_status(compliance_map) if sdlc_tracker else None
-            gmi_result = governance_maturity.assess_maturity(get_governance_indicators()) if governance_maturity else None
-            gmi_score = gmi_result.get("gmi", 3.0) if gmi_result else 3.0
-            
-            crs_result = crs_engine.calculate_crs(
-                compliance_map=compliance_map,
-                sdlc_status=sdlc_status,
-                gmi_score=gmi_score
-            )
+            # Copy: the penalty below must not leak into the shared snapshot
+            crs_result = dict(get_compliance_snapshot()["crs"])
             
             # Apply penalty for pending regulation changes if not auto-apply enabled
             if not AUTO_APPLY_REGULATION_UPDATES and update_service:
@@ -429,7 +440,7 @@ def api_summary():
     # Get GMI
     if governance_maturity:
         try:
-            gmi_result = governance_maturity.assess_maturity(get_governance_indicators())
+            gmi_result = get_compliance_snapshot()["gmi"]
             summary["gmi"] = gmi_result.get("gmi", 0)
         except:
             pass
@@ -437,8 +448,7 @@ def api_summary():
     # Get SDLC score
     if sdlc_tracker:
         try:
-            compliance_map = mapping_engine.get_compliance_map() if mapping_engine else None
-            sdlc_status = sdlc_tracker.get_sdlc_status(compliance_map)
+            sdlc_status = get_compliance_snapshot()["sdlc_status"]
             summary["sdlc_score"] = sdlc_status.get("overall_score", 0)
         except:
             pass
@@ -468,20 +478,12 @@ def api_summary():
 
 # Legacy endpoints for backward compatibility
 @app.route('/api/score')
+@conditional_json
 def api_score():
     """Legacy endpoint - returns overall score."""
     if crs_engine:
         try:
-            compliance_map = mapping_engine.get_compliance_map() if mapping_engine else None
-            sdlc_status = sdlc_tracker.get_sdlc_status(compliance_map) if sdlc_tracker else None
-            gmi_result = governance_maturity.assess_maturity(get_governance_indicators()) if governance_maturity else None
-            gmi_score = gmi_result.get("gmi", 3.0) if gmi_result else 3.0
-            
-            crs_result = crs_engine.calculate_crs(
-                compliance_map=compliance_map,
-                sdlc_status=sdlc_status,
-                gmi_score=gmi_score
-            )
+            crs_result = calculate_current_crs()
             overall_score = crs_result.get("crs", 87)
         except:
             overall_score = 87
@@ -519,7 +521,7 @@ def api_governance():
     """Legacy endpoint - returns governance details."""
     if governance_maturity:
         try:
-            gmi_result = governance_maturity.assess_maturity(get_governance_indicators())
+            gmi_result = get_compliance_snapshot()["gmi"]
             return jsonify({
                 'executive_oversight': 'Active',
                 'audit_frequency': 'Quarterly',
@@ -539,6 +541,7 @@ def api_governance():
     })
 
 @app.route('/api/status')
+@conditional_json
 def api_status():
     """System status endpoint."""
     pending_updates_count = 0
@@ -571,6 +574,57 @@ def api_status():
 # HELPER FUNCTIONS
 # ============================================================================
 
+def get_compliance_snapshot():
+    """
+    Get the shared compliance snapshot, building it on first use.
+    
+    The compliance map, SDLC status, GMI and CRS are computed once, in that
+    order, and reused by every endpoint until invalidate_compliance_snapshot()
+    is called. Callers must treat the returned dicts as read-only.
+    """
+    global _compliance_snapshot
+    with _compliance_snapshot_lock:
+        if _compliance_snapshot is None:
+            compliance_map = mapping_engine.get_compliance_map() if mapping_engine else None
+            sdlc_status = sdlc_tracker.get_sdlc_status(compliance_map) if sdlc_tracker else None
+            gmi_result = governance_maturity.assess_maturity(get_governance_indicators()) if governance_maturity else None
+            gmi_score = gmi_result.get("gmi", 3.0) if gmi_result else 3.0
+            
+            crs_result = crs_engine.calculate_crs(
+                compliance_map=compliance_map,
+                sdlc_status=sdlc_status,
+                gmi_score=gmi_score
+            ) if crs_engine else None
+            
+            _compliance_snapshot = {
+                "compliance_map": compliance_map,
+                "sdlc_status": sdlc_status,
+                "gmi": gmi_result,
+                "crs": crs_result
+            }
+        return _compliance_snapshot
+
+def invalidate_compliance_snapshot(reload_clauses=False):
+    """Drop the compliance snapshot after evidence or regulation changes."""
+    global _compliance_snapshot
+    with _compliance_snapshot_lock:
+        if reload_clauses and mapping_engine:
+            mapping_engine.reload_clauses()
+        _compliance_snapshot = None
+
+def calculate_current_crs():
+    """Get the current Compliance Readiness Score (CRS)."""
+    return get_compliance_snapshot()["crs"]
+
+def publish_crs_change():
+    """Recompute CRS after evidence or regulation changes and push it to Module 5."""
+    if not (event_publisher and crs_engine):
+        return
+    try:
+        event_publisher.publish_score(calculate_current_crs().get("crs"))
+    except Exception as e:
+        print(f"Warning: Could not publish CRS change: {e}")
+
 def get_governance_indicators():
     """Get current governance indicators (would come from actual system)."""
     return {
@@ -605,7 +659,7 @@ def get_current_regulation_scores():
     """Get current regulation compliance scores."""
     if mapping_engine:
         try:
-            compliance_map = mapping_engine.get_compliance_map()
+            compliance_map = get_compliance_snapshot()["compliance_map"]
             scores = {}
             for framework_id, framework_data in compliance_map.get("frameworks", {}).items():
                 scores[framework_id] = {"score": framework_data.get("overall_score", 0)}
@@ -1521,4 +1575,7 @@ if __name__ == '__main__':
     print("Evidence Management, Compliance Drift Monitoring, Module 5 Integration")
     print("Access: http://127.0.0.1:8504")
     
+    # Push the starting CRS; evidence and regulation writes push later changes
+    publish_crs_change()
+    
     app.run(host='127.0.0.1', port=8504, debug=False, use_reloader=False, threaded=True)
@@ -34,6 +34,19 @@ except ImportError as e:
     AlertGenerator = None
 import random
 
+# Module 5 integration: score-change push and conditional (ETag) responses
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from module5.events import HubEventPublisher
+    from module5.conditional import conditional_json
+    event_publisher = HubEventPublisher("L3_FAIRNESS")
+except ImportError as e:
+    print(f"Warning: Module 5 integration disabled: {e}")
+    event_publisher = None
+
+    def conditional_json(view):
+        return view
+
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
@@ -465,6 +478,7 @@ def health():
 
 
 @app.route("/api/fairness-metrics", methods=["GET"])
+@conditional_json
 def get_fairness_metrics():
     """
     Returns detailed fairness metrics per protected attribute and overall FI.
@@ -484,6 +498,7 @@ def get_fairness_metrics():
 
 
 @app.route("/api/fi", methods=["GET"])
+@conditional_json
 def get_fairness_index():
     """
     Returns only the overall Fairness Index.
@@ -493,6 +508,9 @@ def get_fairness_index():
         attr_metrics = compute_all_attribute_metrics(records)
         fi_result = compute_fairness_index(attr_metrics)
         
+        if event_publisher:
+            event_publisher.publish_score(fi_result["fairness_index"])
+        
         return jsonify({
             "fairness_index": fi_result["fairness_index"],
             "timestamp": datetime.now().isoformat()
@@ -502,6 +520,7 @@ def get_fairness_index():
 
 
 @app.route("/api/eml", methods=["GET"])
+@conditional_json
 def get_ethical_maturity():
     """
     Returns Ethical Maturity Level (EML) and associated score.
@@ -610,6 +629,7 @@ def get_advanced_fairness_metrics():
 
 
 @app.route("/api/summary", methods=["GET"])
+@conditional_json
 def get_summary():
     """Get summary for Module 5 integration."""
     try:
@@ -1304,5 +1324,11 @@ if __name__ == '__main__':
     print("> Press CTRL+C to stop")
     print()
     
+    # Prediction records are loaded once per process: push FI once at startup
+    if event_publisher:
+        event_publisher.publish_score(
+            compute_fairness_index(compute_all_attribute_metrics(load_prediction_records()))["fairness_index"]
+        )
+    
     app.run(host='127.0.0.1', port=8506, debug=False, use_reloader=False, threaded=True)
 
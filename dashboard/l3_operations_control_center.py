@@ -34,10 +34,27 @@ import base64
 import io
 import matplotlib.pyplot as plt
 from pathlib import Path
+import sys
+
+# Module 5 integration: score-change push and conditional (ETag) responses
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+try:
+    from module5.events import HubEventPublisher
+    from module5.conditional import conditional_json
+    event_publisher = HubEventPublisher("L3_OPS")
+except ImportError as e:
+    print(f"Warning: Module 5 integration disabled: {e}")
+    event_publisher = None
+
+    def conditional_json(view):
+        return view
 
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False
 
+# Phase statuses that count towards the operations score
+HEALTHY_PHASE_STATUSES = {'OPERATIONAL', 'READY', 'MONITORED'}
+
 # ============================================================================
 # PHASE 1: ARCHITECTURE OVERVIEW
 # ============================================================================
@@ -367,23 +384,42 @@ def dashboard():
     return render_template_string(L3_DASHBOARD_HTML)
 
 
+def get_all_phase_statuses():
+    """Status of all 8 phases, in phase order"""
+    return [
+        get_architecture_status(),
+        get_database_status(),
+        get_scrapers_status(),
+        get_nlp_status(),
+        get_compliance_status(),
+        get_monitoring_status(),
+        get_api_status(),
+        get_testing_status()
+    ]
+
+
+def compute_ops_score(phases=None):
+    """Operations score (0-100): share of phases in a healthy status"""
+    phases = phases if phases is not None else get_all_phase_statuses()
+    healthy_phases = sum(1 for phase in phases if phase.get('status') in HEALTHY_PHASE_STATUSES)
+    return round(healthy_phases / len(phases) * 100, 1)
+
+
 @app.route('/api/status')
+@conditional_json
 def api_status():
     """Get complete system status"""
+    phases = get_all_phase_statuses()
+    ops_score = compute_ops_score(phases)
+
     all_status = {
         'timestamp': datetime.now().isoformat(),
         'system_health': 'OPERATIONAL',
-        'phases': [
-            get_architecture_status(),
-            get_database_status(),
-            get_scrapers_status(),
-            get_nlp_status(),
-            get_compliance_status(),
-            get_monitoring_status(),
-            get_api_status(),
-            get_testing_status()
-        ]
+        'ops_score': ops_score,
+        'phases': phases
     }
+    if event_publisher:
+        event_publisher.publish_score(ops_score)
     return jsonify(all_status)
 
 
@@ -408,6 +444,7 @@ def phase_detail(phase_id):
 
 
 @app.route('/api/health')
+@conditional_json
 def health():
     """Health check endpoint"""
     return jsonify({
@@ -1608,4 +1645,8 @@ API Endpoints:
 Starting Flask server...
     """)
 
+    # Phase statuses are fixed for the life of the process: push the ops score once at startup
+    if event_publisher:
+        event_publisher.publish_score(compute_ops_score())
+
     app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
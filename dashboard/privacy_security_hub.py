@@ -20,6 +20,27 @@ import base64
 from io import BytesIO
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import sys
+
+# Module 5 integration: score-change push and conditional (ETag) responses
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from module5.events import HubEventPublisher
+    from module5.conditional import conditional_json
+    event_publisher = HubEventPublisher("L2")
+except ImportError as e:
+    print(f"Warning: Module 5 integration disabled: {e}")
+    event_publisher = None
+
+    def conditional_json(view):
+        return view
+
+try:
+    from security.adversarial_tests import get_attack_result_cache
+except ImportError as e:
+    print(f"Warning: Robustness curves not available: {e}")
+    get_attack_result_cache = None
 
 app = Flask(__name__)
 
@@ -885,6 +906,7 @@ def get_module_details(module_name):
 
 
 @app.route('/api/sai')
+@conditional_json
 def get_sai():
     """Get overall SAI score breakdown using formal category-based weighted formula."""
     module_scores = get_module_scores()
@@ -894,6 +916,9 @@ def get_sai():
     # Also compute simple average for comparison
     simple_avg = sum(module_scores.values()) / len(module_scores) if module_scores else 0
     
+    if event_publisher:
+        event_publisher.publish_score(sai_result['sai'])
+    
     return jsonify({
         'sai': sai_result['sai'],
         'overall_sai': sai_result['sai'],  # For backward compatibility
@@ -909,6 +934,7 @@ def get_sai():
 
 
 @app.route('/api/metrics', methods=['GET'])
+@conditional_json
 def get_l2_metrics():
     """
     Returns main L2 metrics:
@@ -938,9 +964,26 @@ def get_l2_metrics():
         "timestamp": datetime.now().isoformat()
     }
     
+    if event_publisher:
+        event_publisher.publish_score(sai_result["sai"])
+    
     return jsonify(response)
 
 
+@app.route('/api/robustness-curve/<model_checksum>')
+@conditional_json
+def get_robustness_curve(model_checksum):
+    """Latest cached accuracy-vs-epsilon curve for a model (attacks are never run here)"""
+    if get_attack_result_cache is None:
+        return jsonify({'error': 'Robustness curves not available'}), 503
+
+    attack = request.args.get('attack', 'pgd').lower()
+    curve = get_attack_result_cache().latest(model_checksum, f'robustness_{attack}')
+    if curve is None:
+        return jsonify({'error': 'No robustness curve cached for this model'}), 404
+    return jsonify(curve)
+
+
 # ============================================================================
 # HTML TEMPLATE WITH ENHANCED STYLING
 # ============================================================================
@@ -1277,4 +1320,8 @@ if __name__ == '__main__':
     print("> Running on http://127.0.0.1:8502")
     print("> Press CTRL+C to stop\n")
     
+    # Module scores are fixed for the life of the process: push SAI once at startup
+    if event_publisher:
+        event_publisher.publish_score(compute_sai(get_module_scores())['sai'])
+    
     app.run(host='127.0.0.1', port=8502, debug=False)
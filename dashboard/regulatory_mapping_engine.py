@@ -6,7 +6,7 @@ Evaluates compliance status for all regulatory frameworks and clauses.
 import json
 import os
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 class RegulatoryMappingEngine:
@@ -18,6 +18,7 @@ class RegulatoryMappingEngine:
         self.config_path = Path(config_path)
         self.clauses = self._load_clauses()
         self.frameworks = list(self.clauses.get("frameworks", {}).keys())
+        self._clause_index = self._build_clause_index()
     
     def _load_clauses(self) -> Dict:
         """Load regulation clauses from JSON configuration."""
@@ -31,6 +32,24 @@ class RegulatoryMappingEngine:
             print(f"Error parsing JSON: {e}")
             return {"frameworks": {}}
     
+    def _build_clause_index(self) -> Dict[Tuple[str, str], Dict]:
+        """Index clauses by (framework, clause_id) for constant-time lookup."""
+        index = {}
+        for framework_id, framework_data in self.clauses.get("frameworks", {}).items():
+            for clause in framework_data.get("clauses", []):
+                index.setdefault((framework_id, clause.get("clause_id")), clause)
+        return index
+    
+    def reload_clauses(self):
+        """Reload regulation clauses from disk and rebuild the clause index."""
+        self.clauses = self._load_clauses()
+        self.frameworks = list(self.clauses.get("frameworks", {}).keys())
+        self._clause_index = self._build_clause_index()
+    
+    def get_clause(self, framework: str, clause_id: str) -> Optional[Dict]:
+        """Get a single clause definition by framework and clause ID."""
+        return self._clause_index.get((framework, clause_id))
+    
     def get_all_frameworks(self) -> List[Dict]:
         """Get list of all supported frameworks."""
         frameworks_list = []
@@ -78,12 +97,7 @@ class RegulatoryMappingEngine:
                 "error": f"Framework {framework} not found"
             }
         
-        clause = None
-        for c in framework_data.get("clauses", []):
-            if c.get("clause_id") == clause_id:
-                clause = c
-                break
-        
+        clause = self._clause_index.get((framework, clause_id))
         if not clause:
             return {
                 "compliant": False,
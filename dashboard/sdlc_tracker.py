@@ -62,6 +62,15 @@ class SDLCTracker:
             "phases": {}
         }
         
+        # Compliance by (framework, clause_id); first occurrence wins as before
+        compliant = {}
+        for framework_id, framework_compliance in compliance_map.get("frameworks", {}).items():
+            for comp_clause in framework_compliance.get("clauses", []):
+                compliant.setdefault(
+                    (framework_id, comp_clause.get("clause_id")),
+                    comp_clause.get("compliant", False)
+                )
+        
         for phase in self.phases:
             phase_data = self.get_clauses_by_phase(phase)
             
@@ -72,17 +81,9 @@ class SDLCTracker:
             if total_clauses > 0:
                 # Check compliance for each clause in this phase
                 for framework_id, clauses in phase_data["frameworks"].items():
-                    framework_compliance = compliance_map.get("frameworks", {}).get(framework_id, {})
-                    framework_clauses = framework_compliance.get("clauses", [])
-                    
                     for clause_info in clauses:
-                        clause_id = clause_info["clause_id"]
-                        # Find matching clause in compliance map
-                        for comp_clause in framework_clauses:
-                            if comp_clause.get("clause_id") == clause_id:
-                                if comp_clause.get("compliant", False):
-                                    compliant_clauses += 1
-                                break
+                        if compliant.get((framework_id, clause_info["clause_id"]), False):
+                            compliant_clauses += 1
             
             clause_coverage = (compliant_clauses / total_clauses * 100) if total_clauses > 0 else 0
             
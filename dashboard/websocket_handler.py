@@ -210,28 +210,40 @@ class WebSocketManager:
         }
     
     def start_background_updates(self, interval: int = 30):
-        """Start background thread for periodic updates"""
+        """
+        Start background thread for periodic reconciliation updates.
+        
+        Score changes pushed by the hubs are broadcast immediately through
+        notify_score_change(); this loop only re-collects hub data on the
+        given interval and broadcasts it when something actually changed.
+        """
         if self.running:
             return
         
         self.running = True
         
         def update_loop():
+            last_broadcast = None
             while self.running:
                 try:
                     if self.connected_clients:
                         # Collect fresh data
                         current_data = self._collect_current_data()
                         
-                        # Broadcast to all connected clients
-                        self.socketio.emit('data_update', current_data)
+                        # Broadcast to all connected clients only if hub data changed
+                        fingerprint = json.dumps(
+                            {name: hub.get("data", hub.get("status")) for name, hub in current_data["hubs"].items()},
+                            sort_keys=True, default=str
+                        )
+                        if fingerprint != last_broadcast:
+                            self.socketio.emit('data_update', current_data)
+                            last_broadcast = fingerprint
+                            logger.debug(f"Broadcasted update to {len(self.connected_clients)} clients")
                         
                         # Check for alerts and broadcast if any
                         alerts_data = self._get_alerts_data()
                         if alerts_data.get("alerts"):
                             self.socketio.emit('alert_update', alerts_data, room='alerts')
-                        
-                        logger.debug(f"Broadcasted update to {len(self.connected_clients)} clients")
                     
                     time.sleep(interval)
                 
@@ -243,6 +255,17 @@ class WebSocketManager:
         self.update_thread.start()
         logger.info(f"Started background updates with {interval}s interval")
     
+    def notify_score_change(self, event: Dict[str, Any], cqs: Optional[Dict[str, Any]] = None):
+        """Push a hub score-change event (and the recomputed CQS) to all clients"""
+        if not self.connected_clients:
+            return
+        self.socketio.emit('score_update', {
+            "event": event,
+            "cqs": cqs,
+            "timestamp": datetime.now().isoformat()
+        })
+        logger.debug(f"Pushed {event.get('hub')} score change to {len(self.connected_clients)} clients")
+    
     def stop_background_updates(self):
         """Stop background updates"""
         self.running = False
@@ -6,14 +6,21 @@ Ensures compliance with data minimization principles
 
 import os
 import json
-from typing import Dict, List, Tuple, Optional, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Tuple, Optional, Any
 from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta
+from pathlib import Path
 import logging
 import sqlite3
 
 logger = logging.getLogger(__name__)
 
+# Repository root; default paths resolve against it, not the working directory
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
 
 @dataclass
 class RetentionPolicy:
@@ -103,6 +110,38 @@ class RetentionPolicyManager:
             purge_on_deletion=True,
             description="Automatic database backups"
         ),
+        RetentionPolicy(
+            name="Generated Exports",
+            data_type="exports",
+            retention_days=30,  # 1 month
+            archive_after_days=0,
+            purge_on_deletion=True,
+            description="Dashboard and data subject exports"
+        ),
+        RetentionPolicy(
+            name="Generated Reports",
+            data_type="reports",
+            retention_days=180,  # 6 months
+            archive_after_days=0,
+            purge_on_deletion=False,
+            description="Scheduled PDF/HTML reports"
+        ),
+        RetentionPolicy(
+            name="Research Snapshots",
+            data_type="research",
+            retention_days=90,  # 3 months
+            archive_after_days=0,
+            purge_on_deletion=False,
+            description="Regulatory research and best-practice crawls"
+        ),
+        RetentionPolicy(
+            name="Evidence Uploads",
+            data_type="evidence",
+            retention_days=0,  # Permanent unless configured
+            archive_after_days=0,
+            purge_on_deletion=False,
+            description="Compliance evidence files"
+        ),
     ]
 
     def __init__(self, policies_file: str = "data/retention_policies.json"):
@@ -172,44 +211,548 @@ class RetentionPolicyManager:
             return False
 
 
+class DeletionLedger:
+    """
+    Append-only deletion audit ledger (one JSON record per line).
+
+    Recording a deletion appends and fsyncs a single line instead of
+    rewriting the whole log. The record count is kept in memory and recent
+    records are read from the end of the file, so reports stay cheap as the
+    ledger grows. A legacy deletion_log.json list is converted once.
+    """
+
+    def __init__(self, ledger_path: str, legacy_path: str = None):
+        self.ledger_path = ledger_path
+        self._lock = threading.Lock()
+        self._count: Optional[int] = None
+
+        directory = os.path.dirname(ledger_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if legacy_path and os.path.exists(legacy_path):
+            self._migrate(legacy_path)
+        elif self._is_json_list(ledger_path):
+            # Explicit path to an old-style JSON list: convert it in place
+            self._migrate(ledger_path)
+
+    @staticmethod
+    def _is_json_list(path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        with open(path, "r") as f:
+            return f.read(64).lstrip().startswith("[")
+
+    def _migrate(self, legacy_path: str):
+        try:
+            with open(legacy_path, "r") as f:
+                records = json.load(f)
+            if legacy_path == self.ledger_path:
+                os.replace(legacy_path, f"{legacy_path}.migrated")
+                legacy_path = f"{legacy_path}.migrated"
+            with open(self.ledger_path, "a") as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+            if not legacy_path.endswith(".migrated"):
+                os.replace(legacy_path, f"{legacy_path}.migrated")
+            logger.info(f"Migrated {len(records)} deletion records to {self.ledger_path}")
+        except Exception as e:
+            logger.error(f"Error migrating deletion log: {e}")
+
+    def append(self, record: Dict[str, Any]):
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            with open(self.ledger_path, "a") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if self._count is not None:
+                self._count += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._count is None:
+                count = 0
+                if os.path.exists(self.ledger_path):
+                    with open(self.ledger_path, "rb") as f:
+                        for block in iter(lambda: f.read(1 << 20), b""):
+                            count += block.count(b"\n")
+                self._count = count
+            return self._count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.ledger_path):
+            return
+        with open(self.ledger_path, "r") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def tail(self, n: int = 10) -> List[Dict[str, Any]]:
+        """Last n records, oldest first, read backwards from the end of the file"""
+        if n <= 0 or not os.path.exists(self.ledger_path):
+            return []
+        with open(self.ledger_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= n:
+                step = min(65536, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        records = []
+        for line in data.splitlines()[-n:]:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return records
+
+
+class ChunkedRetentionExecutor:
+    """
+    Runs retention deletes and archival in bounded, resumable batches.
+
+    Rather than one statement over every expired row, each batch covers the
+    next `batch_size` matching rows by rowid (keyset over the primary key),
+    commits, records a checkpoint and pauses for `pause_seconds`, so the
+    write lock is only ever held briefly and other writers interleave. With
+    a time budget a job stops early; the next run finishes that pass from
+    its checkpoint, using the original cutoff.
+    """
+
+    def __init__(self, database_path: str, batch_size: int = 5000,
+                 pause_seconds: float = 0.05, checkpoint_path: str = None):
+        self.database_path = database_path
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.checkpoint_path = checkpoint_path
+        self._checkpoints = self._load_checkpoints()
+
+    def _load_checkpoints(self) -> Dict[str, Dict[str, Any]]:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            try:
+                with open(self.checkpoint_path, "r") as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.error(f"Error loading retention checkpoints: {e}")
+        return {}
+
+    def _save_checkpoint(self, job: str, state: Optional[Dict[str, Any]]):
+        if state is None:
+            self._checkpoints.pop(job, None)
+        else:
+            self._checkpoints[job] = state
+        if not self.checkpoint_path:
+            return
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self._checkpoints, f, indent=2)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.database_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @staticmethod
+    def ensure_created_at_index(conn: sqlite3.Connection, table: str):
+        """Index created_at so expired rows are found without a table scan"""
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table} (created_at)")
+
+    def _run(self, job: str, table: str, where: str, cutoff: str,
+             apply_batch: Callable[[sqlite3.Connection, int, int, str], int],
+             time_budget_seconds: Optional[float]) -> Dict[str, Any]:
+        started = time.monotonic()
+        conn = self._connect()
+        try:
+            self.ensure_created_at_index(conn, table)
+
+            checkpoint = self._checkpoints.get(job)
+            if checkpoint:
+                cutoff = checkpoint["cutoff"]
+                low, end = checkpoint["next_rowid"], checkpoint["end_rowid"]
+                total = checkpoint.get("processed", 0)
+            else:
+                low, end = conn.execute(
+                    f"SELECT MIN(rowid), MAX(rowid) FROM {table} WHERE {where}", (cutoff,)).fetchone()
+                if low is None:
+                    return {"processed": 0, "batches": 0, "completed": True, "resumed": False,
+                            "cutoff": cutoff}
+                low -= 1
+                total = 0
+
+            processed = 0
+            batches = 0
+            completed = True
+            while True:
+                high = conn.execute(
+                    f"SELECT MAX(rowid) FROM (SELECT rowid FROM {table} "
+                    f"WHERE rowid > ? AND rowid <= ? AND {where} ORDER BY rowid LIMIT ?)",
+                    (low, end, cutoff, self.batch_size)).fetchone()[0]
+                if high is None:
+                    break
+
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    count = apply_batch(conn, low, high, cutoff)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                processed += count
+                total += count
+                batches += 1
+                low = high
+                self._save_checkpoint(job, {
+                    "cutoff": cutoff,
+                    "next_rowid": low,
+                    "end_rowid": end,
+                    "processed": total,
+                    "updated_at": datetime.now().isoformat()
+                })
+
+                if time_budget_seconds is not None and time.monotonic() - started >= time_budget_seconds:
+                    completed = False
+                    break
+                if self.pause_seconds:
+                    time.sleep(self.pause_seconds)
+
+            if completed:
+                self._save_checkpoint(job, None)
+            return {"processed": processed, "batches": batches, "completed": completed,
+                    "resumed": bool(checkpoint), "cutoff": cutoff}
+        finally:
+            conn.close()
+
+    def purge(self, table: str, cutoff: str, job: str = None,
+              time_budget_seconds: float = None) -> Dict[str, Any]:
+        """Delete rows with created_at < cutoff in batches"""
+        def delete_batch(conn, low, high, batch_cutoff):
+            return conn.execute(
+                f"DELETE FROM {table} WHERE rowid > ? AND rowid <= ? AND created_at < ?",
+                (low, high, batch_cutoff)).rowcount
+
+        return self._run(job or f"purge:{table}", table, "created_at < ?", cutoff,
+                         delete_batch, time_budget_seconds)
+
+    def archive(self, table: str, archive_table: str, cutoff: str, job: str = None,
+                time_budget_seconds: float = None) -> Dict[str, Any]:
+        """Copy rows with created_at < cutoff into archive_table and mark them archived"""
+        where = "created_at < ? AND status != 'archived'"
+
+        def archive_batch(conn, low, high, batch_cutoff):
+            params = (low, high, batch_cutoff)
+            count = conn.execute(
+                f"INSERT INTO {archive_table} SELECT * FROM {table} "
+                f"WHERE rowid > ? AND rowid <= ? AND {where}", params).rowcount
+            conn.execute(
+                f"UPDATE {table} SET status = 'archived' WHERE rowid > ? AND rowid <= ? AND {where}", params)
+            return count
+
+        return self._run(job or f"archive:{table}", table, where, cutoff,
+                         archive_batch, time_budget_seconds)
+
+
+class FilePurgeEngine:
+    """
+    Deletes expired files under retention-managed directories.
+
+    Directories are walked with os.scandir (one stat per entry, no
+    datetime conversion) and expired files are removed by a small thread
+    pool in bounded batches. With a manifest, every known file's expiry is
+    kept in an SQLite table ordered by expires_at, and a run only rescans
+    directories whose mtime changed (files added, removed or renamed), then
+    visits just the files that are due. Each candidate is re-stat'ed before
+    deletion, so a file modified in place is rescheduled rather than lost.
+    """
+
+    def __init__(self, manifest_path: str = None, workers: int = 4, batch_size: int = 256):
+        self.manifest_path = manifest_path
+        self.workers = workers
+        self.batch_size = batch_size
+        self._conn = None
+        if manifest_path:
+            directory = os.path.dirname(manifest_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(manifest_path, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._init_database()
+
+    def _init_database(self):
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS manifest_files (
+                path TEXT PRIMARY KEY,
+                root TEXT NOT NULL,
+                directory TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_manifest_files_expiry ON manifest_files (root, expires_at)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_manifest_files_directory ON manifest_files (directory)")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS manifest_dirs (
+                path TEXT PRIMARY KEY,
+                root TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS manifest_roots (
+                root TEXT PRIMARY KEY,
+                max_age_seconds REAL NOT NULL
+            )
+        ''')
+
+    # -- scanning --
+
+    @staticmethod
+    def _scan_directory(path: str) -> Tuple[List[Tuple[str, float, int]], List[str]]:
+        """Files (path, mtime, size) and subdirectories directly under `path`"""
+        files, subdirs = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        files.append((entry.path, st.st_mtime, st.st_size))
+                except OSError:
+                    continue
+        return files, subdirs
+
+    def _walk_expired(self, root: str, cutoff: float) -> Iterator[Tuple[str, int]]:
+        """(path, size) of files under root older than cutoff, without a manifest"""
+        stack = [root]
+        while stack:
+            try:
+                files, subdirs = self._scan_directory(stack.pop())
+            except OSError:
+                continue
+            stack.extend(subdirs)
+            for path, mtime, size in files:
+                if mtime < cutoff:
+                    yield path, size
+
+    def _refresh_manifest(self, root: str, max_age: float):
+        """Bring the manifest for `root` up to date, rescanning only changed directories"""
+        conn = self._conn
+        known_dirs = dict(conn.execute(
+            "SELECT path, mtime_ns FROM manifest_dirs WHERE root = ?", (root,)).fetchall())
+        known_children: Dict[str, List[str]] = {}
+        for known in known_dirs:
+            known_children.setdefault(os.path.dirname(known), []).append(known)
+
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute(
+                "SELECT max_age_seconds FROM manifest_roots WHERE root = ?", (root,)).fetchone()
+            if row is None or row[0] != max_age:
+                # Policy changed: recompute every expiry for this root
+                conn.execute("INSERT OR REPLACE INTO manifest_roots (root, max_age_seconds) VALUES (?, ?)",
+                             (root, max_age))
+                conn.execute("UPDATE manifest_files SET expires_at = mtime + ? WHERE root = ?",
+                             (max_age, root))
+
+            stack = [root]
+            seen = set()
+            while stack:
+                directory = stack.pop()
+                seen.add(directory)
+                try:
+                    mtime_ns = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                if known_dirs.get(directory) == mtime_ns:
+                    # Unchanged: its subdirectories are those already known
+                    stack.extend(known_children.get(directory, ()))
+                    continue
+
+                try:
+                    files, subdirs = self._scan_directory(directory)
+                except OSError:
+                    continue
+                stack.extend(subdirs)
+                conn.execute("DELETE FROM manifest_files WHERE directory = ?", (directory,))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO manifest_files (path, root, directory, mtime, size, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(path, root, directory, mtime, size, mtime + max_age) for path, mtime, size in files])
+                conn.execute("INSERT OR REPLACE INTO manifest_dirs (path, root, mtime_ns) VALUES (?, ?, ?)",
+                             (directory, root, mtime_ns))
+
+            # Directories that disappeared take their files with them
+            gone = [(d,) for d in known_dirs if d not in seen]
+            if gone:
+                conn.executemany("DELETE FROM manifest_files WHERE directory = ?", gone)
+                conn.executemany("DELETE FROM manifest_dirs WHERE path = ?", gone)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _manifest_expired(self, root: str, max_age: float, now: float) -> Iterator[Tuple[str, int]]:
+        """(path, size) of files the manifest says are due, re-checked on disk"""
+        self._refresh_manifest(root, max_age)
+        due = self._conn.execute(
+            "SELECT path, mtime FROM manifest_files WHERE root = ? AND expires_at <= ? ORDER BY expires_at",
+            (root, now)).fetchall()
+
+        stale, rescheduled = [], []
+        for path, recorded_mtime in due:
+            try:
+                st = os.stat(path)
+            except OSError:
+                stale.append((path,))
+                continue
+            if st.st_mtime + max_age > now:
+                rescheduled.append((st.st_mtime, st.st_size, st.st_mtime + max_age, path))
+                continue
+            yield path, st.st_size
+
+        if stale or rescheduled:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM manifest_files WHERE path = ?", stale)
+            self._conn.executemany(
+                "UPDATE manifest_files SET mtime = ?, size = ?, expires_at = ? WHERE path = ?", rescheduled)
+            self._conn.execute("COMMIT")
+
+    # -- deletion --
+
+    @staticmethod
+    def _delete_batch(batch: List[Tuple[str, int]]) -> Tuple[List[str], int, List[str]]:
+        deleted, freed, errors = [], 0, []
+        for path, size in batch:
+            try:
+                os.remove(path)
+                deleted.append(path)
+                freed += size
+            except FileNotFoundError:
+                deleted.append(path)
+            except OSError as e:
+                errors.append(f"{path}: {e}")
+        return deleted, freed, errors
+
+    def purge(self, targets: List[Tuple[str, float]], now: float = None) -> Dict[str, Any]:
+        """
+        Delete files older than each target's max age.
+
+        Args:
+            targets: (directory, max_age_seconds) pairs
+            now: Reference time (epoch seconds), default the current time
+
+        Returns:
+            Dict with deleted / bytes_freed totals, per-directory counts and errors
+        """
+        now = time.time() if now is None else now
+        result = {"deleted": 0, "bytes_freed": 0, "by_directory": {}, "errors": []}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for root, max_age in targets:
+                if not os.path.isdir(root):
+                    continue
+                root = os.path.normpath(root)
+                if self._conn is not None:
+                    candidates = self._manifest_expired(root, max_age, now)
+                else:
+                    candidates = self._walk_expired(root, now - max_age)
+
+                removed = []
+                pending = []
+                batch = []
+
+                def collect(future):
+                    deleted, freed, errors = future.result()
+                    removed.extend(deleted)
+                    result["bytes_freed"] += freed
+                    result["errors"].extend(errors)
+
+                for candidate in candidates:
+                    batch.append(candidate)
+                    if len(batch) >= self.batch_size:
+                        pending.append(pool.submit(self._delete_batch, batch))
+                        batch = []
+                        # Keep a bounded number of batches in flight
+                        if len(pending) >= self.workers * 2:
+                            collect(pending.pop(0))
+                if batch:
+                    pending.append(pool.submit(self._delete_batch, batch))
+                for future in pending:
+                    collect(future)
+
+                if self._conn is not None and removed:
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany("DELETE FROM manifest_files WHERE path = ?",
+                                           [(path,) for path in removed])
+                    self._conn.execute("COMMIT")
+
+                result["by_directory"][root] = len(removed)
+                result["deleted"] += len(removed)
+
+        return result
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+
+
 class DataRetentionManager:
     """Manages data retention and automated deletion"""
 
-    def __init__(self, data_dir: str = "data", database_path: str = None,
-                 deletion_log_path: str = None):
+    def __init__(self, data_dir: str = None, database_path: str = None,
+                 deletion_log_path: str = None, batch_size: int = 5000,
+                 batch_pause_seconds: float = 0.05, time_budget_seconds: float = None,
+                 managed_directories: Dict[str, str] = None, purge_workers: int = 4,
+                 file_manifest: bool = True):
+        data_dir = data_dir or str(PROJECT_ROOT / "data")
         self.data_dir = data_dir
         self.database_path = database_path or f"{data_dir}/iraqaf_compliance.db"
-        self.deletion_log_path = deletion_log_path or f"{data_dir}/deletion_log.json"
+        self.deletion_log_path = deletion_log_path or f"{data_dir}/deletion_log.jsonl"
+        self.time_budget_seconds = time_budget_seconds
 
         os.makedirs(data_dir, exist_ok=True)
 
         self.policy_manager = RetentionPolicyManager(
             f"{data_dir}/retention_policies.json")
-        self.deletion_log = self._load_deletion_log()
+        self.ledger = DeletionLedger(
+            self.deletion_log_path, legacy_path=f"{data_dir}/deletion_log.json")
+        self.executor = ChunkedRetentionExecutor(
+            self.database_path,
+            batch_size=batch_size,
+            pause_seconds=batch_pause_seconds,
+            checkpoint_path=f"{data_dir}/retention_checkpoints.json"
+        )
+
+        # Directory -> retention policy data_type for file purges
+        self.managed_directories = managed_directories or {
+            f"{data_dir}/temp": "temp",
+            f"{data_dir}/gdpr/exports": "exports",
+            str(PROJECT_ROOT / "exports"): "exports",
+            str(PROJECT_ROOT / "reports" / "generated"): "reports",
+            f"{data_dir}/research": "research",
+            str(PROJECT_ROOT / "evidence"): "evidence",
+        }
+        self.file_purger = FilePurgeEngine(
+            manifest_path=f"{data_dir}/retention_manifest.db" if file_manifest else None,
+            workers=purge_workers
+        )
 
-    def _load_deletion_log(self) -> List[Dict[str, Any]]:
-        """Load deletion audit log"""
-        if os.path.exists(self.deletion_log_path):
-            try:
-                with open(self.deletion_log_path, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading deletion log: {e}")
-                return []
-        return []
-
-    def _save_deletion_log(self):
-        """Save deletion audit log"""
-        try:
-            with open(self.deletion_log_path, "w") as f:
-                json.dump(self.deletion_log, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving deletion log: {e}")
+    @property
+    def deletion_log(self) -> List[Dict[str, Any]]:
+        """Full deletion history (reads the whole ledger)"""
+        return list(self.ledger)
 
     def _log_deletion(self, record: DeletionRecord):
         """Log data deletion"""
-        self.deletion_log.append(record.to_dict())
-        self._save_deletion_log()
+        self.ledger.append(record.to_dict())
 
     def purge_expired_logs(self) -> Tuple[int, str]:
         """
@@ -226,21 +769,19 @@ class DataRetentionManager:
             if not os.path.exists(self.database_path):
                 return 0, "Database not found"
 
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-
             # Calculate cutoff date
             cutoff_date = datetime.now() - timedelta(days=policy.retention_days)
 
-            # Delete logs older than policy
-            cursor.execute("""
-                DELETE FROM activity_logs
-                WHERE created_at < ?
-            """, (cutoff_date.isoformat(),))
+            # Delete logs older than policy, in bounded batches
+            result = self.executor.purge(
+                "activity_logs", cutoff_date.isoformat(),
+                time_budget_seconds=self.time_budget_seconds)
+            deleted_count = result["processed"]
+            cutoff = datetime.fromisoformat(result["cutoff"])
 
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+            details = f"Deleted logs older than {cutoff.date()} in {result['batches']} batches"
+            if not result["completed"]:
+                details += " (time budget reached, will resume)"
 
             # Log deletion
             deletion_record = DeletionRecord(
@@ -249,66 +790,97 @@ class DataRetentionManager:
                 record_count=deleted_count,
                 deletion_timestamp=datetime.now().isoformat(),
                 deletion_reason="retention_expired",
-                details=f"Deleted logs older than {cutoff_date.date()}"
+                details=details
             )
             self._log_deletion(deletion_record)
 
             logger.info(f"Purged {deleted_count} expired logs")
-            return deleted_count, f"Deleted {deleted_count} expired log records"
+            message = f"Deleted {deleted_count} expired log records"
+            if not result["completed"]:
+                message += " (partial, will resume on next run)"
+            return deleted_count, message
 
         except Exception as e:
             logger.error(f"Error purging logs: {e}")
             return 0, f"Error: {str(e)}"
 
-    def purge_temporary_data(self) -> Tuple[int, str]:
+    def purge_managed_files(self, data_types: List[str] = None,
+                            label: str = "expired files") -> Tuple[int, str]:
         """
-        Purge temporary data based on retention policy.
+        Purge expired files from all retention-managed directories.
+
+        Args:
+            data_types: Only purge directories mapped to these policy types
+            label: What the files are called in the returned message
 
         Returns:
             Tuple of (files_deleted, message)
         """
         try:
-            policy = self.policy_manager.get_policy("temp")
-            if not policy:
-                return 0, "No retention policy for temp data"
-
-            temp_dir = f"{self.data_dir}/temp"
-            if not os.path.exists(temp_dir):
-                return 0, "Temp directory not found"
-
-            cutoff_time = datetime.now() - timedelta(days=policy.retention_days)
-
-            deleted_count = 0
-            for filename in os.listdir(temp_dir):
-                filepath = os.path.join(temp_dir, filename)
-
-                if os.path.isfile(filepath):
-                    file_mtime = datetime.fromtimestamp(
-                        os.path.getmtime(filepath))
-
-                    if file_mtime < cutoff_time:
-                        os.remove(filepath)
-                        deleted_count += 1
-
-            # Log deletion
-            if deleted_count > 0:
+            targets = {}
+            for directory, data_type in self.managed_directories.items():
+                if data_types is not None and data_type not in data_types:
+                    continue
+                policy = self.policy_manager.get_policy(data_type)
+                if not policy or policy.retention_days == 0:
+                    continue
+                targets[directory] = (data_type, policy.retention_days)
+
+            if not targets:
+                return 0, "No retention policy for managed directories"
+
+            result = self.file_purger.purge(
+                [(directory, days * 86400) for directory, (_, days) in targets.items()])
+
+            # Log one deletion record per data type
+            deleted_by_type: Dict[str, int] = {}
+            for directory, (data_type, _) in targets.items():
+                count = result["by_directory"].get(os.path.normpath(directory), 0)
+                deleted_by_type[data_type] = deleted_by_type.get(data_type, 0) + count
+
+            for data_type, count in deleted_by_type.items():
+                if count == 0:
+                    continue
+                days = self.policy_manager.get_policy(data_type).retention_days
+                cutoff_time = datetime.now() - timedelta(days=days)
                 deletion_record = DeletionRecord(
                     deletion_id=f"DEL_{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                    data_type="temp",
-                    record_count=deleted_count,
+                    data_type=data_type,
+                    record_count=count,
                     deletion_timestamp=datetime.now().isoformat(),
                     deletion_reason="retention_expired",
-                    details=f"Deleted temp files older than {cutoff_time.date()}"
+                    details=f"Deleted {data_type} files older than {cutoff_time.date()}"
                 )
                 self._log_deletion(deletion_record)
 
-            logger.info(f"Purged {deleted_count} temporary files")
-            return deleted_count, f"Deleted {deleted_count} temporary files"
+            for error in result["errors"][:10]:
+                logger.warning(f"Could not delete {error}")
+
+            deleted_count = result["deleted"]
+            logger.info(f"Purged {deleted_count} expired files "
+                        f"({result['bytes_freed'] / 1024 / 1024:.1f} MB)")
+            return deleted_count, f"Deleted {deleted_count} {label}"
 
         except Exception as e:
-            logger.error(f"Error purging temporary data: {e}")
+            logger.error(f"Error purging files: {e}")
             return 0, f"Error: {str(e)}"
 
+    def purge_temporary_data(self) -> Tuple[int, str]:
+        """
+        Purge temporary data based on retention policy.
+
+        Returns:
+            Tuple of (files_deleted, message)
+        """
+        if not self.policy_manager.get_policy("temp"):
+            return 0, "No retention policy for temp data"
+
+        temp_dirs = [d for d, data_type in self.managed_directories.items() if data_type == "temp"]
+        if not any(os.path.exists(d) for d in temp_dirs):
+            return 0, "Temp directory not found"
+
+        return self.purge_managed_files(["temp"], label="temporary files")
+
     def archive_old_data(self, data_type: str) -> Tuple[int, str]:
         """
         Archive data based on retention policy.
@@ -324,34 +896,20 @@ class DataRetentionManager:
             if not os.path.exists(self.database_path):
                 return 0, "Database not found"
 
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-
             # Calculate cutoff date
             cutoff_date = datetime.now() - timedelta(days=policy.archive_after_days)
 
-            # Archive logs (move to archive table)
-            cursor.execute("""
-                INSERT INTO activity_logs_archive
-                SELECT * FROM activity_logs
-                WHERE created_at < ? AND status != 'archived'
-            """, (cutoff_date.isoformat(),))
-
-            archived_count = cursor.rowcount
-
-            # Mark as archived
-            if archived_count > 0:
-                cursor.execute("""
-                    UPDATE activity_logs
-                    SET status = 'archived'
-                    WHERE created_at < ?
-                """, (cutoff_date.isoformat(),))
-
-            conn.commit()
-            conn.close()
+            # Archive logs (copy to archive table, mark archived) in bounded batches
+            result = self.executor.archive(
+                "activity_logs", "activity_logs_archive", cutoff_date.isoformat(),
+                time_budget_seconds=self.time_budget_seconds)
+            archived_count = result["processed"]
 
             logger.info(f"Archived {archived_count} {data_type} records")
-            return archived_count, f"Archived {archived_count} records"
+            message = f"Archived {archived_count} records"
+            if not result["completed"]:
+                message += " (partial, will resume on next run)"
+            return archived_count, message
 
         except Exception as e:
             logger.error(f"Error archiving data: {e}")
@@ -451,17 +1009,17 @@ class DataRetentionManager:
             results["errors"].append(f"Log purge failed: {str(e)}")
 
         try:
-            # Purge temporary data
-            temp_count, temp_msg = self.purge_temporary_data()
+            # Purge expired files (temp, exports, reports, research, ...)
+            file_count, file_msg = self.purge_managed_files()
             results["jobs_executed"].append({
-                "job": "purge_temp",
-                "records": temp_count,
-                "message": temp_msg
+                "job": "purge_files",
+                "records": file_count,
+                "message": file_msg
             })
-            results["total_records_deleted"] += temp_count
+            results["total_records_deleted"] += file_count
 
         except Exception as e:
-            results["errors"].append(f"Temp purge failed: {str(e)}")
+            results["errors"].append(f"File purge failed: {str(e)}")
 
         try:
             # Archive old data
@@ -500,16 +1058,29 @@ Retention Policies:
   Description: {policy.description}
 """
 
+        report += f"""
+Automatic File Deletion:
+{'-'*70}
+"""
+        for directory, data_type in self.managed_directories.items():
+            policy = self.policy_manager.get_policy(data_type)
+            if not policy or policy.retention_days == 0:
+                action = "kept (no automatic deletion)"
+            else:
+                action = f"deleted automatically after {policy.retention_days} days"
+            report += f"  {directory} ({data_type}): files {action}\n"
+
         report += f"""
 Deletion History:
 {'-'*70}
-Total Deletions: {len(self.deletion_log)}
+Total Deletions: {len(self.ledger)}
 """
 
-        if self.deletion_log:
+        recent_deletions = self.ledger.tail(10)
+        if recent_deletions:
             # Show recent deletions
             report += "\nRecent Deletions (Last 10):\n"
-            for record in self.deletion_log[-10:]:
+            for record in recent_deletions:
                 report += f"""
   ID: {record.get('deletion_id')}
   Type: {record.get('data_type')}
@@ -524,6 +1095,8 @@ Compliance Notes:
 ✓ Audit logs retained for {self.policy_manager.get_policy('audit').retention_days if self.policy_manager.get_policy('audit') else 'N/A'} days (regulatory requirement)
 ✓ User data retained until deletion request (GDPR compliance)
 ✓ Temporary data cleaned automatically after retention period
+✓ Generated reports deleted automatically after {self.policy_manager.get_policy('reports').retention_days if self.policy_manager.get_policy('reports') else 'N/A'} days
+✓ Research snapshots deleted automatically after {self.policy_manager.get_policy('research').retention_days if self.policy_manager.get_policy('research') else 'N/A'} days
 ✓ All deletions logged for audit trail
 
 Recommendations:
@@ -0,0 +1,228 @@
+"""
+Conditional JSON responses for the IRAQAF hubs
+
+Server side, `conditional_json` decorates a Flask view so its JSON body gets
+a content-hash ETag (ignoring volatile keys such as timestamps), answers
+`If-None-Match` with 304 Not Modified, and supports `?since=<etag>` delta
+responses carrying only the top-level keys that changed.
+
+Client side, `ConditionalFetcher` remembers the last validator and body per
+URL, sends `If-None-Match` (and optionally `since=`), and hands back the
+cached body on 304, so steady-state polling only moves headers.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import requests
+from flask import current_app, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+# Keys that change on every request without the data itself changing
+DEFAULT_VOLATILE_KEYS = ("timestamp", "last_update", "generated_at")
+
+
+def compute_etag(payload: Any, volatile_keys: Iterable[str] = DEFAULT_VOLATILE_KEYS) -> str:
+    """Content hash of a JSON payload, ignoring top-level volatile keys."""
+    if isinstance(payload, dict):
+        volatile = set(volatile_keys)
+        payload = {k: v for k, v in payload.items() if k not in volatile}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def build_delta(base: Dict[str, Any], current: Dict[str, Any], volatile_keys: Iterable[str]) -> Tuple[Dict[str, Any], list]:
+    """Top-level keys changed or removed between two payloads (volatile keys always included)."""
+    volatile = set(volatile_keys)
+    changed = {
+        k: v for k, v in current.items()
+        if k in volatile or k not in base or base[k] != v
+    }
+    removed = [k for k in base if k not in current]
+    return changed, removed
+
+
+class _ResponseHistory:
+    """Recent payloads per endpoint, so `since=` can be answered with a delta."""
+
+    def __init__(self, versions_per_key: int = 8, max_keys: int = 256):
+        self.versions_per_key = versions_per_key
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[str, OrderedDict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def remember(self, key: str, etag: str, payload: Any) -> None:
+        with self._lock:
+            versions = self._entries.setdefault(key, OrderedDict())
+            self._entries.move_to_end(key)
+            versions[etag] = payload
+            versions.move_to_end(etag)
+            while len(versions) > self.versions_per_key:
+                versions.popitem(last=False)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+
+    def lookup(self, key: str, etag: str) -> Optional[Any]:
+        with self._lock:
+            return self._entries.get(key, {}).get(etag)
+
+
+_history = _ResponseHistory()
+
+
+def _request_key() -> str:
+    args = sorted((k, v) for k, v in request.args.items(multi=True) if k != "since")
+    return f"{request.path}?{args}"
+
+
+def _client_etags() -> set:
+    """ETags listed in the request's If-None-Match header (weak prefixes dropped)."""
+    tags = set()
+    for tag in request.headers.get("If-None-Match", "").split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag.strip('"'))
+    return tags
+
+
+def conditional_json(view: Optional[Callable] = None, *, volatile_keys: Iterable[str] = DEFAULT_VOLATILE_KEYS):
+    """
+    Decorate a Flask view returning JSON with ETag / 304 / `since=` delta support.
+
+    Usage:
+        @app.route('/api/crs')
+        @conditional_json
+        def api_crs(): ...
+
+    Only 200 JSON responses are affected; errors pass through unchanged.
+    """
+    volatile_keys = tuple(volatile_keys)
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            response = current_app.make_response(fn(*args, **kwargs))
+            if response.status_code != 200 or not response.is_json:
+                return response
+
+            payload = response.get_json()
+            etag = compute_etag(payload, volatile_keys)
+            key = _request_key()
+            _history.remember(key, etag, payload)
+
+            client_etags = _client_etags()
+            if etag in client_etags or "*" in client_etags:
+                not_modified = current_app.response_class(status=304)
+                not_modified.set_etag(etag)
+                not_modified.headers["Cache-Control"] = "no-cache"
+                return not_modified
+
+            since = request.args.get("since", "").strip('"')
+            if since and isinstance(payload, dict):
+                base = _history.lookup(key, since)
+                if isinstance(base, dict):
+                    changed, removed = build_delta(base, payload, volatile_keys)
+                    response = jsonify({
+                        "delta": True,
+                        "since": since,
+                        "etag": etag,
+                        "changed": changed,
+                        "removed": removed,
+                    })
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return wrapper
+
+    if view is not None:
+        return decorator(view)
+    return decorator
+
+
+class ConditionalFetcher:
+    """
+    HTTP JSON fetcher that revalidates instead of re-downloading.
+
+    Keeps the last ETag and body per URL. With `use_delta` it also asks the
+    hub for a `since=` delta and merges it into the cached body.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, use_delta: bool = False, max_entries: int = 256):
+        self.session = session or requests.Session()
+        self.use_delta = use_delta
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.not_modified_count = 0
+
+    def _cache_key(self, url: str, params: Optional[Dict[str, Any]]) -> str:
+        return f"{url}?{sorted((params or {}).items())}"
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10) -> requests.Response:
+        """
+        GET a JSON resource, revalidating against the cached copy.
+
+        Returns the requests.Response; use `json_for(response)` or `get_json()`
+        to obtain the body, which is served from cache on 304.
+        """
+        key = self._cache_key(url, params)
+        with self._lock:
+            cached = self._cache.get(key)
+
+        headers = {}
+        request_params = dict(params or {})
+        if cached:
+            headers["If-None-Match"] = f'"{cached[0]}"'
+            if self.use_delta:
+                request_params["since"] = cached[0]
+
+        response = self.session.get(url, params=request_params or None, headers=headers, timeout=timeout)
+        response.cached_body = None
+
+        if response.status_code == 304 and cached:
+            self.not_modified_count += 1
+            response.cached_body = cached[1]
+            return response
+
+        if response.status_code != 200:
+            return response
+
+        body = response.json()
+        if isinstance(body, dict) and body.get("delta") and cached and body.get("since") == cached[0]:
+            merged = dict(cached[1])
+            merged.update(body.get("changed", {}))
+            for removed_key in body.get("removed", []):
+                merged.pop(removed_key, None)
+            body = merged
+        response.cached_body = body
+
+        etag = (response.headers.get("ETag") or "").strip('"')
+        if etag:
+            with self._lock:
+                self._cache[key] = (etag, body)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return response
+
+    @staticmethod
+    def json_for(response: requests.Response) -> Any:
+        """Body for a response returned by get() (cached body on 304)."""
+        return response.cached_body
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10) -> Any:
+        """GET and return the JSON body, raising for HTTP errors other than 304."""
+        response = self.get(url, params=params, timeout=timeout)
+        if response.status_code not in (200, 304):
+            response.raise_for_status()
+        return response.cached_body
@@ -0,0 +1,203 @@
+"""
+Module 5 CQS Engine - Unified Continuous QA Score computation
+
+Loads the CQS weights from config/cqs_weights.json once, reloads them when
+the file changes on disk (mtime check per call), and scores either a single
+set of component scores or a whole history of them in one vectorized call.
+
+Component keys follow the weights file: crs, sai, ts, fi, ops_score, eml_score.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEIGHTS_FILE = "config/cqs_weights.json"
+
+DEFAULT_CQS_WEIGHTS = {
+    "crs": 0.20,
+    "sai": 0.25,
+    "ts": 0.20,
+    "fi": 0.20,
+    "ops_score": 0.10,
+    "eml_score": 0.05,
+}
+
+CQS_COMPONENTS = tuple(DEFAULT_CQS_WEIGHTS)
+
+# QA history entries use short keys for some components
+HISTORY_KEYS = {
+    "crs": "crs",
+    "sai": "sai",
+    "ts": "ts",
+    "fi": "fi",
+    "ops_score": "ops",
+    "eml_score": "eml",
+}
+
+
+def _normalize(values: np.ndarray) -> np.ndarray:
+    """Bring scores on either a 0-1 or 0-100 scale onto 0-1."""
+    return np.where(values <= 1, values, values / 100.0)
+
+
+class CQSEngine:
+    """
+    Unified CQS scorer with cached, hot-reloaded weights.
+
+    Scores follow the same rules as the original `compute_unified_cqs`:
+    components may be on a 0-1 or 0-100 scale, EML (1-5) is mapped to
+    20-100, and the result is a 0-100 score rounded to 2 decimals.
+    """
+
+    def __init__(self, weights_file: str = DEFAULT_WEIGHTS_FILE):
+        self.weights_file = weights_file
+        self._lock = threading.Lock()
+        self._weights: Dict[str, float] = dict(DEFAULT_CQS_WEIGHTS)
+        self._weights_mtime_ns: Optional[int] = None
+        self._load_weights()
+
+    def _load_weights(self) -> None:
+        """(Re)load weights from disk, keeping the last good set on error."""
+        try:
+            mtime_ns = os.stat(self.weights_file).st_mtime_ns
+        except OSError as e:
+            if self._weights_mtime_ns != -1:
+                logger.warning(f"Failed to load CQS weights: {e}")
+                self._weights_mtime_ns = -1
+            return
+
+        if mtime_ns == self._weights_mtime_ns:
+            return
+
+        try:
+            with open(self.weights_file, "r") as f:
+                config = json.load(f)
+            weights = {k: float(v) for k, v in config["cqs_weights"].items()}
+            missing = set(CQS_COMPONENTS) - set(weights)
+            if missing:
+                raise KeyError(f"missing weights for {sorted(missing)}")
+            self._weights = weights
+            logger.info(f"Loaded CQS weights from {self.weights_file}")
+        except Exception as e:
+            logger.warning(f"Failed to load CQS weights: {e}")
+        self._weights_mtime_ns = mtime_ns
+
+    @property
+    def weights(self) -> Dict[str, float]:
+        """Current weights, reloaded if the weights file has changed."""
+        with self._lock:
+            self._load_weights()
+            return dict(self._weights)
+
+    def formula(self, weights: Optional[Mapping[str, float]] = None) -> str:
+        """Human-readable CQS formula for the given (or current) weights."""
+        weights = weights or self.weights
+        labels = {
+            "crs": "CRS",
+            "sai": "SAI",
+            "ts": "TS",
+            "fi": "FI",
+            "ops_score": "OPS",
+            "eml_score": "(EML*20)",
+        }
+        terms = [f"{weights[c]:.2f}*{labels[c]}" for c in CQS_COMPONENTS if c in weights]
+        return "CQS = " + " + ".join(terms)
+
+    def score(self, weights: Optional[Mapping[str, float]] = None, **components: float) -> float:
+        """
+        Score one set of components.
+
+        Args:
+            weights: Optional what-if weights overriding the configured ones
+            **components: Component scores keyed by CQS_COMPONENTS
+
+        Returns:
+            Unified CQS (0-100)
+        """
+        batch = {name: [value] for name, value in components.items()}
+        return float(self.score_batch(batch, weights=weights)[0])
+
+    def score_batch(
+        self,
+        components: Union[Mapping[str, Iterable[float]], np.ndarray],
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> np.ndarray:
+        """
+        Score many sets of components in one vectorized pass.
+
+        Args:
+            components: Either a mapping of component name -> sequence of
+                scores, or an (n, 6) array with columns in CQS_COMPONENTS order
+            weights: Optional what-if weights overriding the configured ones
+
+        Returns:
+            Array of unified CQS values (0-100)
+
+        Components absent from a mapping are left out and the remaining
+        weights are renormalized, so partial sources (e.g. hubs that do not
+        report EML) still produce a 0-100 score.
+        """
+        weights = dict(weights) if weights else self.weights
+
+        if isinstance(components, np.ndarray):
+            names = list(CQS_COMPONENTS)
+            matrix = np.asarray(components, dtype=float)
+        else:
+            names = [c for c in CQS_COMPONENTS if c in components]
+            if not names:
+                raise ValueError("No CQS components supplied")
+            matrix = np.column_stack(
+                [np.asarray(list(components[c]), dtype=float) for c in names]
+            )
+
+        if matrix.ndim != 2 or matrix.shape[1] != len(names):
+            raise ValueError(f"Expected an (n, {len(names)}) component matrix")
+
+        matrix = np.nan_to_num(matrix, nan=0.0)
+        if "eml_score" in names:
+            eml = names.index("eml_score")
+            matrix[:, eml] = np.where(matrix[:, eml] <= 5, matrix[:, eml] * 20, matrix[:, eml])
+
+        weight_vector = np.array([weights.get(c, 0.0) for c in names], dtype=float)
+        total_weight = weight_vector.sum()
+        if len(names) < len(CQS_COMPONENTS) and total_weight > 0:
+            weight_vector = weight_vector / total_weight
+
+        unified = _normalize(matrix) @ weight_vector * 100
+        return np.round(np.clip(unified, 0, 100), 2)
+
+    def score_history(
+        self,
+        history: List[Dict[str, Any]],
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> np.ndarray:
+        """Rescore QA history entries (as written by log_qa_history)."""
+        defaults = {"eml_score": 1}
+        components = {
+            name: [entry.get(key, defaults.get(name, 0)) or 0 for entry in history]
+            for name, key in HISTORY_KEYS.items()
+        }
+        if not history:
+            return np.array([])
+        return self.score_batch(components, weights=weights)
+
+
+# Global CQS engine instance
+_cqs_engine: Optional[CQSEngine] = None
+_cqs_engine_lock = threading.Lock()
+
+
+def get_cqs_engine() -> CQSEngine:
+    """Get the global CQS engine instance"""
+    global _cqs_engine
+    with _cqs_engine_lock:
+        if _cqs_engine is None:
+            _cqs_engine = CQSEngine()
+        return _cqs_engine
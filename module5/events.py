@@ -0,0 +1,204 @@
+"""
+Module 5 Events - Score-change push channel from hubs to the orchestrator
+
+Hubs publish a ScoreChangeEvent whenever one of their headline scores moves
+(CRS, SAI, ops score, FI, TS, internal CQS). Events travel either over an
+HTTP callback to the UQO hub (POST /api/events) or through an in-process
+LocalEventBus, which is also the stand-in used when hub and orchestrator
+share a process. The orchestrator's hub polling then only has to run as a
+slow reconciliation fallback.
+"""
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALLBACK_URL = "http://127.0.0.1:8507/api/events"
+
+# Hub identifier -> the headline metric that hub publishes (0-100 scale).
+# The orchestrator's reconciliation poll reads the same field from the same
+# endpoint: L1 /api/crs, L2 /api/sai, L3_OPS /api/status, L3_FAIRNESS /api/fi,
+# L4 /api/transparency-score.
+HUB_PRIMARY_METRICS = {
+    "L1": "crs",
+    "L2": "sai",
+    "L3_OPS": "ops_score",
+    "L3_FAIRNESS": "fairness_index",
+    "L4": "transparency_score",
+    "CAE": "internal_cqs",
+}
+
+
+@dataclass
+class ScoreChangeEvent:
+    """A hub's headline score changed."""
+    hub: str
+    metric: str
+    score: float
+    previous_score: Optional[float] = None
+    timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScoreChangeEvent":
+        """Build an event from a JSON payload, validating the required fields."""
+        hub = data.get("hub")
+        if hub not in HUB_PRIMARY_METRICS:
+            raise ValueError(f"Unknown hub: {hub}")
+        try:
+            score = float(data["score"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Event requires a numeric 'score'")
+        previous = data.get("previous_score")
+        return cls(
+            hub=hub,
+            metric=data.get("metric", HUB_PRIMARY_METRICS[hub]),
+            score=score,
+            previous_score=float(previous) if previous is not None else None,
+            timestamp=data.get("timestamp") or datetime.now(timezone.utc).isoformat(),
+            details=data.get("details") or {},
+        )
+
+
+class LocalEventBus:
+    """In-process publish/subscribe bus for score-change events."""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[ScoreChangeEvent], None]] = []
+        self._lock = threading.Lock()
+        self.published_count = 0
+
+    def subscribe(self, callback: Callable[[ScoreChangeEvent], None]) -> None:
+        """Register a callback invoked synchronously for every event."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ScoreChangeEvent], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, event: ScoreChangeEvent) -> None:
+        """Deliver an event to every subscriber; a failing subscriber does not stop the others."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published_count += 1
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Event subscriber failed for {event.hub}/{event.metric}: {e}")
+
+
+class HubEventPublisher:
+    """
+    Publishes a hub's score changes to the orchestrator.
+
+    Only changes larger than `min_delta` are emitted. With a `bus` the event
+    is delivered in-process; otherwise it is queued and POSTed to
+    `callback_url` by a background sender thread so hub requests never wait
+    on the orchestrator. A failed delivery forgets the last published value,
+    so the next computation of that score retries the push.
+
+    Hubs publish once at startup and again wherever their score inputs
+    change (e.g. L1 evidence uploads and regulation approvals), so no hub
+    has to recompute its score on a timer. A push that cannot be delivered
+    (e.g. the orchestrator is not up yet) is picked up by the orchestrator's
+    reconciliation poll.
+    """
+
+    def __init__(
+        self,
+        hub: str,
+        callback_url: str = DEFAULT_CALLBACK_URL,
+        bus: Optional[LocalEventBus] = None,
+        min_delta: float = 0.01,
+        timeout: float = 2.0,
+        max_queue: int = 100,
+    ):
+        if hub not in HUB_PRIMARY_METRICS:
+            raise ValueError(f"Unknown hub: {hub}")
+        self.hub = hub
+        self.callback_url = callback_url
+        self.bus = bus
+        self.min_delta = min_delta
+        self.timeout = timeout
+
+        self._last_scores: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[ScoreChangeEvent]" = queue.Queue(maxsize=max_queue)
+        self._sender: Optional[threading.Thread] = None
+
+    def publish_score(self, score: Optional[float], metric: Optional[str] = None, **details: Any) -> bool:
+        """
+        Publish a score if it changed since the last published value.
+
+        Args:
+            score: Current score value
+            metric: Metric name (defaults to the hub's headline metric)
+            **details: Extra context forwarded with the event
+
+        Returns:
+            True if an event was emitted
+        """
+        if score is None:
+            return False
+        metric = metric or HUB_PRIMARY_METRICS[self.hub]
+        score = float(score)
+
+        with self._lock:
+            previous = self._last_scores.get(metric)
+            if previous is not None and abs(score - previous) < self.min_delta:
+                return False
+            self._last_scores[metric] = score
+
+        event = ScoreChangeEvent(
+            hub=self.hub,
+            metric=metric,
+            score=score,
+            previous_score=previous,
+            details=details,
+        )
+
+        if self.bus is not None:
+            self.bus.publish(event)
+            return True
+
+        self._ensure_sender()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Drop the oldest pending event; the newest score is what matters
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(event)
+        return True
+
+    def _ensure_sender(self) -> None:
+        if self._sender is None or not self._sender.is_alive():
+            self._sender = threading.Thread(target=self._send_loop, daemon=True)
+            self._sender.start()
+
+    def _send_loop(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                response = requests.post(self.callback_url, json=event.to_dict(), timeout=self.timeout)
+                response.raise_for_status()
+            except Exception as e:
+                logger.debug(f"Could not push {self.hub} {event.metric} event: {e}")
+                with self._lock:
+                    if self._last_scores.get(event.metric) == event.score:
+                        del self._last_scores[event.metric]
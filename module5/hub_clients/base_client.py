@@ -6,6 +6,8 @@ import requests
 from typing import Any, Dict, Optional
 import logging
 
+from module5.conditional import ConditionalFetcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +27,8 @@ class BaseHubClient:
         self.port = port
         self.base_url = f"http://{host}:{port}"
         self.timeout = timeout
+        # Revalidates with If-None-Match so unchanged hub data costs only headers
+        self.fetcher = ConditionalFetcher()
 
     def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -43,9 +47,10 @@ class BaseHubClient:
         """
         try:
             url = f"{self.base_url}{endpoint}"
-            response = requests.get(url, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+            response = self.fetcher.get(url, params=params, timeout=self.timeout)
+            if response.status_code not in (200, 304):
+                response.raise_for_status()
+            return self.fetcher.json_for(response)
         except requests.exceptions.ConnectionError as e:
             logger.error(
                 f"Cannot connect to {self.__class__.__name__} at {self.base_url}: {e}")
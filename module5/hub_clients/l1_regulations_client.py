@@ -46,12 +46,12 @@ class L1RegulationsClient(BaseHubClient):
         super().__init__(host, port)
 
     def get_compliance_score(self) -> ComplianceSnapshot:
-        """Get overall compliance score."""
+        """Get overall compliance score (the CRS the hub pushes to Module 5)."""
         try:
-            data = self.get("/api/score")
+            data = self.get("/api/crs")
             return ComplianceSnapshot(
                 timestamp=data.get("timestamp", ""),
-                overall_score=data.get("overall_score", 0),
+                overall_score=data.get("crs", 0) / 100.0,  # Convert to 0-1 scale
                 gdpr_score=data.get("gdpr_score", 0),
                 eu_ai_act_score=data.get("eu_ai_act_score", 0),
                 iso_13485_score=data.get("iso_13485_score", 0),
@@ -51,7 +51,7 @@ class L2SecurityClient(BaseHubClient):
             data = self.get("/api/sai")
             return SecuritySnapshot(
                 timestamp=data.get("timestamp", ""),
-                sai_score=data.get("sai_score", 0),
+                sai_score=data.get("sai", 0) / 100.0,  # Convert to 0-1 scale
                 anonymization_score=data.get("anonymization_score", 0),
                 model_security_score=data.get("model_security_score", 0),
                 access_control_score=data.get("access_control_score", 0),
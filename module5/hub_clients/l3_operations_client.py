@@ -44,12 +44,12 @@ class L3OperationsClient(BaseHubClient):
         super().__init__(host, port)
 
     def get_system_health(self) -> OperationsSnapshot:
-        """Get overall system health score."""
+        """Get overall system health score (the ops score the hub pushes to Module 5)."""
         try:
-            data = self.get("/api/health")
+            data = self.get("/api/status")
             return OperationsSnapshot(
                 timestamp=data.get("timestamp", ""),
-                system_health_score=data.get("system_health_score", 0),
+                system_health_score=data.get("ops_score", 0) / 100.0,  # Convert to 0-1 scale
                 uptime_percentage=data.get("uptime_percentage", 0),
                 average_response_time_ms=data.get(
                     "average_response_time_ms", 0),
@@ -58,7 +58,7 @@ class L3OperationsClient(BaseHubClient):
                 error_rate=data.get("error_rate", 0),
                 active_deployments=data.get("active_deployments", 0),
                 critical_alerts=data.get("critical_alerts", 0),
-                status=data.get("status", "unknown"),
+                status=data.get("system_health", "unknown"),
             )
         except Exception as e:
             raise ValueError(f"Failed to get L3 system health: {str(e)}")
@@ -49,7 +49,7 @@ class L4ExplainabilityClient(BaseHubClient):
             data = self.get("/api/transparency-score")
             return ExplainabilitySnapshot(
                 timestamp=data.get("timestamp", ""),
-                transparency_score=data.get("transparency_score", 0),
+                transparency_score=data.get("transparency_score", 0) / 100.0,  # Convert to 0-1 scale
                 shap_available=data.get("shap_available", False),
                 lime_available=data.get("lime_available", False),
                 gradcam_available=data.get("gradcam_available", False),
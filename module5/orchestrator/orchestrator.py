@@ -2,7 +2,8 @@
 Module 5 Orchestrator - Core Engine
 
 The Continuous QA Automation & Monitoring orchestrator that:
-1. Polls all 5 hubs on a scheduled interval
+1. Receives score-change events pushed by the hubs, and polls all 5 hubs
+   on a slower reconciliation interval
 2. Aggregates metrics into unified data models
 3. Detects cross-hub anomalies and risks
 4. Generates the Continuous QA Score (CQS)
@@ -10,11 +11,14 @@ The Continuous QA Automation & Monitoring orchestrator that:
 """
 
 import logging
+import threading
 import time
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 
+from module5.cqs_engine import CQSEngine, get_cqs_engine
+from module5.events import HUB_PRIMARY_METRICS, ScoreChangeEvent
 from module5.hub_clients import (
     L4ExplainabilityClient,
     L2SecurityClient,
@@ -26,6 +30,24 @@ from module5.hub_clients import (
 
 logger = logging.getLogger(__name__)
 
+# Hub score key -> (label, warning threshold, warning alert), in polling order
+HUB_SCORE_ALERTS = {
+    "l4": ("L4 Explainability", None, None),
+    "l2": ("L2 Security", 0.70, "🔴 L2 Security score below 70%"),
+    "l1": ("L1 Regulations", 0.75, "🟡 L1 Compliance score below 75%"),
+    "l3_ops": ("L3 Operations", 0.80, "🟡 L3 Operations score below 80%"),
+    "l3_fairness": ("L3 Fairness", 0.70, "🟡 L3 Fairness score below 70%"),
+}
+
+# Event hub identifier -> hub score key
+EVENT_HUB_KEYS = {
+    "L4": "l4",
+    "L2": "l2",
+    "L1": "l1",
+    "L3_OPS": "l3_ops",
+    "L3_FAIRNESS": "l3_fairness",
+}
+
 
 @dataclass
 class HubStatus:
@@ -45,12 +67,13 @@ class ContinuousQAScore:
     """
     Master Continuous QA Score aggregating all 5 hubs.
 
-    CQS = weighted average of:
-    - L4 Explainability Score (20%)
-    - L2 Security Score (25%)
-    - L1 Compliance Score (25%)
-    - L3 Operations Score (15%)
-    - L3 Fairness Score (15%)
+    CQS = weighted average of the hub scores using the weights in
+    config/cqs_weights.json (see CQSEngine):
+    - L1 Compliance Score (crs)
+    - L2 Security Score (sai)
+    - L4 Explainability Score (ts)
+    - L3 Fairness Score (fi)
+    - L3 Operations Score (ops_score)
     """
     timestamp: str
     overall_cqs: float  # 0-1
@@ -84,14 +107,25 @@ class Module5Orchestrator:
     and produces unified QA scoring.
     """
 
-    def __init__(self, polling_interval_seconds: int = 30):
+    def __init__(
+        self,
+        polling_interval_seconds: int = 30,
+        cqs_engine: Optional[CQSEngine] = None,
+        reconciliation_interval_seconds: Optional[int] = None,
+    ):
         """
         Initialize orchestrator with hub clients.
 
         Args:
-            polling_interval_seconds: How often to poll hubs (default 30s)
+            polling_interval_seconds: How often to check whether a poll is due (default 30s)
+            cqs_engine: CQS scorer to use (defaults to the shared engine)
+            reconciliation_interval_seconds: How often to fully poll all hubs when
+                they push score changes (defaults to the polling interval)
         """
         self.polling_interval = polling_interval_seconds
+        self.reconciliation_interval = reconciliation_interval_seconds or polling_interval_seconds
+        self.last_full_poll: Optional[float] = None
+        self.cqs_engine = cqs_engine or get_cqs_engine()
 
         # Initialize hub clients
         self.l4_client = L4ExplainabilityClient()
@@ -104,6 +138,11 @@ class Module5Orchestrator:
         self.latest_data: Dict[str, Any] = {}
         self.hub_statuses: Dict[str, HubStatus] = {}
         self.latest_cqs: Optional[ContinuousQAScore] = None
+        self.hub_scores: Dict[str, Optional[float]] = {key: None for key in HUB_SCORE_ALERTS}
+        # Guards hub_scores and the CQS rebuild (polling thread vs. pushed events)
+        self._scores_lock = threading.Lock()
+        # Hub score key -> time.time() of the last pushed event applied
+        self._pushed_at: Dict[str, float] = {}
 
         logger.info("Module 5 Orchestrator initialized")
 
@@ -114,105 +153,117 @@ class Module5Orchestrator:
         Returns:
             ContinuousQAScore aggregating all hub data
         """
-        timestamp = datetime.now(timezone.utc).isoformat()
-        alerts = []
-        critical_issues = 0
-        warning_count = 0
+        started = time.time()
+        polled = {
+            "l4": self._poll_l4_hub(),
+            "l2": self._poll_l2_hub(),
+            "l1": self._poll_l1_hub(),
+            "l3_ops": self._poll_l3_operations_hub(),
+            "l3_fairness": self._poll_l3_fairness_hub(),
+        }
 
-        # Poll L4 Explainability Hub
-        l4_score = self._poll_l4_hub()
-        if l4_score is None:
-            l4_score = 0
-            alerts.append("⚠️ L4 Explainability Hub unreachable")
-            critical_issues += 1
-        else:
-            logger.info(f"L4 Transparency Score: {l4_score:.1%}")
-
-        # Poll L2 Security Hub
-        l2_score = self._poll_l2_hub()
-        if l2_score is None:
-            l2_score = 0
-            alerts.append("⚠️ L2 Security Hub unreachable")
-            critical_issues += 1
-        else:
-            logger.info(f"L2 Security Score: {l2_score:.1%}")
-            if l2_score < 0.70:
-                alerts.append("🔴 L2 Security score below 70%")
-                warning_count += 1
+        with self._scores_lock:
+            # Merge per hub; a score pushed while the polls were in flight is newer
+            for key, score in polled.items():
+                if self._pushed_at.get(key, 0) >= started:
+                    continue
+                self.hub_scores[key] = score
+                if score is not None:
+                    logger.info(f"{HUB_SCORE_ALERTS[key][0]} Score: {score:.1%}")
+
+            self.last_full_poll = time.time()
+            cqs = self._build_cqs()
+        logger.info(f"📊 Continuous QA Score: {cqs.overall_cqs:.1%}")
+        return cqs
 
-        # Poll L1 Regulations Hub
-        l1_score = self._poll_l1_hub()
-        if l1_score is None:
-            l1_score = 0
-            alerts.append("⚠️ L1 Regulations Hub unreachable")
-            critical_issues += 1
-        else:
-            logger.info(f"L1 Compliance Score: {l1_score:.1%}")
-            if l1_score < 0.75:
-                alerts.append("🟡 L1 Compliance score below 75%")
-                warning_count += 1
+    def needs_reconciliation(self) -> bool:
+        """Whether a full poll is due (hubs push changes between polls)."""
+        if self.last_full_poll is None:
+            return True
+        return time.time() - self.last_full_poll >= self.reconciliation_interval
 
-        # Poll L3 Operations Hub
-        l3_ops_score = self._poll_l3_operations_hub()
-        if l3_ops_score is None:
-            l3_ops_score = 0
-            alerts.append("⚠️ L3 Operations Hub unreachable")
-            critical_issues += 1
-        else:
-            logger.info(f"L3 Operations Score: {l3_ops_score:.1%}")
-            if l3_ops_score < 0.80:
-                alerts.append("🟡 L3 Operations score below 80%")
-                warning_count += 1
+    def apply_hub_event(self, event: ScoreChangeEvent) -> Optional[ContinuousQAScore]:
+        """
+        Apply a pushed score-change event without polling the other hubs.
 
-        # Poll L3 Fairness Hub
-        l3_fairness_score = self._poll_l3_fairness_hub()
-        if l3_fairness_score is None:
-            l3_fairness_score = 0
-            alerts.append("⚠️ L3 Fairness Hub unreachable")
-            critical_issues += 1
-        else:
-            logger.info(f"L3 Fairness Score: {l3_fairness_score:.1%}")
-            if l3_fairness_score < 0.70:
-                alerts.append("🟡 L3 Fairness score below 70%")
-                warning_count += 1
+        Args:
+            event: Event published by a hub
 
-        # Calculate weighted CQS
-        cqs_weights = {
-            "l4": 0.20,
-            "l2": 0.25,
-            "l1": 0.25,
-            "l3_ops": 0.15,
-            "l3_fairness": 0.15,
-        }
+        Returns:
+            Updated ContinuousQAScore, or None if the event does not affect CQS
+        """
+        if event.metric != HUB_PRIMARY_METRICS.get(event.hub):
+            return None
+
+        self.latest_data[event.hub.lower()] = event.to_dict()
+        key = EVENT_HUB_KEYS.get(event.hub)
+        if key is None:
+            # CAE pushes internal CQS, which is not part of the hub-level CQS
+            return None
 
-        overall_cqs = (
-            l4_score * cqs_weights["l4"]
-            + l2_score * cqs_weights["l2"]
-            + l1_score * cqs_weights["l1"]
-            + l3_ops_score * cqs_weights["l3_ops"]
-            + l3_fairness_score * cqs_weights["l3_fairness"]
+        # Events carry the hub's 0-100 score; the pollers report it on 0-1
+        score = event.score / 100
+        with self._scores_lock:
+            self.hub_scores[key] = score
+            self._pushed_at[key] = time.time()
+            self.hub_statuses[event.hub] = HubStatus(
+                hub_name=HUB_SCORE_ALERTS[key][0],
+                is_healthy=True,
+                last_update=event.timestamp,
+                response_time_ms=0,
+            )
+            cqs = self._build_cqs()
+        logger.info(
+            f"📊 Continuous QA Score: {cqs.overall_cqs:.1%} "
+            f"(pushed {event.hub} {event.metric}={event.score})"
         )
+        return cqs
+
+    def _build_cqs(self) -> ContinuousQAScore:
+        """Assemble the CQS, alerts and counters from the latest hub scores (caller holds _scores_lock)."""
+        alerts = []
+        critical_issues = 0
+        warning_count = 0
+        scores = {}
+
+        for key, (label, threshold, warning) in HUB_SCORE_ALERTS.items():
+            score = self.hub_scores.get(key)
+            if score is None:
+                scores[key] = 0
+                alerts.append(f"⚠️ {label} Hub unreachable")
+                critical_issues += 1
+                continue
+            scores[key] = score
+            if threshold is not None and score < threshold:
+                alerts.append(warning)
+                warning_count += 1
+
+        # Calculate weighted CQS (EML is not polled, so its weight is redistributed)
+        overall_cqs = self.cqs_engine.score(
+            crs=scores["l1"],
+            sai=scores["l2"],
+            ts=scores["l4"],
+            fi=scores["l3_fairness"],
+            ops_score=scores["l3_ops"],
+        ) / 100
 
-        # Generate CQS object
         cqs = ContinuousQAScore(
-            timestamp=timestamp,
+            timestamp=datetime.now(timezone.utc).isoformat(),
             overall_cqs=overall_cqs,
-            l4_explainability_score=l4_score,
-            l2_security_score=l2_score,
-            l1_compliance_score=l1_score,
-            l3_operations_score=l3_ops_score,
-            l3_fairness_score=l3_fairness_score,
+            l4_explainability_score=scores["l4"],
+            l2_security_score=scores["l2"],
+            l1_compliance_score=scores["l1"],
+            l3_operations_score=scores["l3_ops"],
+            l3_fairness_score=scores["l3_fairness"],
             critical_issues=critical_issues,
             warnings=warning_count,
-            hub_statuses=[s.to_dict() for s in self.hub_statuses.values()],
+            hub_statuses=[s.to_dict() for s in list(self.hub_statuses.values())],
             alerts=alerts,
         )
 
         self.latest_cqs = cqs
-        logger.info(f"📊 Continuous QA Score: {overall_cqs:.1%}")
         return cqs
 
-
     def _calculate_internal_cqs(self, security: float, compliance: float, fairness: float) -> float:
         """Calculate Internal CQS (Module 5 Core metrics)."""
         internal_cqs = (0.30 * 0.85) + (0.20 * fairness) + (0.15 * security) + (0.20 * compliance) + (0.15 * 0.8)
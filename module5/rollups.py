@@ -0,0 +1,405 @@
+"""
+Module 5 CQS Rollups - Precomputed trend aggregates
+
+Maintains per-minute, per-hour and per-day aggregates of the QA history
+(min/max/mean/p95 for cqs, crs, sai, ts, fi, ops) incrementally as entries
+are appended by `log_qa_history`. Trend charts and periodic reports read
+bucketed series from here instead of rescanning the raw JSONL history.
+
+Layout under the rollup directory:
+    minute.jsonl / hour.jsonl / day.jsonl  - closed buckets, append-only
+    open_buckets.json                      - buckets still accumulating
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_METRICS = ("cqs", "crs", "sai", "ts", "fi", "ops")
+
+# Resolution name -> bucket width
+RESOLUTIONS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Closed buckets retained per resolution (in memory and after compaction)
+DEFAULT_RETENTION = {
+    "minute": 2 * 24 * 60,   # 2 days
+    "hour": 45 * 24,         # 45 days
+    "day": 5 * 366,          # ~5 years
+}
+
+# p95 is estimated from a fixed histogram over the 0-100 score range
+HIST_BIN_WIDTH = 0.5
+HIST_BINS = int(100 / HIST_BIN_WIDTH)
+
+
+def _bucket_start(ts: datetime, resolution: str) -> datetime:
+    """Truncate a timestamp to the start of its bucket."""
+    if resolution == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a history timestamp into a naive local datetime."""
+    try:
+        ts = datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone().replace(tzinfo=None)
+    return ts
+
+
+def _new_bucket(start: datetime) -> Dict[str, Any]:
+    return {"bucket": start.isoformat(), "count": 0, "metrics": {}}
+
+
+def _fold_value(stats: Dict[str, Any], value: float) -> None:
+    """Fold one metric value into a bucket's running aggregate."""
+    stats["n"] += 1
+    stats["sum"] += value
+    stats["min"] = value if stats["min"] is None else min(stats["min"], value)
+    stats["max"] = value if stats["max"] is None else max(stats["max"], value)
+    bin_index = str(min(max(int(value / HIST_BIN_WIDTH), 0), HIST_BINS - 1))
+    stats["hist"][bin_index] = stats["hist"].get(bin_index, 0) + 1
+
+
+def _merge_stats(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """Merge one metric aggregate into another."""
+    target["n"] += source["n"]
+    target["sum"] += source["sum"]
+    for key, pick in (("min", min), ("max", max)):
+        if source[key] is not None:
+            target[key] = source[key] if target[key] is None else pick(target[key], source[key])
+    for bin_index, count in source["hist"].items():
+        target["hist"][bin_index] = target["hist"].get(bin_index, 0) + count
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {"n": 0, "sum": 0.0, "min": None, "max": None, "hist": {}}
+
+
+def _percentile(hist: Dict[str, int], total: int, q: float) -> Optional[float]:
+    """Estimate a percentile from a sparse histogram (bin upper edge)."""
+    if total <= 0:
+        return None
+    rank = q * total
+    seen = 0
+    for bin_index in sorted(hist, key=int):
+        seen += hist[bin_index]
+        if seen >= rank:
+            return round(min((int(bin_index) + 1) * HIST_BIN_WIDTH, 100.0), 2)
+    return 100.0
+
+
+def _summarize_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a running aggregate into min/max/mean/p95."""
+    if stats["n"] == 0:
+        return {"min": None, "max": None, "mean": None, "p95": None, "count": 0}
+    return {
+        "min": stats["min"],
+        "max": stats["max"],
+        "mean": round(stats["sum"] / stats["n"], 2),
+        "p95": min(_percentile(stats["hist"], stats["n"], 0.95), stats["max"]),
+        "count": stats["n"],
+    }
+
+
+def resolution_for_span(span: timedelta, max_buckets: int = 720) -> str:
+    """Pick the finest resolution that keeps a span within max_buckets."""
+    for resolution, width in RESOLUTIONS.items():
+        if span / width <= max_buckets:
+            return resolution
+    return "day"
+
+
+class CQSRollupStore:
+    """
+    Incremental minute/hour/day rollups of the CQS history.
+
+    One process (the UQO hub) writes through `add()`; any number of readers
+    (reports, dashboard charts) pick up appended buckets on each query by
+    tailing the rollup files, so a query costs O(buckets) regardless of how
+    much raw history has been retained.
+
+    Readers must pass `read_only=True`: a read-only store never creates,
+    rebuilds or writes rollup files, so it cannot truncate the files the
+    writer is appending to. Only the writer rebuilds missing rollups.
+    """
+
+    def __init__(
+        self,
+        rollup_dir: str = "qa_history/rollups",
+        history_file: str = "qa_history/qa_history.jsonl",
+        retention: Optional[Dict[str, int]] = None,
+        read_only: bool = False,
+    ):
+        self.rollup_dir = Path(rollup_dir)
+        self.history_file = Path(history_file)
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.state_file = self.rollup_dir / "open_buckets.json"
+        self.read_only = read_only
+
+        self._lock = threading.RLock()
+        self._closed: Dict[str, deque] = {
+            res: deque(maxlen=self.retention[res]) for res in RESOLUTIONS
+        }
+        self._open: Dict[str, Optional[Dict[str, Any]]] = {res: None for res in RESOLUTIONS}
+        self._offsets: Dict[str, int] = {res: 0 for res in RESOLUTIONS}
+        self._line_counts: Dict[str, int] = {res: 0 for res in RESOLUTIONS}
+        self._state_mtime_ns = 0
+
+        if read_only:
+            self._refresh()
+            return
+
+        self.rollup_dir.mkdir(parents=True, exist_ok=True)
+        if not self.state_file.exists() and self.history_file.exists():
+            self.rebuild_from_history()
+        else:
+            self._refresh()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Fold one QA history entry into every resolution."""
+        self._check_writable()
+        with self._lock:
+            self._refresh()
+            if self._fold_entry(entry):
+                self._save_open_state()
+
+    def rebuild_from_history(self) -> int:
+        """Recompute all rollups from the raw history file. Returns entries folded."""
+        self._check_writable()
+        with self._lock:
+            for res in RESOLUTIONS:
+                self._closed[res].clear()
+                self._open[res] = None
+                self._offsets[res] = 0
+                self._line_counts[res] = 0
+                self._resolution_file(res).write_text("")
+
+            folded = 0
+            if self.history_file.exists():
+                with open(self.history_file, "r") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if self._fold_entry(entry):
+                            folded += 1
+
+            self._save_open_state()
+            logger.info(f"Rebuilt CQS rollups from {folded} history entries")
+            return folded
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError("CQS rollup store was opened read-only")
+
+    def _fold_entry(self, entry: Dict[str, Any]) -> bool:
+        ts = _parse_timestamp(entry.get("timestamp"))
+        if ts is None:
+            return False
+
+        for res in RESOLUTIONS:
+            start = _bucket_start(ts, res).isoformat()
+            bucket = self._open[res]
+            if bucket is not None and start < bucket["bucket"]:
+                logger.debug(f"Skipping out-of-order history entry for {res} rollup: {ts}")
+                continue
+            if bucket is None or start > bucket["bucket"]:
+                if bucket is not None:
+                    self._close_bucket(res, bucket)
+                bucket = _new_bucket(_bucket_start(ts, res))
+                self._open[res] = bucket
+
+            bucket["count"] += 1
+            for metric in ROLLUP_METRICS:
+                value = entry.get(metric)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stats = bucket["metrics"].setdefault(metric, _empty_stats())
+                    _fold_value(stats, float(value))
+        return True
+
+    def _close_bucket(self, res: str, bucket: Dict[str, Any]) -> None:
+        self._closed[res].append(bucket)
+        path = self._resolution_file(res)
+        with open(path, "a") as f:
+            f.write(json.dumps(bucket, separators=(",", ":")) + "\n")
+            self._offsets[res] = f.tell()
+        self._line_counts[res] += 1
+        if self._line_counts[res] > 2 * self.retention[res]:
+            self._compact(res)
+
+    def _compact(self, res: str) -> None:
+        """Rewrite a resolution file with only the retained buckets."""
+        path = self._resolution_file(res)
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            for bucket in self._closed[res]:
+                f.write(json.dumps(bucket, separators=(",", ":")) + "\n")
+        temp_path.replace(path)
+        self._offsets[res] = path.stat().st_size
+        self._line_counts[res] = len(self._closed[res])
+
+    def _save_open_state(self) -> None:
+        temp_path = self.state_file.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(self._open, f, separators=(",", ":"))
+        temp_path.replace(self.state_file)
+        self._state_mtime_ns = self.state_file.stat().st_mtime_ns
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _resolution_file(self, res: str) -> Path:
+        return self.rollup_dir / f"{res}.jsonl"
+
+    def _refresh(self) -> None:
+        """Pick up buckets written by another process since the last read."""
+        for res in RESOLUTIONS:
+            path = self._resolution_file(res)
+            if not path.exists():
+                continue
+            size = path.stat().st_size
+            if size < self._offsets[res]:
+                # File was compacted by the writer: reload it in full
+                self._closed[res].clear()
+                self._offsets[res] = 0
+                self._line_counts[res] = 0
+            if size == self._offsets[res]:
+                continue
+            with open(path, "r") as f:
+                f.seek(self._offsets[res])
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    self._offsets[res] += len(line.encode())
+                    try:
+                        self._closed[res].append(json.loads(line))
+                        self._line_counts[res] += 1
+                    except json.JSONDecodeError:
+                        continue
+
+        try:
+            mtime_ns = self.state_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime_ns != self._state_mtime_ns:
+            try:
+                with open(self.state_file, "r") as f:
+                    state = json.load(f)
+                self._open = {res: state.get(res) for res in RESOLUTIONS}
+                self._state_mtime_ns = mtime_ns
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Could not read open rollup buckets: {e}")
+
+    def _buckets(self, res: str, start: Optional[datetime], end: Optional[datetime]) -> List[Dict[str, Any]]:
+        if res not in RESOLUTIONS:
+            raise ValueError(f"Unknown rollup resolution: {res}")
+        with self._lock:
+            self._refresh()
+            buckets = list(self._closed[res])
+            if self._open[res] is not None:
+                buckets.append(self._open[res])
+
+        lower = _bucket_start(start, res).isoformat() if start else None
+        upper = end.isoformat() if end else None
+        return [
+            b for b in buckets
+            if (lower is None or b["bucket"] >= lower) and (upper is None or b["bucket"] <= upper)
+        ]
+
+    def get_series(
+        self,
+        resolution: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        metrics: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a downsampled series of bucket summaries.
+
+        Args:
+            resolution: 'minute', 'hour' or 'day'
+            start: Inclusive lower bound (defaults to oldest retained bucket)
+            end: Inclusive upper bound (defaults to now)
+            metrics: Subset of ROLLUP_METRICS to include
+
+        Returns:
+            List of {"bucket", "count", <metric>: {min, max, mean, p95, count}}
+        """
+        metrics = metrics or list(ROLLUP_METRICS)
+        series = []
+        for bucket in self._buckets(resolution, start, end):
+            point = {"bucket": bucket["bucket"], "count": bucket["count"]}
+            for metric in metrics:
+                point[metric] = _summarize_stats(bucket["metrics"].get(metric, _empty_stats()))
+            series.append(point)
+        return series
+
+    def get_recent_series(self, days: float, metrics: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get the series for the last `days`, at a resolution suited to the span."""
+        span = timedelta(days=days)
+        return self.get_series(
+            resolution_for_span(span),
+            start=datetime.now() - span,
+            metrics=metrics,
+        )
+
+    def summarize(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: str = "hour",
+    ) -> Dict[str, Any]:
+        """Aggregate a whole time range into one min/max/mean/p95 summary per metric."""
+        totals = {metric: _empty_stats() for metric in ROLLUP_METRICS}
+        count = 0
+        for bucket in self._buckets(resolution, start, end):
+            count += bucket["count"]
+            for metric, stats in bucket["metrics"].items():
+                if metric in totals:
+                    _merge_stats(totals[metric], stats)
+        summary = {metric: _summarize_stats(stats) for metric, stats in totals.items()}
+        summary["count"] = count
+        return summary
+
+
+# Global rollup store instance
+_rollup_store: Optional[CQSRollupStore] = None
+_rollup_store_lock = threading.Lock()
+
+
+def get_rollup_store(read_only: bool = True) -> CQSRollupStore:
+    """
+    Get the global CQS rollup store instance.
+
+    Readers get a read-only store unless this process already holds the
+    writer; the writer (the UQO hub) asks for `read_only=False`.
+    """
+    global _rollup_store
+    with _rollup_store_lock:
+        if _rollup_store is None or (not read_only and _rollup_store.read_only):
+            _rollup_store = CQSRollupStore(read_only=read_only)
+        return _rollup_store
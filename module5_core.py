@@ -11,8 +11,14 @@ import json
 from threading import Thread
 import time
 
+from module5.conditional import conditional_json
+from module5.events import HubEventPublisher
+
 app = Flask(__name__)
 
+# Score-change push to the Module 5 orchestrator
+event_publisher = HubEventPublisher("CAE")
+
 # ============================================================================
 # DRIFT DETECTION ALGORITHMS
 # ============================================================================
@@ -130,10 +136,11 @@ class SecurityAnomalyDetector:
     @staticmethod
     def model_integrity_check():
         """Check if model has been tampered with"""
-        import hashlib
+        from security.model_integrity import ModelIntegrityValidator
         try:
-            with open('models/latest_model.pkl', 'rb') as f:
-                model_hash = hashlib.sha256(f.read()).hexdigest()
+            # Streamed in large chunks; never loads the whole model into memory
+            model_hash = ModelIntegrityValidator.calculate_file_checksum(
+                'models/latest_model.pkl')
 
             with open('models/model_hash.txt', 'r') as f:
                 expected_hash = f.read().strip()
@@ -255,10 +262,12 @@ class MetricsEngine:
 # ============================================================================
 
 @app.route('/api/internal-cqs', methods=['GET'])
+@conditional_json
 def get_internal_cqs():
     """Get Internal CQS with category breakdown"""
     engine = MetricsEngine()
     cqs_data = engine.compute_internal_cqs()
+    event_publisher.publish_score(round(cqs_data['internal_cqs'] * 100, 1))
 
     return jsonify({
         'overall_cqs': round(cqs_data['internal_cqs'] * 100, 1),
@@ -274,6 +283,7 @@ def get_internal_cqs():
 
 
 @app.route('/api/drift/performance', methods=['GET'])
+@conditional_json
 def get_performance_drift():
     """Performance drift detection (PSI, KS, ECE)"""
     baseline_features = np.random.normal(0, 1, 1000)
@@ -298,6 +308,7 @@ def get_performance_drift():
 
 
 @app.route('/api/drift/fairness', methods=['GET'])
+@conditional_json
 def get_fairness_drift():
     """Fairness drift monitoring"""
     y_pred = np.random.binomial(1, 0.5, 500)
@@ -317,6 +328,7 @@ def get_fairness_drift():
 
 
 @app.route('/api/security/anomalies', methods=['GET'])
+@conditional_json
 def get_security_anomalies():
     """Security & privacy anomaly detection"""
     access_logs = [45, 48, 42, 51, 47, 200, 49, 46]  # Spike at index 5
@@ -341,6 +353,7 @@ def get_security_anomalies():
 
 
 @app.route('/api/compliance/drift', methods=['GET'])
+@conditional_json
 def get_compliance_drift():
     """Compliance drift detector"""
     gdpr = ComplianceDriftMonitor.gdpr_compliance()
@@ -363,6 +376,7 @@ def get_compliance_drift():
 
 
 @app.route('/api/alerts', methods=['GET'])
+@conditional_json
 def get_alerts():
     """Get all active alerts from Core monitoring"""
     return jsonify({
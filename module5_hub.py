@@ -19,6 +19,10 @@ from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 
 from module5.orchestrator import Module5Orchestrator
+from module5.rollups import get_rollup_store
+from module5.cqs_engine import get_cqs_engine
+from module5.events import LocalEventBus, ScoreChangeEvent
+from module5.conditional import ConditionalFetcher
 
 # Add dashboard directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), 'dashboard'))
@@ -76,8 +80,31 @@ if REPORTING_AVAILABLE:
     except Exception as e:
         logger.error(f"Failed to initialize automated reporting: {e}")
 
-# Initialize orchestrator
-orchestrator = Module5Orchestrator(polling_interval_seconds=30)
+# Shared CQS engine (weights loaded once, hot-reloaded on file change)
+cqs_engine = get_cqs_engine()
+
+# Initialize orchestrator: hubs push score changes, polling only reconciles
+orchestrator = Module5Orchestrator(
+    polling_interval_seconds=30,
+    cqs_engine=cqs_engine,
+    reconciliation_interval_seconds=300
+)
+
+# Score-change events pushed by the hubs (POST /api/events)
+event_bus = LocalEventBus()
+event_bus.subscribe(orchestrator.apply_hub_event)
+
+
+def broadcast_score_event(event: ScoreChangeEvent) -> None:
+    """Forward pushed score changes to connected WebSocket clients."""
+    if websocket_manager:
+        websocket_manager.notify_score_change(
+            event.to_dict(),
+            orchestrator.latest_cqs.to_dict() if orchestrator.latest_cqs else None
+        )
+
+
+event_bus.subscribe(broadcast_score_event)
 
 # Hub URLs for cross-hub integration
 HUB_URLS = {
@@ -98,6 +125,9 @@ HUB_URLS = {
 # QA History storage
 QA_HISTORY_FILE = "qa_history/qa_history.jsonl"
 
+# Revalidating fetcher shared by all cross-hub requests
+hub_fetcher = ConditionalFetcher()
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -105,9 +135,7 @@ QA_HISTORY_FILE = "qa_history/qa_history.jsonl"
 def fetch_json(url: str, timeout: int = 3) -> Dict[str, Any]:
     """Fetch JSON data from URL with error handling."""
     try:
-        response = requests.get(url, timeout=timeout)
-        response.raise_for_status()
-        return response.json()
+        return hub_fetcher.get_json(url, timeout=timeout)
     except Exception as e:
         logger.warning(f"Failed to fetch {url}: {e}")
         
@@ -126,22 +154,8 @@ def fetch_json(url: str, timeout: int = 3) -> Dict[str, Any]:
             return {"error": True, "message": str(e)}
 
 def load_cqs_weights() -> Dict[str, float]:
-    """Load CQS weights from config file."""
-    try:
-        with open("config/cqs_weights.json", "r") as f:
-            config = json.load(f)
-            return config["cqs_weights"]
-    except Exception as e:
-        logger.warning(f"Failed to load CQS weights: {e}")
-        # Default weights
-        return {
-            "crs": 0.20,
-            "sai": 0.25,
-            "ts": 0.20,
-            "fi": 0.20,
-            "ops_score": 0.10,
-            "eml_score": 0.05
-        }
+    """Get the current CQS weights (cached, reloaded when config/cqs_weights.json changes)."""
+    return cqs_engine.weights
 
 def compute_unified_cqs(crs: float, sai: float, ts: float, fi: float, ops_score: float, eml_score: float) -> float:
     """
@@ -158,40 +172,9 @@ def compute_unified_cqs(crs: float, sai: float, ts: float, fi: float, ops_score:
     Returns:
         Unified CQS (0-100)
     """
-    weights = load_cqs_weights()
-    
-    # Convert EML (1-5) to 0-100 scale
-    eml_normalized = (eml_score * 20) if eml_score <= 5 else eml_score
-    
-    # Normalize all scores to 0-1 range for calculation
-    # Handle both 0-1 and 0-100 scales
-    def normalize_score(score):
-        if score == 0:
-            return 0.0
-        elif score <= 1:
-            return score  # Already normalized
-        else:
-            return score / 100.0  # Convert from 0-100 to 0-1
-    
-    crs_norm = normalize_score(crs)
-    sai_norm = normalize_score(sai)
-    ts_norm = normalize_score(ts)
-    fi_norm = normalize_score(fi)
-    ops_norm = normalize_score(ops_score)
-    eml_norm = normalize_score(eml_normalized)
-    
-    unified_cqs = (
-        weights["crs"] * crs_norm +
-        weights["sai"] * sai_norm +
-        weights["ts"] * ts_norm +
-        weights["fi"] * fi_norm +
-        weights["ops_score"] * ops_norm +
-        weights["eml_score"] * eml_norm
+    return cqs_engine.score(
+        crs=crs, sai=sai, ts=ts, fi=fi, ops_score=ops_score, eml_score=eml_score
     )
-    
-    # Return as 0-100 scale
-    result = unified_cqs * 100
-    return round(max(0, min(result, 100)), 2)
 
 def classify_alerts(drift_data: Dict, security_alerts: list, fairness_alerts: list) -> list:
     """Classify and prioritize alerts from different sources."""
@@ -263,6 +246,13 @@ def log_qa_history(qa_data: Dict[str, Any]) -> None:
             f.write(json.dumps(qa_data) + "\n")
     except Exception as e:
         logger.error(f"Failed to log QA history: {e}")
+        return
+
+    try:
+        # Keep minute/hour/day trend rollups in step with the raw history
+        get_rollup_store(read_only=False).add(qa_data)
+    except Exception as e:
+        logger.error(f"Failed to update QA history rollups: {e}")
 
 def load_qa_history(limit: int = 100) -> list:
     """Load recent QA history."""
@@ -1036,11 +1026,12 @@ def api_hub_data(hub_name):
 
 
 def polling_loop():
-    """Background thread that polls hubs periodically."""
-    logger.info("Starting background polling loop...")
+    """Background thread that reconciles with a full hub poll when one is due."""
+    logger.info("Starting background reconciliation loop...")
     while True:
         try:
-            orchestrator.poll_all_hubs()
+            if orchestrator.needs_reconciliation():
+                orchestrator.poll_all_hubs()
         except Exception as e:
             logger.error(f"Polling error: {e}")
 
@@ -1048,6 +1039,20 @@ def polling_loop():
         time.sleep(orchestrator.polling_interval)
 
 
+@app.route('/api/events', methods=['POST'])
+def api_events():
+    """Receive a score-change event pushed by a hub."""
+    try:
+        event = ScoreChangeEvent.from_dict(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    event_bus.publish(event)
+    return jsonify({
+        "accepted": True,
+        "overall_cqs": orchestrator.latest_cqs.overall_cqs if orchestrator.latest_cqs else None,
+        "timestamp": datetime.now().isoformat()
+    }), 202
 
 
 @app.route('/api/global-cqs')
@@ -1203,6 +1208,33 @@ def qa_history():
         logger.error(f"Error in qa-history: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/qa-history/rescore', methods=['POST'])
+def qa_history_rescore():
+    """Rescore QA history with what-if CQS weights in one vectorized pass."""
+    try:
+        payload = request.get_json(silent=True) or {}
+        limit = int(payload.get('limit', request.args.get('limit', 1000)))
+        weights = {**load_cqs_weights(), **payload.get('weights', {})}
+        
+        history = load_qa_history(limit)
+        rescored = cqs_engine.score_history(history, weights=weights)
+        
+        return jsonify({
+            "history": [
+                {"timestamp": entry.get("timestamp"), "cqs": entry.get("cqs"), "rescored_cqs": float(score)}
+                for entry, score in zip(history, rescored)
+            ],
+            "count": len(history),
+            "weights": weights,
+            "formula": cqs_engine.formula(weights),
+            "timestamp": datetime.now().isoformat()
+        })
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in qa-history rescore: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/alerts')
 def api_alerts():
     """Get classified alerts from all sources."""
@@ -1270,7 +1302,7 @@ def api_unified_cqs():
                 "ops": ops
             },
             "weights": load_cqs_weights(),
-            "formula": "CQS = 0.20*CRS + 0.25*SAI + 0.20*TS + 0.20*FI + 0.10*OPS + 0.05*(EML*20)",
+            "formula": cqs_engine.formula(),
             "timestamp": datetime.now().isoformat()
         })
         
@@ -1431,7 +1463,7 @@ if __name__ == '__main__':
     # Start WebSocket background updates if available
     if websocket_manager:
         try:
-            websocket_manager.start_background_updates(interval=30)
+            websocket_manager.start_background_updates(interval=300)
             logger.info("WebSocket real-time updates started")
         except Exception as e:
             logger.error(f"Failed to start WebSocket updates: {e}")
@@ -1467,6 +1499,7 @@ if __name__ == '__main__':
     logger.info("    • GET /api/reports/generate/<type> - Generate reports")
     logger.info("    • POST /api/reports/trigger/<type> - Trigger report delivery")
     logger.info("    • GET /api/hub/{hub_name} - Specific hub data")
+    logger.info("    • POST /api/events - Hub score-change push events")
     logger.info("")
     logger.info("=" * 80)
 
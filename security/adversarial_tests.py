@@ -4,14 +4,29 @@ Tests model robustness against adversarial attacks
 Implements FGSM, PGD, and membership inference attacks
 """
 
+import hashlib
+import json
+import math
+import os
+import pickle
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Callable, Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Epsilon grid for robustness curves (inputs scaled to [0, 1])
+DEFAULT_EPSILONS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3)
+
+# Anchored to the project root so hubs started from dashboard/ share the cache
+DEFAULT_ATTACK_RESULTS_DB = str(Path(__file__).resolve().parents[1] / "data" / "attack_results.db")
+
 
 @dataclass
 class AdversarialTestResult:
@@ -50,6 +65,11 @@ class MembershipInferenceResult:
     confidence: float
     samples_tested: int
     timestamp: str = None
+    method: str = "threshold"
+    auc: Optional[float] = None
+    p_value: Optional[float] = None  # vs. random guessing
+    shadow_models: int = 0
+    model_checksum: Optional[str] = None
 
     def __post_init__(self):
         if self.timestamp is None:
@@ -63,16 +83,408 @@ class MembershipInferenceResult:
             "is_private": self.is_private,
             "confidence": self.confidence,
             "samples_tested": self.samples_tested,
+            "timestamp": self.timestamp,
+            "method": self.method,
+            "auc": self.auc,
+            "p_value": self.p_value,
+            "shadow_models": self.shadow_models,
+            "model_checksum": self.model_checksum
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MembershipInferenceResult":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+def _predict(model, x: np.ndarray) -> np.ndarray:
+    preds = model.predict(x)
+    if isinstance(preds, (list, tuple)):
+        preds = preds[0]
+    return np.asarray(preds)
+
+
+def _as_labels(values: np.ndarray) -> np.ndarray:
+    """Class labels from one-hot targets, probability rows or a label vector"""
+    values = np.asarray(values)
+    if values.ndim > 1:
+        return np.argmax(values, axis=1)
+    if (np.issubdtype(values.dtype, np.floating) and values.size
+            and values.min() >= 0 and values.max() <= 1 and np.any(values != np.round(values))):
+        # Positive-class probabilities
+        return (values >= 0.5).astype(int)
+    return values
+
+
+def _attack_loss(preds: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Per-sample loss the attacker maximizes (cross-entropy, or squared error for 1-D outputs)"""
+    if preds.ndim > 1:
+        probs = np.clip(preds, 1e-12, 1.0)
+        if y.ndim > 1:
+            return -np.sum(y * np.log(probs), axis=1)
+        return -np.log(probs[np.arange(len(preds)), y.astype(int)])
+    return (preds - y) ** 2
+
+
+def _margin_loss(preds: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Per-sample C&W margin: true-class score minus the best other class (negative once fooled)"""
+    if preds.ndim > 1:
+        labels = _as_labels(y) if y.ndim > 1 else y.astype(int)
+        rows = np.arange(len(preds))
+        true_scores = preds[rows, labels]
+        others = preds.astype(float)
+        others[rows, labels] = -np.inf
+        return true_scores - others.max(axis=1)
+    return -_attack_loss(preds, y)
+
+
+class AttackEngine:
+    """
+    NumPy-only adversarial attacks for black-box models on CPU.
+
+    Gradients are central finite differences per feature. For a minibatch of
+    b samples with d features, the 2*b*d perturbed inputs and the b current
+    inputs are stacked and scored in one `model.predict` call, which is split
+    only when it would exceed `max_rows`. The unperturbed rows show which
+    samples are already misclassified, and those samples stop iterating.
+    """
+
+    def __init__(self, model, batch_size: int = 32, fd_step: float = 1e-3,
+                 max_rows: int = 65536, clip: Optional[Tuple[float, float]] = None):
+        self.model = model
+        self.batch_size = batch_size
+        self.fd_step = fd_step
+        self.max_rows = max_rows
+        self.clip = clip
+        self.predict_calls = 0
+        self.predict_rows = 0
+        self.sample_iterations = 0
+        self.stopped_early = 0
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        self.predict_calls += 1
+        self.predict_rows += len(x)
+        return _predict(self.model, x)
+
+    def _project(self, x_adv: np.ndarray, x: np.ndarray, epsilon: float = None) -> np.ndarray:
+        if epsilon is not None:
+            x_adv = np.clip(x_adv, x - epsilon, x + epsilon)
+        if self.clip is not None:
+            x_adv = np.clip(x_adv, *self.clip)
+        return x_adv
+
+    def evaluate(self, x: np.ndarray, y: np.ndarray,
+                 objective: Callable[[np.ndarray, np.ndarray], np.ndarray] = _attack_loss
+                 ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predictions at x and the finite-difference gradient of `objective`.
+
+        Args:
+            x: Inputs of shape (n, ...)
+            y: Targets for x
+            objective: Per-sample objective of (predictions, targets)
+
+        Returns:
+            Tuple of (predictions at x, gradient with the shape of x)
+        """
+        n = len(x)
+        shape = x.shape[1:]
+        flat = x.reshape(n, -1)
+        d = flat.shape[1]
+        step = np.eye(d) * self.fd_step
+
+        # Features per call for one sample, then samples per call
+        block = min(d, max(1, (self.max_rows - 1) // 2))
+        per_call = max(1, self.max_rows // (2 * block + 1))
+
+        preds_parts = []
+        grad = np.empty((n, d))
+        for start in range(0, n, per_call):
+            fb = flat[start:start + per_call]
+            yb = y[start:start + per_call]
+            b = len(fb)
+            for j in range(0, d, block):
+                k = min(block, d - j)
+                offsets = step[j:j + k]
+                plus = (fb[:, None, :] + offsets).reshape(-1, d)
+                minus = (fb[:, None, :] - offsets).reshape(-1, d)
+                center = fb if j == 0 else fb[:0]
+                preds = self.predict(np.concatenate([center, plus, minus]).reshape(-1, *shape))
+
+                if j == 0:
+                    preds_parts.append(preds[:b])
+                y_rep = np.repeat(yb, k, axis=0)
+                loss_plus = objective(preds[len(center):len(center) + b * k], y_rep)
+                loss_minus = objective(preds[len(center) + b * k:], y_rep)
+                grad[start:start + b, j:j + k] = (
+                    (loss_plus - loss_minus).reshape(b, k) / (2 * self.fd_step))
+
+        return np.concatenate(preds_parts), grad.reshape(x.shape)
+
+    def _iterate(self, x: np.ndarray, y: np.ndarray, x_adv: np.ndarray, iterations: int,
+                 objective: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                 update: Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray],
+                 early_stop: bool, done: np.ndarray = None) -> np.ndarray:
+        """Run `update(x_adv, x, grad)` per minibatch until each sample is fooled or iterations run out"""
+        for start in range(0, len(x), self.batch_size):
+            xb = x[start:start + self.batch_size]
+            yb = y[start:start + self.batch_size]
+            advb = x_adv[start:start + self.batch_size]
+            if done is None:
+                active = np.arange(len(xb))
+            else:
+                active = np.flatnonzero(~done[start:start + self.batch_size])
+
+            for _ in range(iterations):
+                if not len(active):
+                    break
+                preds, grad = self.evaluate(advb[active], yb[active], objective)
+                if early_stop:
+                    fooled = _as_labels(preds) != _as_labels(yb[active])
+                    self.stopped_early += int(fooled.sum())
+                    active, grad = active[~fooled], grad[~fooled]
+                    if not len(active):
+                        break
+                self.sample_iterations += len(active)
+                advb[active] = update(advb[active], xb[active], grad)
+
+        return x_adv
+
+    def fgsm(self, x: np.ndarray, y: np.ndarray, epsilon: float = 0.1) -> np.ndarray:
+        """Fast Gradient Sign Method: one signed gradient step of size epsilon"""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y)
+        return self._iterate(
+            x, y, x.copy(), 1, _attack_loss,
+            lambda adv, orig, grad: self._project(adv + epsilon * np.sign(grad), orig),
+            early_stop=False)
+
+    def pgd(self, x: np.ndarray, y: np.ndarray, epsilon: float = 0.1, step_size: float = 0.01,
+            iterations: int = 40, early_stop: bool = True, x_init: np.ndarray = None) -> np.ndarray:
+        """
+        Projected Gradient Descent within an L-inf ball of radius epsilon.
+
+        Args:
+            x_init: Starting point (projected into the ball), e.g. the result
+                of a smaller-epsilon run
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y)
+        done = None
+        if x_init is None:
+            x_adv = x.copy()
+        else:
+            x_adv = self._project(np.asarray(x_init, dtype=float), x, epsilon)
+            if early_stop:
+                # Samples the starting point already fools need no gradients
+                preds = np.concatenate([
+                    self.predict(x_adv[i:i + self.max_rows]) for i in range(0, len(x_adv), self.max_rows)])
+                done = _as_labels(preds) != _as_labels(y)
+                self.stopped_early += int(done.sum())
+        return self._iterate(
+            x, y, x_adv, iterations, _attack_loss,
+            lambda adv, orig, grad: self._project(adv + step_size * np.sign(grad), orig, epsilon),
+            early_stop, done)
+
+    def carlini_wagner(self, x: np.ndarray, y: np.ndarray, iterations: int = 100,
+                       c: float = 0.1, learning_rate: float = 0.01,
+                       early_stop: bool = True) -> np.ndarray:
+        """
+        Carlini-Wagner style L2 attack.
+
+        Descends margin(x_adv) + c * ||x_adv - x||^2, stopping each sample
+        once it is misclassified, so perturbations stay close to minimal.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y)
+        return self._iterate(
+            x, y, x.copy(), iterations, _margin_loss,
+            lambda adv, orig, grad: self._project(
+                adv - learning_rate * (grad + 2 * c * (adv - orig)), orig),
+            early_stop)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "predict_calls": self.predict_calls,
+            "predict_rows": self.predict_rows,
+            "sample_iterations": self.sample_iterations,
+            "stopped_early": self.stopped_early
+        }
+
+
+@dataclass
+class RobustnessCurve:
+    """Adversarial accuracy of one attack across a grid of epsilons"""
+    attack_type: str
+    epsilons: List[float]
+    adversarial_accuracy: List[float]
+    clean_accuracy: float
+    iterations: int
+    samples_tested: int
+    model_checksum: Optional[str] = None
+    cache_key: Optional[str] = None
+    cached: bool = False
+    timestamp: str = None
+
+    def __post_init__(self):
+        if self.timestamp is None:
+            self.timestamp = datetime.now().isoformat()
+
+    @property
+    def robustness_scores(self) -> List[float]:
+        if self.clean_accuracy <= 0:
+            return [0.0 for _ in self.epsilons]
+        return [acc / self.clean_accuracy for acc in self.adversarial_accuracy]
+
+    def results(self) -> List[AdversarialTestResult]:
+        """One AdversarialTestResult per epsilon"""
+        return [
+            AdversarialTestResult(
+                attack_type=self.attack_type,
+                clean_accuracy=self.clean_accuracy,
+                adversarial_accuracy=acc,
+                robustness_score=score,
+                epsilon=eps,
+                iterations=self.iterations,
+                timestamp=self.timestamp
+            )
+            for eps, acc, score in zip(self.epsilons, self.adversarial_accuracy, self.robustness_scores)
+        ]
+
+    def at(self, epsilon: float) -> AdversarialTestResult:
+        """Result at the grid epsilon closest to `epsilon`"""
+        results = self.results()
+        return min(results, key=lambda r: abs(r.epsilon - epsilon))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attack_type": self.attack_type,
+            "epsilons": self.epsilons,
+            "adversarial_accuracy": self.adversarial_accuracy,
+            "robustness_scores": self.robustness_scores,
+            "clean_accuracy": self.clean_accuracy,
+            "iterations": self.iterations,
+            "samples_tested": self.samples_tested,
+            "model_checksum": self.model_checksum,
+            "cache_key": self.cache_key,
+            "cached": self.cached,
             "timestamp": self.timestamp
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RobustnessCurve":
+        fields = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        return cls(**fields)
+
+
+def array_digest(*arrays: np.ndarray) -> str:
+    """Content hash of one or more arrays (shape and dtype included)"""
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def model_fingerprint(model) -> Optional[str]:
+    """Hash of a picklable model's state; None if it cannot be pickled"""
+    try:
+        return hashlib.sha256(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+    except Exception:
+        return None
+
+
+class AttackResultCache:
+    """
+    SQLite cache of attack results keyed by (model checksum, dataset hash,
+    attack config), so hubs can serve results without rerunning attacks.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_ATTACK_RESULTS_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_database()
+
+    def _init_database(self):
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS attack_results (
+                cache_key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                model_checksum TEXT NOT NULL,
+                dataset_hash TEXT NOT NULL,
+                config TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_attack_results_model "
+            "ON attack_results (model_checksum, kind, created_at)")
+
+    @staticmethod
+    def make_key(kind: str, model_checksum: str, dataset_hash: str, config: Dict[str, Any]) -> str:
+        payload = json.dumps([kind, model_checksum, dataset_hash, config], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM attack_results WHERE cache_key = ?", (cache_key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, cache_key: str, kind: str, model_checksum: str, dataset_hash: str,
+            config: Dict[str, Any], result: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO attack_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cache_key, kind, model_checksum, dataset_hash,
+                 json.dumps(config, sort_keys=True, default=str), json.dumps(result, default=str),
+                 datetime.now().isoformat()))
+
+    def latest(self, model_checksum: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Most recent result of a kind for a model, whatever data/config produced it"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM attack_results WHERE model_checksum = ? AND kind = ? "
+                "ORDER BY created_at DESC LIMIT 1", (model_checksum, kind)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def invalidate_model(self, model_checksum: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM attack_results WHERE model_checksum = ?", (model_checksum,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_attack_result_cache: Optional[AttackResultCache] = None
+_attack_result_cache_lock = threading.Lock()
+
+
+def get_attack_result_cache() -> AttackResultCache:
+    """Get the global attack result cache instance"""
+    global _attack_result_cache
+    with _attack_result_cache_lock:
+        if _attack_result_cache is None:
+            _attack_result_cache = AttackResultCache()
+        return _attack_result_cache
+
 
 class AdversarialAttacks:
     """Implements common adversarial attacks"""
 
     @staticmethod
     def fgsm_attack(model, x: np.ndarray, y: np.ndarray,
-                    epsilon: float = 0.1) -> np.ndarray:
+                    epsilon: float = 0.1, batch_size: int = 32) -> np.ndarray:
         """
         Fast Gradient Sign Method (FGSM) attack.
 
@@ -83,45 +495,18 @@ class AdversarialAttacks:
             x: Input features (numpy array)
             y: True labels
             epsilon: Step size / perturbation budget
+            batch_size: Samples per stacked predict call
 
         Returns:
             Adversarial examples
         """
-        try:
-            import tensorflow as tf
-
-            x_tensor = tf.Variable(x, dtype=tf.float32)
-
-            with tf.GradientTape() as tape:
-                predictions = model.predict(x_tensor)
-                if isinstance(predictions, tf.Tensor):
-                    loss = tf.nn.softmax_cross_entropy_with_logits(
-                        y, predictions)
-                else:
-                    loss = np.mean((predictions - y) ** 2)
-
-            if isinstance(loss, tf.Tensor):
-                gradients = tape.gradient(loss, x_tensor)
-                x_adv = x_tensor + epsilon * tf.sign(gradients)
-            else:
-                # Fallback: numerical gradient
-                x_adv = x + epsilon * \
-                    np.sign((model.predict(x + 1e-4) - model.predict(x)) / 1e-4)
-
-            return x_adv.numpy() if hasattr(x_adv, 'numpy') else x_adv
-
-        except ImportError:
-            # TensorFlow not available, use numerical approach
-            logger.warning(
-                "TensorFlow not available, using numerical gradients")
-            grad = (model.predict(x + 1e-4) -
-                    model.predict(x - 1e-4)) / (2 * 1e-4)
-            return x + epsilon * np.sign(grad)
+        return AttackEngine(model, batch_size=batch_size).fgsm(x, y, epsilon)
 
     @staticmethod
     def pgd_attack(model, x: np.ndarray, y: np.ndarray,
                    epsilon: float = 0.1, step_size: float = 0.01,
-                   iterations: int = 40) -> np.ndarray:
+                   iterations: int = 40, batch_size: int = 32,
+                   early_stop: bool = True) -> np.ndarray:
         """
         Projected Gradient Descent (PGD) attack.
 
@@ -134,46 +519,19 @@ class AdversarialAttacks:
             epsilon: Maximum perturbation budget
             step_size: Step size per iteration
             iterations: Number of iterations
+            batch_size: Samples per stacked predict call
+            early_stop: Stop iterating on samples that are already misclassified
 
         Returns:
             Adversarial examples
         """
-        x_adv = x.copy()
-
-        for iteration in range(iterations):
-            # Compute gradients
-            try:
-                import tensorflow as tf
-                x_tensor = tf.Variable(x_adv, dtype=tf.float32)
-
-                with tf.GradientTape() as tape:
-                    predictions = model.predict(x_tensor)
-                    if isinstance(predictions, tf.Tensor):
-                        loss = tf.nn.softmax_cross_entropy_with_logits(
-                            y, predictions)
-                    else:
-                        loss = np.mean((predictions - y) ** 2)
-
-                gradients = tape.gradient(loss, x_tensor)
-                grad = gradients.numpy() if hasattr(gradients, 'numpy') else gradients
-
-            except ImportError:
-                # Numerical gradient
-                grad = (model.predict(x_adv + 1e-4) -
-                        model.predict(x_adv - 1e-4)) / (2 * 1e-4)
-
-            # Update adversarial example
-            x_adv = x_adv + step_size * np.sign(grad)
-
-            # Project back to epsilon ball
-            x_adv = np.clip(x_adv, x - epsilon, x + epsilon)
-            x_adv = np.clip(x_adv, 0, 1)  # Clip to valid range
-
-        return x_adv
+        engine = AttackEngine(model, batch_size=batch_size, clip=(0, 1))
+        return engine.pgd(x, y, epsilon, step_size, iterations, early_stop)
 
     @staticmethod
     def carlini_wagner_attack(model, x: np.ndarray, y: np.ndarray,
-                              iterations: int = 100, c: float = 0.1) -> np.ndarray:
+                              iterations: int = 100, c: float = 0.1,
+                              batch_size: int = 32) -> np.ndarray:
         """
         Carlini-Wagner (C&W) attack.
 
@@ -185,38 +543,12 @@ class AdversarialAttacks:
             y: True labels
             iterations: Number of iterations
             c: Regularization parameter
+            batch_size: Samples per stacked predict call
 
         Returns:
             Adversarial examples
         """
-        x_adv = x.copy()
-
-        for iteration in range(iterations):
-            try:
-                import tensorflow as tf
-                x_tensor = tf.Variable(x_adv, dtype=tf.float32)
-
-                with tf.GradientTape() as tape:
-                    predictions = model.predict(x_tensor)
-                    perturbation = tf.reduce_sum((x_tensor - x) ** 2)
-
-                    if isinstance(predictions, tf.Tensor):
-                        ce_loss = tf.nn.softmax_cross_entropy_with_logits(
-                            y, predictions)
-                    else:
-                        ce_loss = np.mean((predictions - y) ** 2)
-
-                    total_loss = ce_loss + c * perturbation
-
-                gradients = tape.gradient(total_loss, x_tensor)
-                grad = gradients.numpy() if hasattr(gradients, 'numpy') else gradients
-
-                x_adv = x_adv - 0.01 * grad
-
-            except ImportError:
-                break
-
-        return x_adv
+        return AttackEngine(model, batch_size=batch_size).carlini_wagner(x, y, iterations, c)
 
 
 class RobustnessEvaluation:
@@ -355,6 +687,157 @@ class RobustnessEvaluation:
             iterations=iterations
         )
 
+    @staticmethod
+    def test_epsilon_sweep(model, x_test: np.ndarray, y_test: np.ndarray,
+                           epsilons: List[float], attack: str = "pgd",
+                           iterations: int = 40, sample_size: int = 50,
+                           workers: int = None) -> List[AdversarialTestResult]:
+        """
+        Test robustness at several epsilons concurrently.
+
+        Args:
+            model: Model with predict method
+            x_test: Test features
+            y_test: Test labels
+            epsilons: Attack budgets to evaluate
+            attack: 'fgsm' or 'pgd'
+            iterations: PGD iterations
+            sample_size: Number of samples to test (shared by all epsilons)
+            workers: Concurrent epsilons (default: CPU count)
+
+        Returns:
+            AdversarialTestResult per epsilon, in the order given
+        """
+        if attack not in ("fgsm", "pgd"):
+            raise ValueError(f"Unsupported attack: {attack}")
+
+        # Same subset for every epsilon so the results form one curve
+        if len(x_test) > sample_size:
+            indices = np.random.choice(len(x_test), sample_size, replace=False)
+            x_test, y_test = x_test[indices], y_test[indices]
+
+        def run(epsilon: float) -> AdversarialTestResult:
+            if attack == "fgsm":
+                return RobustnessEvaluation.test_fgsm_robustness(
+                    model, x_test, y_test, epsilon, sample_size=len(x_test))
+            return RobustnessEvaluation.test_pgd_robustness(
+                model, x_test, y_test, epsilon, iterations, sample_size=len(x_test))
+
+        workers = max(1, min(workers or os.cpu_count() or 1, len(epsilons)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, epsilons))
+
+    @staticmethod
+    def robustness_curve(model, x_test: np.ndarray, y_test: np.ndarray,
+                         epsilons: List[float] = DEFAULT_EPSILONS, attack: str = "pgd",
+                         iterations: int = 40, step_size: float = None,
+                         sample_size: int = 200, batch_size: int = 32, seed: int = 0,
+                         model_checksum: str = None, cache: AttackResultCache = None,
+                         use_cache: bool = True) -> RobustnessCurve:
+        """
+        Accuracy-vs-epsilon curve for FGSM or PGD in one pass.
+
+        Args:
+            model: Model with predict method
+            x_test: Test features
+            y_test: Test labels
+            epsilons: Attack budgets (any order)
+            attack: 'fgsm' or 'pgd'
+            iterations: PGD iterations per epsilon
+            step_size: PGD step (default 2.5 * epsilon / iterations)
+            sample_size: Number of samples to test (seeded, so reproducible)
+            batch_size: Samples per stacked predict call
+            seed: Sampling seed
+            model_checksum: Model file checksum for the cache key (default:
+                hash of the pickled model; uncached if unpicklable)
+            cache: Result cache (default: the global attack result cache)
+            use_cache: Serve and store results in the cache
+
+        Returns:
+            RobustnessCurve with epsilons in the order given
+
+        Clean predictions are computed once. FGSM reuses the single clean
+        gradient for every epsilon. PGD runs over increasing epsilons, each
+        warm-started from the previous adversarial examples, so samples that
+        were already fooled at a smaller budget cost no extra model calls.
+        """
+        if attack not in ("fgsm", "pgd"):
+            raise ValueError(f"Unsupported attack: {attack}")
+
+        x_test = np.asarray(x_test, dtype=float)
+        y_test = np.asarray(y_test)
+        if len(x_test) > sample_size:
+            rng = np.random.default_rng(seed)
+            indices = np.sort(rng.choice(len(x_test), sample_size, replace=False))
+            x_test, y_test = x_test[indices], y_test[indices]
+
+        grid = sorted(set(float(e) for e in epsilons))
+        config = {
+            "attack": attack,
+            "epsilons": grid,
+            "iterations": iterations if attack == "pgd" else 1,
+            "step_size": step_size,
+        }
+
+        cache_key = None
+        model_checksum = model_checksum or model_fingerprint(model)
+        if use_cache and model_checksum:
+            cache = cache or get_attack_result_cache()
+            dataset_hash = array_digest(x_test, y_test)
+            cache_key = cache.make_key(f"robustness_{attack}", model_checksum, dataset_hash, config)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                curve = RobustnessCurve.from_dict(cached)
+                curve.cached = True
+                by_eps = dict(zip(curve.epsilons, curve.adversarial_accuracy))
+                curve.epsilons = [float(e) for e in epsilons]
+                curve.adversarial_accuracy = [by_eps[e] for e in curve.epsilons]
+                return curve
+
+        engine = AttackEngine(model, batch_size=batch_size, clip=(0, 1) if attack == "pgd" else None)
+        labels = _as_labels(y_test)
+
+        def accuracy(x_adv: np.ndarray) -> float:
+            preds = np.concatenate([
+                engine.predict(x_adv[i:i + engine.max_rows])
+                for i in range(0, len(x_adv), engine.max_rows)])
+            return float(np.mean(_as_labels(preds) == labels))
+
+        accuracies = {}
+        if attack == "fgsm":
+            clean_preds, grad = engine.evaluate(x_test, y_test)
+            direction = np.sign(grad)
+            for eps in grid:
+                accuracies[eps] = accuracy(x_test + eps * direction)
+        else:
+            clean_preds = np.concatenate([
+                engine.predict(x_test[i:i + engine.max_rows])
+                for i in range(0, len(x_test), engine.max_rows)])
+            x_adv = None
+            for eps in grid:
+                x_adv = engine.pgd(x_test, y_test, eps, step_size or 2.5 * eps / iterations,
+                                   iterations, early_stop=True, x_init=x_adv)
+                accuracies[eps] = accuracy(x_adv)
+
+        curve = RobustnessCurve(
+            attack_type=attack.upper(),
+            epsilons=grid,
+            adversarial_accuracy=[accuracies[e] for e in grid],
+            clean_accuracy=float(np.mean(_as_labels(clean_preds) == labels)),
+            iterations=config["iterations"],
+            samples_tested=len(x_test),
+            model_checksum=model_checksum,
+            cache_key=cache_key
+        )
+        logger.info(f"{curve.attack_type} robustness curve over {len(grid)} epsilons: {engine.get_stats()}")
+
+        if cache_key:
+            cache.put(cache_key, f"robustness_{attack}", model_checksum, dataset_hash, config, curve.to_dict())
+
+        curve.epsilons = [float(e) for e in epsilons]
+        curve.adversarial_accuracy = [accuracies[e] for e in curve.epsilons]
+        return curve
+
     @staticmethod
     def score_robustness(result: AdversarialTestResult) -> Tuple[str, float]:
         """
@@ -377,6 +860,124 @@ class RobustnessEvaluation:
             return "Poor", 0.3
 
 
+class SoftmaxShadowModel:
+    """Small NumPy softmax-regression classifier, the default MIA shadow model"""
+
+    def __init__(self, epochs: int = 300, learning_rate: float = 0.5, l2: float = 1e-4):
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.weights = None
+        self.bias = None
+
+    def fit(self, x: np.ndarray, y: np.ndarray, n_classes: int = None) -> "SoftmaxShadowModel":
+        x = np.asarray(x, dtype=float).reshape(len(x), -1)
+        labels = _as_labels(y).astype(int)
+        n_classes = n_classes or int(labels.max()) + 1
+        targets = np.eye(n_classes)[labels]
+        self.weights = np.zeros((x.shape[1], n_classes))
+        self.bias = np.zeros(n_classes)
+        for _ in range(self.epochs):
+            error = (self.predict(x) - targets) / len(x)
+            self.weights -= self.learning_rate * (x.T @ error + self.l2 * self.weights)
+            self.bias -= self.learning_rate * error.sum(axis=0)
+        return self
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        z = np.asarray(x, dtype=float).reshape(len(x), -1) @ self.weights + self.bias
+        z -= z.max(axis=1, keepdims=True)
+        e = np.exp(z)
+        return e / e.sum(axis=1, keepdims=True)
+
+
+def _probabilities(model, x: np.ndarray, n_classes: int, batch_size: int = 4096) -> np.ndarray:
+    """Class-probability matrix (n, n_classes) from predict_proba or predict, in batches"""
+    parts = []
+    for start in range(0, len(x), batch_size):
+        xb = x[start:start + batch_size]
+        probs = np.asarray(model.predict_proba(xb) if hasattr(model, "predict_proba") else _predict(model, xb),
+                           dtype=float)
+        if probs.ndim == 1:
+            if np.all(probs == np.round(probs)) and n_classes > 2:
+                probs = np.eye(n_classes)[probs.astype(int)]
+            else:
+                probs = np.column_stack([1 - probs, probs])
+        classes = getattr(model, "classes_", None)
+        if classes is not None and probs.shape[1] < n_classes:
+            # sklearn drops classes absent from a shadow split
+            full = np.zeros((len(probs), n_classes))
+            full[:, np.asarray(classes, dtype=int)] = probs
+            probs = full
+        parts.append(probs)
+    return np.concatenate(parts) if parts else np.empty((0, n_classes))
+
+
+def membership_features(probs: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Per-sample attack features: top confidence, prediction entropy and true-label loss"""
+    p = np.clip(probs, 1e-12, 1.0)
+    confidence = p.max(axis=1)
+    entropy = -np.sum(p * np.log(p), axis=1)
+    loss = -np.log(p[np.arange(len(p)), labels])
+    return np.column_stack([confidence, entropy, loss])
+
+
+def _train_shadow(factory: Callable[[], Any], x: np.ndarray, y: np.ndarray, n_classes: int,
+                  seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Train one shadow model on a random half of the pool; features for its members and non-members"""
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(x))
+    members, non_members = order[:len(x) // 2], order[len(x) // 2:]
+
+    model = factory()
+    labels = _as_labels(y).astype(int)
+    try:
+        model.fit(x[members], y[members], n_classes=n_classes)
+    except TypeError:
+        model.fit(x[members], labels[members])
+
+    return (membership_features(_probabilities(model, x[members], n_classes), labels[members]),
+            membership_features(_probabilities(model, x[non_members], n_classes), labels[non_members]))
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-np.clip(z, -500, 500)))
+
+
+def _fit_attack_model(features: np.ndarray, targets: np.ndarray,
+                      iterations: int = 25) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Logistic regression (Newton steps) on standardized features"""
+    mean = features.mean(axis=0)
+    std = features.std(axis=0) + 1e-12
+    design = np.column_stack([(features - mean) / std, np.ones(len(features))])
+    weights = np.zeros(design.shape[1])
+    for _ in range(iterations):
+        p = _sigmoid(design @ weights)
+        # Small ridge term keeps Newton steps finite on separable features
+        hessian = design.T @ (design * (p * (1 - p))[:, None]) + 1e-3 * np.eye(len(weights))
+        weights -= np.linalg.solve(hessian, design.T @ (p - targets) + 1e-3 * weights)
+    return weights, mean, std
+
+
+def _attack_scores(model: Tuple[np.ndarray, np.ndarray, np.ndarray], features: np.ndarray) -> np.ndarray:
+    weights, mean, std = model
+    design = np.column_stack([(features - mean) / std, np.ones(len(features))])
+    return _sigmoid(design @ weights)
+
+
+def _roc_auc(member_scores: np.ndarray, non_member_scores: np.ndarray) -> float:
+    """AUC as the Mann-Whitney U statistic (ties counted half)"""
+    scores = np.concatenate([member_scores, non_member_scores])
+    ranks = np.empty(len(scores))
+    order = np.argsort(scores, kind="mergesort")
+    ranks[order] = np.arange(1, len(scores) + 1)
+    # Average ranks over ties
+    _, inverse, counts = np.unique(scores, return_inverse=True, return_counts=True)
+    sums = np.bincount(inverse, weights=ranks)
+    ranks = (sums / counts)[inverse]
+    n1, n0 = len(member_scores), len(non_member_scores)
+    return float((ranks[:n1].sum() - n1 * (n1 + 1) / 2) / (n1 * n0))
+
+
 class MembershipInferenceAttack:
     """Tests for membership inference attacks (data leakage)"""
 
@@ -468,6 +1069,119 @@ class MembershipInferenceAttack:
             samples_tested=len(x_train_sample) + len(x_test_sample)
         )
 
+    @staticmethod
+    def shadow_model_attack(model, x_train: np.ndarray, y_train: np.ndarray,
+                            x_test: np.ndarray, y_test: np.ndarray,
+                            x_shadow: np.ndarray = None, y_shadow: np.ndarray = None,
+                            shadow_factory: Callable[[], Any] = SoftmaxShadowModel,
+                            n_shadow: int = 8, workers: int = None, batch_size: int = 4096,
+                            seed: int = 0, model_checksum: str = None,
+                            cache: AttackResultCache = None,
+                            use_cache: bool = True) -> MembershipInferenceResult:
+        """
+        Shadow-model membership inference over the full train and test sets.
+
+        Args:
+            model: Target model with predict (or predict_proba) method
+            x_train, y_train: Target's training data (members)
+            x_test, y_test: Held-out data (non-members)
+            x_shadow, y_shadow: Attacker's data from the same distribution
+                (default: the test set)
+            shadow_factory: Picklable callable returning an unfitted model
+                with fit/predict; should resemble the target's architecture
+            n_shadow: Number of shadow models
+            workers: Process pool size for shadow training (1 = in-process)
+            batch_size: Rows per target predict call
+            seed: Seed for the shadow member/non-member splits
+            model_checksum: Model file checksum for the cache key (default:
+                hash of the pickled model; uncached if unpicklable)
+            cache: Result cache (default: the global attack result cache)
+            use_cache: Serve and store results in the cache
+
+        Returns:
+            MembershipInferenceResult; attack_success_rate is balanced
+            accuracy, so unequal train/test sizes do not bias it
+
+        Each shadow model trains on a random half of the shadow pool. Its
+        confidence, entropy and loss on members and non-members train a
+        logistic attack model, which is then applied to the target's
+        predictions on every training and test sample.
+        """
+        x_train, x_test = np.asarray(x_train, dtype=float), np.asarray(x_test, dtype=float)
+        y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+        if x_shadow is None:
+            x_shadow, y_shadow = x_test, y_test
+        x_shadow, y_shadow = np.asarray(x_shadow, dtype=float), np.asarray(y_shadow)
+
+        train_labels = _as_labels(y_train).astype(int)
+        test_labels = _as_labels(y_test).astype(int)
+        n_classes = int(max(train_labels.max(), test_labels.max(), _as_labels(y_shadow).max())) + 1
+        if y_train.ndim > 1:
+            n_classes = max(n_classes, y_train.shape[1])
+
+        config = {
+            "n_shadow": n_shadow,
+            "seed": seed,
+            "shadow_factory": getattr(shadow_factory, "__qualname__", repr(shadow_factory)),
+        }
+        cache_key = None
+        model_checksum = model_checksum or model_fingerprint(model)
+        if use_cache and model_checksum:
+            cache = cache or get_attack_result_cache()
+            dataset_hash = array_digest(x_train, y_train, x_test, y_test, x_shadow, y_shadow)
+            cache_key = cache.make_key("membership_inference", model_checksum, dataset_hash, config)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return MembershipInferenceResult.from_dict(cached)
+
+        tasks = [(shadow_factory, x_shadow, y_shadow, n_classes, seed + i) for i in range(n_shadow)]
+        if workers is None:
+            workers = min(os.cpu_count() or 1, 8)
+        if workers <= 1 or n_shadow <= 1:
+            shadows = [_train_shadow(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, n_shadow)) as pool:
+                shadows = list(pool.map(_train_shadow, *zip(*tasks)))
+
+        features = np.concatenate([f for pair in shadows for f in pair])
+        targets = np.concatenate([
+            np.full(len(f), float(i % 2 == 0)) for pair in shadows for i, f in enumerate(pair)])
+        attack_model = _fit_attack_model(features, targets)
+
+        member_scores = _attack_scores(attack_model, membership_features(
+            _probabilities(model, x_train, n_classes, batch_size), train_labels))
+        non_member_scores = _attack_scores(attack_model, membership_features(
+            _probabilities(model, x_test, n_classes, batch_size), test_labels))
+
+        true_positive_rate = float(np.mean(member_scores > 0.5))
+        true_negative_rate = float(np.mean(non_member_scores <= 0.5))
+        attack_success_rate = (true_positive_rate + true_negative_rate) / 2
+
+        # One-sided test against random guessing (balanced accuracy 0.5)
+        n1, n0 = len(member_scores), len(non_member_scores)
+        z = (attack_success_rate - 0.5) / math.sqrt(0.0625 / n1 + 0.0625 / n0)
+        p_value = 0.5 * math.erfc(z / math.sqrt(2))
+
+        baseline = 0.5
+        advantage = attack_success_rate - baseline
+        result = MembershipInferenceResult(
+            attack_success_rate=float(attack_success_rate),
+            baseline_success_rate=baseline,
+            advantage=float(advantage),
+            is_private=attack_success_rate < 0.55,
+            confidence=float(abs(advantage)) * 100,
+            samples_tested=n1 + n0,
+            method="shadow_models",
+            auc=_roc_auc(member_scores, non_member_scores),
+            p_value=float(p_value),
+            shadow_models=n_shadow,
+            model_checksum=model_checksum
+        )
+
+        if cache_key:
+            cache.put(cache_key, "membership_inference", model_checksum, dataset_hash, config, result.to_dict())
+        return result
+
 
 class AdversarialReport:
     """Generates adversarial testing reports"""
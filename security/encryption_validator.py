@@ -4,16 +4,20 @@ Verifies system encryption configuration meets security standards
 Checks for AES-256, TLS 1.2+, key management policies
 """
 
+import asyncio
 import re
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 from pathlib import Path
 import yaml
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 import ssl
 import socket
 
@@ -72,6 +76,21 @@ class EncryptionValidator:
         'des', 'md5', 'rc4', 'md4', 'sha1', 'aes-128', 'aes-192', 'ecb'
     }
 
+    # Per-component score factors (multiplied together by _calculate_score)
+    ALGORITHM_SCORES = {
+        EncryptionAlgorithm.AES_256: 1.0,
+        EncryptionAlgorithm.AES_192: 0.9,
+        EncryptionAlgorithm.AES_128: 0.7,
+        EncryptionAlgorithm.CHACHA20: 0.95,
+        EncryptionAlgorithm.WEAK: 0.2,
+    }
+    TLS_VERSION_SCORES = {
+        TLSVersion.TLS_1_3: 1.0,
+        TLSVersion.TLS_1_2: 0.95,
+        TLSVersion.TLS_1_1: 0.5,
+        TLSVersion.TLS_1_0: 0.1,
+    }
+
     @staticmethod
     def parse_encryption_config(config: Dict[str, Any]) -> Optional[EncryptionConfig]:
         """
@@ -206,48 +225,44 @@ class EncryptionValidator:
         """Calculate compliance score (0-1)"""
         score = 1.0
 
-        # Algorithm scoring
-        if algorithm == EncryptionAlgorithm.AES_256:
-            score *= 1.0
-        elif algorithm == EncryptionAlgorithm.AES_192:
-            score *= 0.9
-        elif algorithm == EncryptionAlgorithm.AES_128:
-            score *= 0.7
-        elif algorithm == EncryptionAlgorithm.CHACHA20:
-            score *= 0.95
-        elif algorithm == EncryptionAlgorithm.WEAK:
-            score *= 0.2
-        else:
-            score *= 0.0
+        score *= EncryptionValidator.ALGORITHM_SCORES.get(algorithm, 0.0)
+        score *= EncryptionValidator._key_length_score(key_length)
+        score *= EncryptionValidator.TLS_VERSION_SCORES.get(tls_version, 0.0)
+
+        # Issue penalty
+        score *= max(0.0, 1.0 - (len(issues) * 0.1))
 
-        # Key length scoring
+        return max(0.0, min(1.0, score))
+
+    @staticmethod
+    def _key_length_score(key_length: int) -> float:
         if key_length >= 256:
-            score *= 1.0
+            return 1.0
         elif key_length >= 192:
-            score *= 0.9
+            return 0.9
         elif key_length >= 128:
-            score *= 0.7
+            return 0.7
         elif key_length > 0:
-            score *= 0.3
-        else:
-            score *= 0.0
-
-        # TLS scoring
-        if tls_version == TLSVersion.TLS_1_3:
-            score *= 1.0
-        elif tls_version == TLSVersion.TLS_1_2:
-            score *= 0.95
-        elif tls_version == TLSVersion.TLS_1_1:
-            score *= 0.5
-        elif tls_version == TLSVersion.TLS_1_0:
-            score *= 0.1
-        else:
-            score *= 0.0
+            return 0.3
+        return 0.0
 
-        # Issue penalty
-        score *= max(0.0, 1.0 - (len(issues) * 0.1))
+    @staticmethod
+    def component_scores(enc_config: EncryptionConfig) -> Dict[str, float]:
+        """Per-component scores (0-1) for a parsed configuration"""
+        rotation = enc_config.key_rotation_days
+        if rotation <= EncryptionValidator.RECOMMENDED_KEY_ROTATION_DAYS:
+            key_management_score = 1.0
+        elif rotation <= EncryptionValidator.MAX_KEY_ROTATION_DAYS:
+            key_management_score = 0.7
+        else:
+            key_management_score = 0.3
 
-        return max(0.0, min(1.0, score))
+        return {
+            "algorithm_score": EncryptionValidator.ALGORITHM_SCORES.get(enc_config.algorithm, 0.0),
+            "key_length_score": EncryptionValidator._key_length_score(enc_config.key_length),
+            "tls_score": EncryptionValidator.TLS_VERSION_SCORES.get(enc_config.tls_version, 0.0),
+            "key_management_score": key_management_score
+        }
 
     @staticmethod
     def validate_encryption_config(config: Dict[str, Any]) -> Tuple[bool, EncryptionConfig, List[str]]:
@@ -342,6 +357,21 @@ class EncryptionValidator:
                 "error": str(e)
             }
 
+    @staticmethod
+    def check_tls_certificates(endpoints: List[Any], scanner: "TLSScanner" = None) -> List[Dict[str, Any]]:
+        """
+        Check many TLS endpoints concurrently.
+
+        Args:
+            endpoints: 'host', 'host:port', (host, port) or {'hostname', 'port'}
+            scanner: Scanner to use (default: the shared, caching scanner)
+
+        Returns:
+            Scan result dicts in input order
+        """
+        scanner = scanner or get_tls_scanner()
+        return [result.to_dict() for result in scanner.scan(endpoints)]
+
     @staticmethod
     def generate_encryption_report(config: Dict[str, Any]) -> str:
         """Generate human-readable encryption audit report"""
@@ -380,3 +410,302 @@ Recommendations:
             report += "- Document key management procedures\n"
 
         return report
+
+
+def _der_element(data: bytes, pos: int) -> Tuple[int, int, int]:
+    """(tag, content start, content end) of the DER element at pos"""
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[pos:pos + size], "big")
+        pos += size
+    return tag, pos, pos + length
+
+
+def _der_not_after(der: bytes) -> Optional[float]:
+    """
+    notAfter of a DER certificate as a Unix timestamp.
+
+    getpeercert() returns {} when the certificate was not verified, so the
+    validity is read straight from the binary form instead.
+    """
+    try:
+        _, cert_start, _ = _der_element(der, 0)
+        _, pos, _ = _der_element(der, cert_start)  # tbsCertificate
+        tag, _, end = _der_element(der, pos)
+        if tag == 0xA0:  # explicit version
+            pos = end
+        for _ in range(3):  # serialNumber, signature, issuer
+            pos = _der_element(der, pos)[2]
+        _, validity_start, _ = _der_element(der, pos)
+        not_before_end = _der_element(der, validity_start)[2]
+        tag, start, end = _der_element(der, not_before_end)
+        text = der[start:end].decode("ascii")
+        fmt = "%y%m%d%H%M%SZ" if tag == 0x17 else "%Y%m%d%H%M%SZ"
+        return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc).timestamp()
+    except (IndexError, ValueError, UnicodeDecodeError):
+        return None
+
+
+@dataclass
+class TLSScanResult:
+    """Outcome of one TLS endpoint scan"""
+    hostname: str
+    port: int
+    connected: bool
+    protocol: Optional[str] = None
+    cipher: Optional[str] = None
+    cipher_bits: Optional[int] = None
+    verified: bool = False
+    cert: Optional[Dict[str, Any]] = None
+    not_after: Optional[str] = None
+    days_to_expiry: Optional[float] = None
+    error: Optional[str] = None
+    handshake_refused: bool = False  # Reachable, but no TLS handshake succeeded
+    cached: bool = False
+    scanned_at: str = None
+
+    def __post_init__(self):
+        if self.scanned_at is None:
+            self.scanned_at = datetime.now().isoformat()
+
+    @property
+    def tls_version(self) -> TLSVersion:
+        return EncryptionValidator._parse_tls_version(self.protocol or "")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "tls_version": self.tls_version.value}
+
+
+def _parse_endpoint(endpoint: Any, default_port: int = 443) -> Tuple[str, int]:
+    """(hostname, port) from 'host', 'host:port', '[v6]:port', a tuple or a dict"""
+    if isinstance(endpoint, dict):
+        return endpoint["hostname"], int(endpoint.get("port", default_port))
+    if isinstance(endpoint, (tuple, list)):
+        return endpoint[0], int(endpoint[1]) if len(endpoint) > 1 else default_port
+    text = str(endpoint).strip()
+    if text.startswith("["):
+        host, _, rest = text[1:].partition("]")
+        return host, int(rest.lstrip(":") or default_port)
+    if text.count(":") == 1:
+        host, port = text.split(":")
+        return host, int(port)
+    return text, default_port
+
+
+class TLSScanner:
+    """
+    Concurrent TLS endpoint scanner.
+
+    Endpoints are scanned on one asyncio event loop, at most `concurrency`
+    at a time, each bounded by `timeout` seconds for connect plus handshake.
+    Results are cached per (hostname, port) until the certificate expires or
+    `cache_ttl` passes, whichever is first. Failures are cached for
+    `error_ttl`. Pass `cafile` or `ssl_context` to trust private or
+    self-signed CAs.
+
+    A handshake that fails under the default policy (untrusted or expired
+    certificate, TLS 1.0/1.1, weak ciphers) is retried with a permissive
+    probe context, so the protocol, cipher and certificate expiry are still
+    reported and the endpoint is scored rather than dropped.
+    """
+
+    def __init__(self, timeout: float = 5.0, concurrency: int = 256,
+                 cache_ttl: float = 3600.0, error_ttl: float = 60.0,
+                 cafile: str = None, ssl_context: ssl.SSLContext = None,
+                 max_cache_entries: int = 100_000):
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.cache_ttl = cache_ttl
+        self.error_ttl = error_ttl
+        self.max_cache_entries = max_cache_entries
+        self.context = ssl_context or ssl.create_default_context(cafile=cafile)
+        # Probe context: accepts anything the local OpenSSL can still speak
+        self._unverified = ssl.create_default_context()
+        self._unverified.check_hostname = False
+        self._unverified.verify_mode = ssl.CERT_NONE
+        self._unverified.minimum_version = ssl.TLSVersion.MINIMUM_SUPPORTED
+        self._unverified.set_ciphers("DEFAULT:@SECLEVEL=0")
+        self._cache: Dict[Tuple[str, int], Tuple[float, TLSScanResult]] = {}
+        self._lock = threading.Lock()
+
+    async def _handshake(self, hostname: str, port: int, context: ssl.SSLContext) -> TLSScanResult:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(hostname, port, ssl=context, server_hostname=hostname),
+            self.timeout)
+        try:
+            ssl_object = writer.get_extra_info("ssl_object")
+            cipher = ssl_object.cipher() or (None, None, None)
+            cert = ssl_object.getpeercert() or None
+            result = TLSScanResult(
+                hostname=hostname,
+                port=port,
+                connected=True,
+                protocol=ssl_object.version(),
+                cipher=cipher[0],
+                cipher_bits=cipher[2],
+                verified=context.verify_mode != ssl.CERT_NONE,
+                cert=cert
+            )
+            expires = None
+            if cert and cert.get("notAfter"):
+                expires = ssl.cert_time_to_seconds(cert["notAfter"])
+            else:
+                der = ssl_object.getpeercert(binary_form=True)
+                expires = _der_not_after(der) if der else None
+            if expires is not None:
+                result.not_after = datetime.fromtimestamp(expires, timezone.utc).isoformat()
+                result.days_to_expiry = round((expires - time.time()) / 86400, 2)
+            return result
+        finally:
+            writer.close()
+            try:
+                await asyncio.wait_for(writer.wait_closed(), self.timeout)
+            except Exception:
+                pass
+
+    async def _scan_one(self, hostname: str, port: int, semaphore: asyncio.Semaphore) -> TLSScanResult:
+        async with semaphore:
+            try:
+                return await self._handshake(hostname, port, self.context)
+            except ssl.SSLError as e:
+                if isinstance(e, ssl.SSLCertVerificationError):
+                    error = f"Certificate verification failed: {e.verify_message or e}"
+                else:
+                    error = f"Handshake rejected by default TLS policy: {e.reason or e}"
+                try:
+                    result = await self._handshake(hostname, port, self._unverified)
+                    result.verified = False
+                    result.error = error
+                    return result
+                except Exception as probe_error:
+                    return TLSScanResult(hostname=hostname, port=port, connected=False,
+                                         handshake_refused=True,
+                                         error=f"{error}; probe handshake failed: {probe_error}")
+            except asyncio.TimeoutError:
+                return TLSScanResult(hostname=hostname, port=port, connected=False,
+                                     error=f"Timed out after {self.timeout}s")
+            except Exception as e:
+                return TLSScanResult(hostname=hostname, port=port, connected=False, error=str(e))
+
+    def _cached(self, key: Tuple[str, int], now: float) -> Optional[TLSScanResult]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._cache[key]
+                return None
+        return replace(entry[1], cached=True)
+
+    def _store(self, result: TLSScanResult, now: float):
+        ttl = self.cache_ttl if result.connected and result.error is None else self.error_ttl
+        if result.days_to_expiry is not None and result.days_to_expiry > 0:
+            ttl = min(ttl, result.days_to_expiry * 86400)
+        with self._lock:
+            if len(self._cache) >= self.max_cache_entries:
+                expired = [k for k, (until, _) in self._cache.items() if until <= now]
+                for k in expired or list(self._cache)[:len(self._cache) // 10 + 1]:
+                    del self._cache[k]
+            self._cache[(result.hostname, result.port)] = (now + ttl, result)
+
+    async def scan_async(self, endpoints: List[Any], use_cache: bool = True) -> List[TLSScanResult]:
+        """Scan endpoints concurrently; results are returned in input order"""
+        keys = [_parse_endpoint(e) for e in endpoints]
+        now = time.time()
+        results: Dict[Tuple[str, int], TLSScanResult] = {}
+        pending = []
+        for key in dict.fromkeys(keys):
+            cached = self._cached(key, now) if use_cache else None
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending.append(key)
+
+        if pending:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            scanned = await asyncio.gather(*(self._scan_one(h, p, semaphore) for h, p in pending))
+            now = time.time()
+            for key, result in zip(pending, scanned):
+                self._store(result, now)
+                results[key] = result
+
+        return [results[key] for key in keys]
+
+    def scan(self, endpoints: List[Any], use_cache: bool = True) -> List[TLSScanResult]:
+        """Blocking wrapper around scan_async (safe to call from inside an event loop)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.scan_async(endpoints, use_cache))
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, self.scan_async(endpoints, use_cache)).result()
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def summarize(results: List[TLSScanResult], expiry_warning_days: int = 30) -> Dict[str, Any]:
+        """
+        Aggregate scan results.
+
+        The score is the mean over reachable endpoints of the TLS version
+        factor used for configuration scoring. It is zeroed for legacy TLS
+        (below 1.2), refused handshakes and expired or unverifiable
+        certificates, and halved for certificates expiring within
+        `expiry_warning_days`. Unreachable endpoints are counted but not scored.
+        """
+        connected = [r for r in results if r.connected]
+        refused = [r for r in results if r.handshake_refused]
+        modern = (TLSVersion.TLS_1_2, TLSVersion.TLS_1_3)
+        legacy = [r for r in connected if r.tls_version not in modern]
+        versions: Dict[str, int] = {}
+        for r in connected:
+            versions[r.tls_version.value] = versions.get(r.tls_version.value, 0) + 1
+
+        def endpoint_score(r: TLSScanResult) -> float:
+            if not r.connected or r.tls_version not in modern:
+                return 0.0
+            score = EncryptionValidator.TLS_VERSION_SCORES.get(r.tls_version, 0.0)
+            if not r.verified or (r.days_to_expiry is not None and r.days_to_expiry <= 0):
+                return 0.0
+            if r.days_to_expiry is not None and r.days_to_expiry < expiry_warning_days:
+                score *= 0.5
+            return score
+
+        scored = connected + refused
+
+        def label(r: TLSScanResult) -> str:
+            return f"{r.hostname}:{r.port}"
+
+        return {
+            "total": len(results),
+            "connected": len(connected),
+            "unreachable": [label(r) for r in results if not r.connected and not r.handshake_refused],
+            "handshake_refused": [label(r) for r in refused],
+            "protocols": versions,
+            "legacy_tls": [label(r) for r in legacy],
+            "unverified": [label(r) for r in connected if not r.verified],
+            "expired": [label(r) for r in connected
+                        if r.days_to_expiry is not None and r.days_to_expiry <= 0],
+            "expiring_soon": [label(r) for r in connected
+                              if r.days_to_expiry is not None and 0 < r.days_to_expiry < expiry_warning_days],
+            "cached": sum(1 for r in results if r.cached),
+            "score": (sum(endpoint_score(r) for r in scored) / len(scored)) if scored else None
+        }
+
+
+_tls_scanner: Optional[TLSScanner] = None
+_tls_scanner_lock = threading.Lock()
+
+
+def get_tls_scanner() -> TLSScanner:
+    """Get the global TLS scanner instance"""
+    global _tls_scanner
+    with _tls_scanner_lock:
+        if _tls_scanner is None:
+            _tls_scanner = TLSScanner()
+        return _tls_scanner
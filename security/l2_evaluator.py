@@ -6,18 +6,26 @@ Integrates: Encryption, PII, Model Integrity, Adversarial Testing
 
 import json
 import os
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, asdict
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
 from privacy.anonymization import PrivacyAudit, PIIDetector
-from security.encryption_validator import EncryptionValidator
+from security.encryption_validator import EncryptionValidator, TLSScanner, get_tls_scanner
 from security.model_integrity import ModelIntegrityValidator
-from security.adversarial_tests import RobustnessEvaluation
+from security.adversarial_tests import (
+    AttackResultCache, MembershipInferenceAttack, MembershipInferenceResult,
+    RobustnessCurve, RobustnessEvaluation, get_attack_result_cache)
 
 logger = logging.getLogger(__name__)
 
+# Epsilon at which a cached robustness curve is scored for the SAI
+REFERENCE_EPSILON = 0.1
+
 
 @dataclass
 class EncryptionEvaluation:
@@ -76,10 +84,12 @@ class L2EvaluationResult:
     compliance_status: str  # "compliant", "non-compliant", "needs_improvement"
     critical_issues: List[str]
     action_items: List[str]
+    system: str = "default"  # Evaluated system, for per-system history
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "timestamp": self.timestamp,
+            "system": self.system,
             "overall_sai_score": self.overall_sai_score,
             "encryption_evaluation": self.encryption_evaluation.to_dict(),
             "privacy_evaluation": self.privacy_evaluation.to_dict(),
@@ -92,6 +102,185 @@ class L2EvaluationResult:
         }
 
 
+# Timestamp prefix length per compaction bucket (ISO format)
+COMPACTION_BUCKETS = {"hour": 13, "day": 10}
+
+
+class EvaluationHistoryStore:
+    """
+    Append-only SQLite history of L2 evaluation results.
+
+    Each evaluation is one inserted row, indexed by (system, timestamp), with
+    the headline scores in their own columns so trend charts never parse
+    full results. Writing a result costs the same however long the history
+    is. The latest result per system is kept in memory. `compact()` thins
+    old history to one evaluation per system per hour or day.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._latest: Dict[str, Dict[str, Any]] = {}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_database()
+
+    def _init_database(self):
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS evaluations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                system TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                overall_sai_score REAL,
+                compliance_status TEXT,
+                category_scores TEXT,
+                result TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_evaluations_system ON evaluations (system, timestamp)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_evaluations_timestamp ON evaluations (timestamp)")
+
+    def append(self, result: Dict[str, Any], system: str = "default") -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO evaluations (system, timestamp, overall_sai_score, compliance_status, "
+                "category_scores, result) VALUES (?, ?, ?, ?, ?, ?)",
+                (system, result.get("timestamp", datetime.now().isoformat()),
+                 result.get("overall_sai_score"), result.get("compliance_status"),
+                 json.dumps(result.get("category_scores", {})), json.dumps(result)))
+            latest = self._latest.get(system)
+            if latest is None or result.get("timestamp", "") >= latest.get("timestamp", ""):
+                self._latest[system] = result
+            return cursor.lastrowid
+
+    def append_many(self, results: List[Dict[str, Any]], system: str = "default"):
+        """Append results in one transaction (used for migration)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO evaluations (system, timestamp, overall_sai_score, compliance_status, "
+                    "category_scores, result) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(result.get("system", system), result.get("timestamp", ""),
+                      result.get("overall_sai_score"), result.get("compliance_status"),
+                      json.dumps(result.get("category_scores", {})), json.dumps(result))
+                     for result in results])
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self._latest.clear()
+
+    def latest(self, system: str = None) -> Optional[Dict[str, Any]]:
+        """Most recent result for a system (or across all systems)"""
+        with self._lock:
+            if system is not None and system in self._latest:
+                return self._latest[system]
+            if system is None:
+                row = self._conn.execute(
+                    "SELECT system, result FROM evaluations ORDER BY timestamp DESC, id DESC LIMIT 1").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT system, result FROM evaluations WHERE system = ? "
+                    "ORDER BY timestamp DESC, id DESC LIMIT 1", (system,)).fetchone()
+            if row is None:
+                return None
+            result = json.loads(row[1])
+            self._latest.setdefault(row[0], result)
+            return result
+
+    @staticmethod
+    def _range_clause(start: str = None, end: str = None, system: str = None) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if system is not None:
+            clauses.append("system = ?")
+            params.append(system)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp <= ?")
+            params.append(end)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def range(self, start: str = None, end: str = None, system: str = None,
+              limit: int = None) -> List[Dict[str, Any]]:
+        """Full results with start <= timestamp <= end (ISO strings), oldest first"""
+        where, params = self._range_clause(start, end, system)
+        query = f"SELECT result FROM evaluations{where} ORDER BY timestamp, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def trend(self, start: str = None, end: str = None, system: str = None) -> List[Dict[str, Any]]:
+        """Headline scores only, oldest first, for trend charts"""
+        where, params = self._range_clause(start, end, system)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT system, timestamp, overall_sai_score, compliance_status, category_scores "
+                f"FROM evaluations{where} ORDER BY timestamp, id", params).fetchall()
+        return [
+            {
+                "system": row[0],
+                "timestamp": row[1],
+                "overall_sai_score": row[2],
+                "compliance_status": row[3],
+                "category_scores": json.loads(row[4] or "{}")
+            }
+            for row in rows
+        ]
+
+    def systems(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT system FROM evaluations")]
+
+    def count(self, system: str = None) -> int:
+        where, params = self._range_clause(system=system)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM evaluations{where}", params).fetchone()[0]
+
+    def compact(self, older_than_days: int = 30, keep_per: str = "day", vacuum: bool = False) -> int:
+        """
+        Keep only the last evaluation per system per hour/day for history
+        older than `older_than_days`. Recent history is untouched.
+
+        Returns:
+            Number of evaluations removed
+        """
+        if keep_per not in COMPACTION_BUCKETS:
+            raise ValueError(f"keep_per must be one of {sorted(COMPACTION_BUCKETS)}")
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        prefix = COMPACTION_BUCKETS[keep_per]
+
+        with self._lock:
+            removed = self._conn.execute(f'''
+                DELETE FROM evaluations
+                WHERE timestamp < ? AND id NOT IN (
+                    SELECT MAX(id) FROM evaluations WHERE timestamp < ?
+                    GROUP BY system, substr(timestamp, 1, {prefix})
+                )
+            ''', (cutoff, cutoff)).rowcount
+            if vacuum and removed:
+                self._conn.execute("VACUUM")
+        if removed:
+            logger.info(f"Compacted L2 evaluation history: removed {removed} evaluations")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 class L2Evaluator:
     """
     L2 Privacy & Security Module Evaluator
@@ -99,45 +288,53 @@ class L2Evaluator:
     Real evaluation replacing stub implementation
     """
 
-    def __init__(self, data_dir: str = "data", results_file: str = None):
+    def __init__(self, data_dir: str = "data", results_file: str = None,
+                 history_db: str = None):
         self.data_dir = data_dir
         self.results_file = results_file or f"{data_dir}/l2_evaluation_results.json"
 
         # Initialize validators
         self.encryption_validator = EncryptionValidator()
+        self.tls_scanner: TLSScanner = get_tls_scanner()
         self.pii_detector = PIIDetector()
         self.privacy_audit = PrivacyAudit()
         self.model_integrity = ModelIntegrityValidator()
         self.robustness_eval = RobustnessEvaluation()
-
-        # Load previous results
-        self.results_history = self._load_results_history()
-
-    def _load_results_history(self) -> List[Dict[str, Any]]:
-        """Load evaluation results history"""
-        if os.path.exists(self.results_file):
-            try:
-                with open(self.results_file, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading results history: {e}")
-                return []
-        return []
-
-    def _save_results_history(self):
-        """Save evaluation results history"""
+        self.attack_cache: AttackResultCache = get_attack_result_cache()
+        self._attack_runner: Optional[ThreadPoolExecutor] = None
+
+        # Evaluation history
+        self.history = EvaluationHistoryStore(
+            history_db or f"{data_dir}/l2_evaluation_history.db")
+        self._migrate_results_history()
+
+    def _migrate_results_history(self):
+        """Import the legacy results-history JSON into the store and retire it"""
+        if not os.path.exists(self.results_file):
+            return
         try:
-            with open(self.results_file, "w") as f:
-                json.dump(self.results_history, f, indent=2)
+            with open(self.results_file, "r") as f:
+                results = json.load(f)
+            self.history.append_many(results)
+            os.replace(self.results_file, f"{self.results_file}.migrated")
+            logger.info(f"Migrated {len(results)} evaluations from {self.results_file}")
         except Exception as e:
-            logger.error(f"Error saving results history: {e}")
+            logger.error(f"Error migrating results history: {e}")
 
-    def evaluate_encryption(self, config: Dict[str, Any]) -> EncryptionEvaluation:
+    @property
+    def results_history(self) -> List[Dict[str, Any]]:
+        """All evaluation results, oldest first"""
+        return self.history.range()
+
+    def evaluate_encryption(self, config: Dict[str, Any],
+                            tls_endpoints: List[Any] = None) -> EncryptionEvaluation:
         """
         Evaluate encryption configuration.
 
         Args:
             config: System configuration with encryption settings
+            tls_endpoints: Endpoints to scan live (default: config's
+                'tls_endpoints'); observed TLS replaces the configured TLS score
 
         Returns:
             EncryptionEvaluation with scores and findings
@@ -150,8 +347,8 @@ class L2Evaluator:
             parsed_config = self.encryption_validator.parse_encryption_config(
                 config)
 
-            # Validate against standards
-            validation_result = self.encryption_validator.validate_encryption_config(
+            # Score against standards
+            validation_result = self.encryption_validator.component_scores(
                 parsed_config)
 
             algorithm_score = validation_result.get("algorithm_score", 0.0)
@@ -160,6 +357,16 @@ class L2Evaluator:
             key_management_score = validation_result.get(
                 "key_management_score", 0.0)
 
+            if tls_endpoints is None:
+                tls_endpoints = config.get("tls_endpoints")
+            tls_summary = None
+            if tls_endpoints:
+                tls_summary = TLSScanner.summarize(self.tls_scanner.scan(tls_endpoints))
+                if tls_summary["score"] is None:
+                    tls_summary = None
+                else:
+                    tls_score = tls_summary["score"]
+
             # Calculate overall encryption score (weighted average)
             overall_score = (
                 algorithm_score * 0.3 +
@@ -173,7 +380,8 @@ class L2Evaluator:
                 findings.append("Encryption algorithm not AES-256")
                 recommendations.append("Upgrade to AES-256 encryption")
 
-            if tls_score < 0.95:
+            # A live scan reports legacy protocols itself
+            if tls_score < 0.95 and tls_summary is None:
                 findings.append("TLS version below 1.2 or not enforced")
                 recommendations.append("Enforce TLS 1.2 or higher")
 
@@ -181,6 +389,27 @@ class L2Evaluator:
                 findings.append("Key rotation policy not implemented")
                 recommendations.append("Implement 90-day key rotation policy")
 
+            if tls_summary:
+                findings.append(
+                    f"TLS scan: {tls_summary['connected']}/{tls_summary['total']} endpoints reachable")
+                if tls_summary["legacy_tls"]:
+                    findings.append(
+                        f"{len(tls_summary['legacy_tls'])} endpoints negotiate TLS below 1.2")
+                    recommendations.append("Disable TLS 1.0/1.1 on all endpoints")
+                if tls_summary["handshake_refused"]:
+                    findings.append(
+                        f"{len(tls_summary['handshake_refused'])} endpoints completed no TLS handshake")
+                    recommendations.append("Serve TLS 1.2+ with a modern cipher suite on every endpoint")
+                if tls_summary["expired"] or tls_summary["unverified"]:
+                    findings.append(
+                        f"{len(tls_summary['expired'])} expired and "
+                        f"{len(tls_summary['unverified'])} unverifiable certificates")
+                    recommendations.append("Replace expired or untrusted certificates")
+                if tls_summary["expiring_soon"]:
+                    findings.append(
+                        f"{len(tls_summary['expiring_soon'])} certificates expire within 30 days")
+                    recommendations.append("Renew certificates nearing expiry")
+
             status = "compliant" if overall_score >= 0.9 else "partial" if overall_score >= 0.7 else "non-compliant"
 
             return EncryptionEvaluation(
@@ -300,10 +529,10 @@ class L2Evaluator:
 
             if os.path.exists(model_path):
                 # Verify model hasn't been tampered with
-                integrity_result = self.model_integrity.verify_model_integrity(
+                integrity_valid, _ = self.model_integrity.verify_model_integrity(
                     model_path)
 
-                if not integrity_result["integrity_valid"]:
+                if not integrity_valid:
                     integrity_score = 0.0
                     tamper_attempts = 1
                     findings.append(
@@ -317,7 +546,17 @@ class L2Evaluator:
             adversarial_robustness_score = 0.7  # Default if no test data
             privacy_leakage_score = 0.5  # Default neutral score
 
-            if test_data is not None:
+            curve = self.get_robustness_curve(model_path) if os.path.exists(model_path) else None
+            if curve is not None:
+                # Served from the attack cache; no attacks are rerun here
+                robustness_rating, _ = RobustnessEvaluation.score_robustness(
+                    curve.at(REFERENCE_EPSILON))
+                adversarial_robustness_score = {
+                    "Excellent": 1.0, "Good": 0.85, "Acceptable": 0.70, "Weak": 0.50
+                }.get(robustness_rating, 0.30)
+                findings.append(
+                    f"Adversarial robustness ({curve.attack_type}, eps={REFERENCE_EPSILON}): {robustness_rating}")
+            elif test_data is not None:
                 try:
                     # Test robustness (scores: 0-1, higher is better)
                     robustness_report = self.robustness_eval.generate_robustness_report(
@@ -356,6 +595,19 @@ class L2Evaluator:
                     findings.append(
                         f"Adversarial testing incomplete: {str(e)}")
 
+            mia = self.get_membership_inference(model_path) if os.path.exists(model_path) else None
+            if mia is not None:
+                # Balanced accuracy of the cached shadow-model attack
+                privacy_leakage_score = mia.attack_success_rate
+                findings.append(
+                    f"Membership inference ({mia.shadow_models} shadow models, "
+                    f"{mia.samples_tested} samples): {mia.attack_success_rate:.1%} attack accuracy")
+                if not mia.is_private:
+                    findings.append(
+                        "Model shows signs of training data leakage")
+                    recommendations.append(
+                        "Apply differential privacy regularization")
+
             return ModelSecurityEvaluation(
                 integrity_score=integrity_score,
                 tamper_attempts=tamper_attempts,
@@ -376,6 +628,51 @@ class L2Evaluator:
                 recommendations=["Review model deployment and security"]
             )
 
+    def compute_robustness_curve(self, model, model_path: str, x_test: Any, y_test: Any,
+                                 attack: str = "pgd", **kwargs) -> RobustnessCurve:
+        """Run (or fetch) a robustness curve keyed by the model file's checksum"""
+        return RobustnessEvaluation.robustness_curve(
+            model, x_test, y_test, attack=attack,
+            model_checksum=self.model_integrity.calculate_file_checksum(model_path),
+            cache=self.attack_cache, **kwargs)
+
+    def get_robustness_curve(self, model_path: str, attack: str = "pgd") -> Optional[RobustnessCurve]:
+        """Latest cached robustness curve for the model file's current contents"""
+        try:
+            checksum = self.model_integrity.calculate_file_checksum(model_path)
+        except OSError:
+            return None
+        data = self.attack_cache.latest(checksum, f"robustness_{attack}")
+        if data is None:
+            return None
+        curve = RobustnessCurve.from_dict(data)
+        curve.cached = True
+        return curve
+
+    def start_membership_inference(self, model, model_path: str, x_train: Any, y_train: Any,
+                                   x_test: Any, y_test: Any, **kwargs) -> Future:
+        """
+        Run a shadow-model membership inference attack in the background.
+
+        The result is cached under the model file's checksum and picked up
+        by evaluate_model_security, so hub requests never wait on training.
+        """
+        if self._attack_runner is None:
+            self._attack_runner = ThreadPoolExecutor(max_workers=1)
+        checksum = self.model_integrity.calculate_file_checksum(model_path)
+        return self._attack_runner.submit(
+            MembershipInferenceAttack.shadow_model_attack, model, x_train, y_train, x_test, y_test,
+            model_checksum=checksum, cache=self.attack_cache, **kwargs)
+
+    def get_membership_inference(self, model_path: str) -> Optional[MembershipInferenceResult]:
+        """Latest cached membership inference result for the model file's current contents"""
+        try:
+            checksum = self.model_integrity.calculate_file_checksum(model_path)
+        except OSError:
+            return None
+        data = self.attack_cache.latest(checksum, "membership_inference")
+        return MembershipInferenceResult.from_dict(data) if data else None
+
     def evaluate_governance(self, config: Dict[str, Any]) -> Tuple[float, List[str], List[str]]:
         """
         Evaluate governance practices.
@@ -419,7 +716,8 @@ class L2Evaluator:
         return score, findings, recommendations
 
     def evaluate(self, config: Dict[str, Any], datasets: List[Dict[str, Any]] = None,
-                 model_path: str = None, test_data: Any = None) -> L2EvaluationResult:
+                 model_path: str = None, test_data: Any = None,
+                 tls_endpoints: List[Any] = None, system: str = "default") -> L2EvaluationResult:
         """
         Perform complete L2 Privacy & Security evaluation.
 
@@ -428,6 +726,8 @@ class L2Evaluator:
             datasets: Data to evaluate
             model_path: Path to ML model
             test_data: Test data for adversarial evaluation
+            tls_endpoints: Endpoints to scan for TLS (default: config's 'tls_endpoints')
+            system: Name of the evaluated system (history is kept per system)
 
         Returns:
             L2EvaluationResult
@@ -435,7 +735,7 @@ class L2Evaluator:
         logger.info("Starting L2 Privacy & Security evaluation")
 
         # Evaluate each component
-        encryption_eval = self.evaluate_encryption(config)
+        encryption_eval = self.evaluate_encryption(config, tls_endpoints)
         privacy_eval = self.evaluate_privacy(datasets or [])
         model_security_eval = self.evaluate_model_security(
             model_path or "", test_data)
@@ -502,26 +802,50 @@ class L2Evaluator:
             category_scores=category_scores,
             compliance_status=compliance_status,
             critical_issues=critical_issues,
-            action_items=action_items
+            action_items=action_items,
+            system=system
         )
 
         # Save result
-        self.results_history.append(result.to_dict())
-        self._save_results_history()
+        self.history.append(result.to_dict(), system)
 
         logger.info(
             f"L2 evaluation complete: SAI={overall_sai_score:.1f}/100, Status={compliance_status}")
 
         return result
 
-    def get_latest_evaluation(self) -> Optional[L2EvaluationResult]:
-        """Get most recent evaluation result"""
-        if not self.results_history:
+    def get_latest_evaluation(self, system: str = None) -> Optional[L2EvaluationResult]:
+        """Get most recent evaluation result (for one system, or across all)"""
+        latest = self.history.latest(system)
+        if latest is None:
             return None
 
-        latest = self.results_history[-1]
         return self._dict_to_result(latest)
 
+    def get_evaluation_trend(self, start: str = None, end: str = None,
+                             system: str = None, days: int = None) -> List[Dict[str, Any]]:
+        """
+        SAI and category scores over time for trend charts.
+
+        Args:
+            start: ISO timestamp lower bound (or use `days`)
+            end: ISO timestamp upper bound
+            system: Restrict to one system
+            days: Shortcut for start = now - days
+        """
+        if days is not None and start is None:
+            start = (datetime.now() - timedelta(days=days)).isoformat()
+        return self.history.trend(start, end, system)
+
+    def get_evaluations(self, start: str = None, end: str = None, system: str = None,
+                        limit: int = None) -> List[L2EvaluationResult]:
+        """Full evaluation results in a time range, oldest first"""
+        return [self._dict_to_result(data) for data in self.history.range(start, end, system, limit)]
+
+    def compact_history(self, older_than_days: int = 30, keep_per: str = "day") -> int:
+        """Thin history older than `older_than_days` to one evaluation per system per hour/day"""
+        return self.history.compact(older_than_days, keep_per)
+
     def _dict_to_result(self, data: Dict[str, Any]) -> L2EvaluationResult:
         """Convert dict to L2EvaluationResult"""
         enc_eval = data.get("encryption_evaluation", {})
@@ -538,7 +862,8 @@ class L2Evaluator:
             category_scores=data.get("category_scores", {}),
             compliance_status=data.get("compliance_status", "unknown"),
             critical_issues=data.get("critical_issues", []),
-            action_items=data.get("action_items", [])
+            action_items=data.get("action_items", []),
+            system=data.get("system", "default")
         )
 
     def generate_evaluation_report(self, result: L2EvaluationResult) -> str:
@@ -5,10 +5,15 @@ Supports TOTP (Time-based One-Time Passwords) and backup codes
 """
 
 import os
+import json
+import sqlite3
+import threading
 import time
-from typing import Dict, List, Tuple, Optional, Any
+from bisect import bisect_right
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, asdict, field
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 import hmac
 import hashlib
@@ -46,6 +51,163 @@ class MFAAttempt:
     device_info: str = ""
 
 
+class MFAAttemptStore:
+    """
+    Append-only store of MFA attempts with in-memory lockout state.
+
+    Attempts are appended to a SQLite database in WAL mode (one INSERT per
+    attempt, never a rewrite). Each user's recent failure times are kept in
+    a bounded ring buffer, so a lockout check is a single comparison against
+    the Nth most recent failure, independent of how long the history is.
+    Queries beyond the in-memory window fall back to an indexed COUNT.
+    """
+
+    def __init__(self, db_path: str, ring_size: int = 100, memory_hours: int = 24):
+        self.db_path = db_path
+        self.ring_size = ring_size
+        self.memory_hours = memory_hours
+        self._lock = threading.Lock()
+        self._failures: Dict[str, Deque[float]] = {}
+        self._totals = {"total": 0, "success": 0, "failed": 0}
+        self._methods: Dict[str, int] = {}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_database()
+        self._load_state()
+
+    def _init_database(self):
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS mfa_attempts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                ts_epoch REAL NOT NULL,
+                method TEXT,
+                success INTEGER NOT NULL,
+                ip_address TEXT,
+                device_info TEXT
+            )
+        ''')
+        self._conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_mfa_attempts_user_failed
+            ON mfa_attempts (user_id, success, ts_epoch)
+        ''')
+        self._conn.commit()
+
+    def _load_state(self):
+        """Rebuild counters and recent-failure rings from the database."""
+        for method, success, count in self._conn.execute(
+                "SELECT method, success, COUNT(*) FROM mfa_attempts GROUP BY method, success"):
+            self._totals["total"] += count
+            self._totals["success" if success else "failed"] += count
+            self._methods[method] = self._methods.get(method, 0) + count
+
+        cutoff = time.time() - self.memory_hours * 3600
+        for user_id, ts_epoch in self._conn.execute(
+                "SELECT user_id, ts_epoch FROM mfa_attempts WHERE success = 0 AND ts_epoch > ? "
+                "ORDER BY ts_epoch", (cutoff,)):
+            self._ring(user_id).append(ts_epoch)
+
+    def _ring(self, user_id: str) -> Deque[float]:
+        ring = self._failures.get(user_id)
+        if ring is None:
+            ring = self._failures[user_id] = deque(maxlen=self.ring_size)
+        return ring
+
+    @staticmethod
+    def _epoch(timestamp: str) -> float:
+        try:
+            return datetime.fromisoformat(timestamp).timestamp()
+        except (TypeError, ValueError):
+            return time.time()
+
+    def append(self, attempt: MFAAttempt):
+        """Record one attempt."""
+        self.append_many([attempt])
+
+    def append_many(self, attempts: List[MFAAttempt]):
+        """Record several attempts in one transaction."""
+        rows = [
+            (a.user_id, a.timestamp, self._epoch(a.timestamp), a.method, int(a.success),
+             a.ip_address, a.device_info)
+            for a in attempts
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO mfa_attempts (user_id, timestamp, ts_epoch, method, success, ip_address, device_info) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+            for user_id, _, ts_epoch, method, success, _, _ in rows:
+                self._totals["total"] += 1
+                self._totals["success" if success else "failed"] += 1
+                self._methods[method] = self._methods.get(method, 0) + 1
+                if not success:
+                    ring = self._ring(user_id)
+                    if ring and ts_epoch < ring[-1]:
+                        # Out-of-order (imported) attempt: keep the ring sorted
+                        items = sorted(list(ring) + [ts_epoch])
+                        ring.clear()
+                        ring.extend(items)
+                    else:
+                        ring.append(ts_epoch)
+
+    def count_failed(self, user_id: str, hours: float) -> int:
+        """Failed attempts for a user within the last `hours`."""
+        cutoff = time.time() - hours * 3600
+        with self._lock:
+            ring = self._failures.get(user_id)
+            if not ring:
+                if hours <= self.memory_hours:
+                    return 0
+            elif hours <= self.memory_hours and (len(ring) < self.ring_size or ring[0] <= cutoff):
+                # Ring holds every failure inside the window
+                return len(ring) - bisect_right(ring, cutoff)
+
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM mfa_attempts WHERE user_id = ? AND success = 0 AND ts_epoch > ?",
+                (user_id, cutoff)).fetchone()
+            return row[0]
+
+    def is_locked(self, user_id: str, max_attempts: int, hours: float) -> bool:
+        """True if the user has at least `max_attempts` failures within `hours`."""
+        if max_attempts <= 0:
+            return True
+        if max_attempts > self.ring_size or hours > self.memory_hours:
+            return self.count_failed(user_id, hours) >= max_attempts
+
+        cutoff = time.time() - hours * 3600
+        with self._lock:
+            ring = self._failures.get(user_id)
+            return bool(ring) and len(ring) >= max_attempts and ring[-max_attempts] > cutoff
+
+    def totals(self) -> Dict[str, Any]:
+        """Overall attempt counters, by outcome and by method."""
+        with self._lock:
+            return {**self._totals, "methods": dict(self._methods)}
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent attempts, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, timestamp, method, success, ip_address, device_info "
+                "FROM mfa_attempts ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [
+            {"user_id": r[0], "timestamp": r[1], "method": r[2], "success": bool(r[3]),
+             "ip_address": r[4], "device_info": r[5]}
+            for r in reversed(rows)
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 class TOTPGenerator:
     """Time-based One-Time Password (TOTP) generator"""
 
@@ -217,37 +379,34 @@ class BackupCodeGenerator:
 class MFAManager:
     """Manages MFA for users"""
 
-    def __init__(self, mfa_dir: str = "data/mfa", attempts_log: str = None):
+    def __init__(self, mfa_dir: str = "data/mfa", attempts_log: str = None, attempts_db: str = None):
         self.mfa_dir = mfa_dir
         self.attempts_log_path = attempts_log or f"{mfa_dir}/attempts.json"
+        self.attempts_db_path = attempts_db or f"{mfa_dir}/attempts.db"
 
         # Create directories
         os.makedirs(mfa_dir, exist_ok=True)
         os.makedirs(f"{mfa_dir}/configs", exist_ok=True)
 
-        # Load attempt logs
-        self.attempt_logs = self._load_attempt_logs()
-
-    def _load_attempt_logs(self) -> List[Dict[str, Any]]:
-        """Load MFA attempt logs"""
-        if os.path.exists(self.attempts_log_path):
-            try:
-                import json
-                with open(self.attempts_log_path, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading attempt logs: {e}")
-                return []
-        return []
-
-    def _save_attempt_logs(self):
-        """Save MFA attempt logs"""
+        # Attempt store (append-only, with in-memory lockout state)
+        self.attempt_store = MFAAttemptStore(self.attempts_db_path)
+        self._migrate_attempt_logs()
+
+    def _migrate_attempt_logs(self):
+        """Import a legacy attempts.json into the attempt store (once)"""
+        if not os.path.exists(self.attempts_log_path):
+            return
         try:
-            import json
-            with open(self.attempts_log_path, "w") as f:
-                json.dump(self.attempt_logs, f, indent=2)
+            with open(self.attempts_log_path, "r") as f:
+                legacy = json.load(f)
+            self.attempt_store.append_many([
+                MFAAttempt(**{k: log.get(k, "") for k in MFAAttempt.__dataclass_fields__})
+                for log in legacy
+            ])
+            os.replace(self.attempts_log_path, f"{self.attempts_log_path}.migrated")
+            logger.info(f"Migrated {len(legacy)} MFA attempts to {self.attempts_db_path}")
         except Exception as e:
-            logger.error(f"Error saving attempt logs: {e}")
+            logger.error(f"Error migrating attempt logs: {e}")
 
     def _get_config_path(self, user_id: str) -> str:
         """Get path to user's MFA config file"""
@@ -511,8 +670,10 @@ class MFAManager:
 
     def _log_attempt(self, attempt: MFAAttempt):
         """Log MFA authentication attempt"""
-        self.attempt_logs.append(asdict(attempt))
-        self._save_attempt_logs()
+        try:
+            self.attempt_store.append(attempt)
+        except Exception as e:
+            logger.error(f"Error saving attempt log: {e}")
 
     def get_failed_attempts(self, user_id: str, hours: int = 24) -> int:
         """
@@ -525,19 +686,7 @@ class MFAManager:
         Returns:
             Number of failed attempts
         """
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-
-        failed_count = 0
-        for log in self.attempt_logs:
-            if log.get("user_id") == user_id and not log.get("success", False):
-                try:
-                    log_time = datetime.fromisoformat(log.get("timestamp", ""))
-                    if log_time > cutoff_time:
-                        failed_count += 1
-                except:
-                    pass
-
-        return failed_count
+        return self.attempt_store.count_failed(user_id, hours)
 
     def is_account_locked(self, user_id: str, max_attempts: int = 5, lockout_hours: int = 1) -> bool:
         """
@@ -551,12 +700,11 @@ class MFAManager:
         Returns:
             True if account is locked, False otherwise
         """
-        failed_attempts = self.get_failed_attempts(
-            user_id, hours=lockout_hours)
-        return failed_attempts >= max_attempts
+        return self.attempt_store.is_locked(user_id, max_attempts, lockout_hours)
 
     def generate_mfa_report(self) -> str:
         """Generate MFA audit report"""
+        totals = self.attempt_store.totals()
         report = f"""
 MFA (Multi-Factor Authentication) Audit Report
 {'='*60}
@@ -564,18 +712,16 @@ Generated: {datetime.now().isoformat()}
 
 Summary:
 {'-'*60}
-Total Authentication Attempts: {len(self.attempt_logs)}
+Total Authentication Attempts: {totals['total']}
 
-Successful Attempts: {sum(1 for log in self.attempt_logs if log.get('success', False))}
-Failed Attempts: {sum(1 for log in self.attempt_logs if not log.get('success', False))}
+Successful Attempts: {totals['success']}
+Failed Attempts: {totals['failed']}
 
 Authentication Methods Used:
 """
 
-        totp_count = sum(
-            1 for log in self.attempt_logs if log.get("method") == "totp")
-        backup_count = sum(1 for log in self.attempt_logs if log.get(
-            "method") == "backup_code")
+        totp_count = totals["methods"].get("totp", 0)
+        backup_count = totals["methods"].get("backup_code", 0)
 
         report += f"""
   - TOTP: {totp_count}
@@ -585,7 +731,7 @@ Recent Attempts (Last 10):
 {'-'*60}
 """
 
-        for log in self.attempt_logs[-10:]:
+        for log in self.attempt_store.recent(10):
             status = "✓" if log.get("success") else "✗"
             report += f"{status} {log.get('timestamp')}: {log.get('method')} ({log.get('user_id')})\n"
 
@@ -8,12 +8,25 @@ Maintains model versioning and provenance
 import hashlib
 import json
 import os
-from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass, asdict
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple, Optional, Any
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 from datetime import datetime
 import logging
 
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +38,7 @@ class ModelChecksum:
     file_size: int
     timestamp: str
     algorithm: str = "sha256"
+    merkle: Optional[Dict[str, Any]] = None  # MerkleTree.to_dict()
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -46,6 +60,519 @@ class ModelVersion:
         return asdict(self)
 
 
+# Large sequential reads; hashlib releases the GIL for big updates
+DEFAULT_READ_SIZE = 8 * 1024 * 1024
+# Merkle leaf size: each leaf can be hashed and re-verified independently
+DEFAULT_MERKLE_CHUNK_SIZE = 64 * 1024 * 1024
+SUPPORTED_ALGORITHMS = ("sha256", "sha512", "md5")
+
+
+def _new_hash(algorithm: str):
+    if algorithm not in SUPPORTED_ALGORITHMS:
+        raise ValueError(f"Unsupported algorithm: {algorithm}")
+    return hashlib.new(algorithm)
+
+
+@dataclass
+class MerkleTree:
+    """Per-chunk digests of a file and the root hash over them"""
+    chunk_size: int
+    file_size: int
+    leaves: List[str] = field(default_factory=list)
+    algorithm: str = "sha256"
+
+    @property
+    def chunk_count(self) -> int:
+        return (self.file_size + self.chunk_size - 1) // self.chunk_size
+
+    @property
+    def complete(self) -> bool:
+        return len(self.leaves) == self.chunk_count
+
+    @property
+    def root(self) -> Optional[str]:
+        """Root hash (None while the tree is still partial)"""
+        if not self.complete:
+            return None
+        level = [bytes.fromhex(leaf) for leaf in self.leaves]
+        if not level:
+            return _new_hash(self.algorithm).hexdigest()
+        while len(level) > 1:
+            if len(level) % 2:
+                level.append(level[-1])
+            level = [hashlib.new(self.algorithm, level[i] + level[i + 1]).digest()
+                     for i in range(0, len(level), 2)]
+        return level[0].hex()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "root": self.root}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MerkleTree":
+        return cls(
+            chunk_size=data["chunk_size"],
+            file_size=data["file_size"],
+            leaves=list(data.get("leaves", [])),
+            algorithm=data.get("algorithm", "sha256")
+        )
+
+
+class ChecksumService:
+    """
+    Streaming file hashing with Merkle digests and parallel verification.
+
+    Whole-file digests use large reads (hashlib.file_digest where available)
+    instead of 4 KB chunks. Merkle trees hash fixed-size chunks with
+    positional reads, so chunks are hashed on a thread pool, an interrupted
+    tree can be resumed from its completed leaves, and a file can be
+    re-verified in full or for selected chunks only.
+    """
+
+    def __init__(self, algorithm: str = "sha256", read_size: int = DEFAULT_READ_SIZE,
+                 merkle_chunk_size: int = DEFAULT_MERKLE_CHUNK_SIZE, workers: int = None):
+        _new_hash(algorithm)
+        self.algorithm = algorithm
+        self.read_size = read_size
+        self.merkle_chunk_size = merkle_chunk_size
+        self.workers = workers or min(8, os.cpu_count() or 1)
+
+    def file_digest(self, file_path: str) -> str:
+        """Whole-file hex digest"""
+        with open(file_path, "rb", buffering=0) as f:
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, self.algorithm).hexdigest()
+            hash_obj = _new_hash(self.algorithm)
+            buffer = bytearray(self.read_size)
+            view = memoryview(buffer)
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                hash_obj.update(view[:n])
+            return hash_obj.hexdigest()
+
+    def digest_with_merkle(self, file_path: str) -> Tuple[str, MerkleTree]:
+        """Whole-file digest and Merkle tree in a single read of the file"""
+        file_size = os.path.getsize(file_path)
+        tree = MerkleTree(chunk_size=self.merkle_chunk_size, file_size=file_size,
+                          algorithm=self.algorithm)
+        whole = _new_hash(self.algorithm)
+        buffer = bytearray(min(self.read_size, self.merkle_chunk_size))
+        view = memoryview(buffer)
+
+        with open(file_path, "rb", buffering=0) as f:
+            for _ in range(tree.chunk_count):
+                leaf = _new_hash(self.algorithm)
+                remaining = self.merkle_chunk_size
+                while remaining > 0:
+                    n = f.readinto(view[:min(len(buffer), remaining)])
+                    if not n:
+                        break
+                    whole.update(view[:n])
+                    leaf.update(view[:n])
+                    remaining -= n
+                tree.leaves.append(leaf.hexdigest())
+        return whole.hexdigest(), tree
+
+    def _chunk_digest(self, read_at: Callable[[int, int], bytes], index: int, file_size: int) -> str:
+        hash_obj = _new_hash(self.algorithm)
+        offset = index * self.merkle_chunk_size
+        end = min(offset + self.merkle_chunk_size, file_size)
+        while offset < end:
+            data = read_at(min(self.read_size, end - offset), offset)
+            if not data:
+                break
+            hash_obj.update(data)
+            offset += len(data)
+        return hash_obj.hexdigest()
+
+    @contextmanager
+    def _positional_reader(self, file_path: str) -> Iterator[Callable[[int, int], bytes]]:
+        """
+        Thread-safe read_at(size, offset) for a file.
+
+        Uses os.pread on a shared descriptor where available; elsewhere
+        (Windows) each thread gets its own handle and seeks before reading.
+        """
+        if hasattr(os, "pread"):
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                yield lambda size, offset: os.pread(fd, size, offset)
+            finally:
+                os.close(fd)
+            return
+
+        local = threading.local()
+        handles = []
+        handles_lock = threading.Lock()
+
+        def read_at(size: int, offset: int) -> bytes:
+            f = getattr(local, "handle", None)
+            if f is None:
+                f = local.handle = open(file_path, "rb")
+                with handles_lock:
+                    handles.append(f)
+            f.seek(offset)
+            return f.read(size)
+
+        try:
+            yield read_at
+        finally:
+            for f in handles:
+                f.close()
+
+    def _chunk_digests(self, file_path: str, indices: List[int], file_size: int,
+                       parallel: bool = True,
+                       progress: Callable[[int, str], None] = None) -> Iterator[Tuple[int, str]]:
+        """(index, digest) for the given chunks, in order"""
+        with self._positional_reader(file_path) as read_at:
+            if parallel and self.workers > 1 and len(indices) > 1:
+                with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                    digests = pool.map(lambda i: self._chunk_digest(read_at, i, file_size), indices)
+                    for index, digest in zip(indices, digests):
+                        if progress:
+                            progress(index, digest)
+                        yield index, digest
+            else:
+                for index in indices:
+                    digest = self._chunk_digest(read_at, index, file_size)
+                    if progress:
+                        progress(index, digest)
+                    yield index, digest
+
+    def merkle_tree(self, file_path: str, resume: MerkleTree = None, parallel: bool = True,
+                    progress: Callable[[int, str], None] = None) -> MerkleTree:
+        """
+        Build (or finish) the Merkle tree of a file.
+
+        Args:
+            file_path: File to hash
+            resume: Partial tree from an interrupted run; its leaves are kept
+                if the file size and chunk size still match
+            parallel: Hash chunks on the thread pool
+            progress: Called with (chunk_index, digest) as leaves complete,
+                e.g. to persist a resumable partial tree
+        """
+        file_size = os.path.getsize(file_path)
+        tree = MerkleTree(chunk_size=self.merkle_chunk_size, file_size=file_size,
+                          algorithm=self.algorithm)
+        if resume is not None and resume.file_size == file_size and \
+                resume.chunk_size == self.merkle_chunk_size and resume.algorithm == self.algorithm:
+            tree.leaves = list(resume.leaves[:tree.chunk_count])
+
+        remaining = list(range(len(tree.leaves), tree.chunk_count))
+        for _, digest in self._chunk_digests(file_path, remaining, file_size, parallel, progress):
+            tree.leaves.append(digest)
+        return tree
+
+    def verify_chunks(self, file_path: str, tree: MerkleTree, indices: List[int] = None,
+                      parallel: bool = True) -> List[int]:
+        """
+        Re-hash chunks and compare them with a stored tree.
+
+        Args:
+            file_path: File to verify
+            tree: Expected Merkle tree
+            indices: Chunks to check (default all: a full verification)
+            parallel: Hash chunks on the thread pool
+
+        Returns:
+            Indices of chunks that do not match (all chunks if the size differs)
+        """
+        file_size = os.path.getsize(file_path)
+        if file_size != tree.file_size:
+            return list(range(tree.chunk_count))
+        if tree.chunk_size != self.merkle_chunk_size or tree.algorithm != self.algorithm:
+            # Verify with the chunking the tree was built with
+            checker = ChecksumService(tree.algorithm, self.read_size, tree.chunk_size, self.workers)
+            return checker.verify_chunks(file_path, tree, indices, parallel)
+
+        if indices is None:
+            indices = list(range(tree.chunk_count))
+        indices = [i for i in indices if 0 <= i < len(tree.leaves)]
+        return [index for index, digest in self._chunk_digests(file_path, indices, file_size, parallel)
+                if digest != tree.leaves[index]]
+
+
+_checksum_service: Optional[ChecksumService] = None
+_checksum_service_lock = threading.Lock()
+
+
+def get_checksum_service() -> ChecksumService:
+    """Get the global checksum service instance"""
+    global _checksum_service
+    with _checksum_service_lock:
+        if _checksum_service is None:
+            _checksum_service = ChecksumService()
+        return _checksum_service
+
+
+def file_signature(file_path: str) -> Tuple[int, int, int, int, int]:
+    """Metadata that changes whenever a file's content can have changed"""
+    st = os.stat(file_path)
+    # ctime cannot be set from user space, so resetting mtime does not hide a write
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+
+class IntegrityCache:
+    """
+    Digests and parsed checksum files keyed by file metadata.
+
+    An entry is reused while the file's (device, inode, size, mtime_ns,
+    ctime_ns) signature is unchanged and no watcher has marked it dirty, so a
+    repeated health check costs one stat() instead of a full rehash.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _path(file_path: str) -> str:
+        return os.path.realpath(file_path)
+
+    def get(self, file_path: str, kind: str = "sha256") -> Tuple[Any, Optional[Tuple[int, ...]]]:
+        """
+        Look up a cached value.
+
+        Returns:
+            Tuple of (value or None on a miss, current signature or None if
+            the file is missing). Pass the signature back to put() so a file
+            modified while it was being hashed is not cached.
+        """
+        path = self._path(file_path)
+        try:
+            signature = file_signature(path)
+        except OSError:
+            self.invalidate(file_path)
+            return None, None
+
+        with self._lock:
+            entry = self._entries.get((path, kind))
+            if entry is not None and not entry["dirty"] and entry["signature"] == signature:
+                self.hits += 1
+                return entry["value"], signature
+            self.misses += 1
+        return None, signature
+
+    def put(self, file_path: str, value: Any, signature: Tuple[int, ...], kind: str = "sha256") -> bool:
+        """Cache a value computed from the file as it was at `signature`"""
+        path = self._path(file_path)
+        try:
+            if file_signature(path) != signature:
+                return False
+        except OSError:
+            return False
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries and (path, kind) not in self._entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[(path, kind)] = {
+                "value": value,
+                "signature": signature,
+                "dirty": False,
+                "cached_at": time.time()
+            }
+        return True
+
+    def claim_report(self, file_path: str, signature: Optional[Tuple[int, ...]], token: str,
+                     kind: str = "sha256") -> bool:
+        """
+        Whether a mismatch against `token` (the expected checksum) still needs reporting.
+
+        Returns True once per cached (file signature, token); later calls for
+        the same unchanged file return False. Files without a current cache
+        entry are always reported.
+        """
+        path = self._path(file_path)
+        with self._lock:
+            entry = self._entries.get((path, kind))
+            if entry is None or entry["signature"] != signature:
+                return True
+            reported = entry.setdefault("reported", set())
+            if token in reported:
+                return False
+            reported.add(token)
+            return True
+
+    def mark_dirty(self, file_path: str) -> None:
+        """Force the next lookup of every entry for this file to rehash"""
+        path = self._path(file_path)
+        with self._lock:
+            for key, entry in self._entries.items():
+                if key[0] == path:
+                    entry["dirty"] = True
+
+    def invalidate(self, file_path: str) -> None:
+        path = self._path(file_path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                del self._entries[key]
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return list(dict.fromkeys(path for path, _ in self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "dirty": sum(1 for e in self._entries.values() if e["dirty"]),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+class IntegrityWatcher:
+    """
+    Marks integrity cache entries dirty as soon as a watched file changes.
+
+    Uses filesystem notifications (inotify via watchdog) when available and
+    otherwise polls the watched files' signatures every `interval` seconds.
+    `on_change` is called with the path of each changed file, e.g. to
+    schedule an eager re-verification.
+    """
+
+    def __init__(self, cache: "IntegrityCache" = None, interval: float = 5.0,
+                 on_change: Callable[[str], None] = None, use_notifications: bool = True):
+        self.cache = cache or get_integrity_cache()
+        self.interval = interval
+        self.on_change = on_change
+        self.use_notifications = use_notifications and Observer is not None
+        self._paths: Dict[str, Optional[Tuple[int, ...]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self._watched_dirs: set = set()
+
+    @property
+    def mode(self) -> str:
+        return "notify" if self.use_notifications else "poll"
+
+    def watch(self, file_path: str) -> None:
+        """Start watching a file (and its checksum sidecar)"""
+        path = os.path.realpath(file_path)
+        for watched in (path, path + ModelIntegrityValidator.CHECKSUM_FILE_SUFFIX):
+            try:
+                signature = file_signature(watched)
+            except OSError:
+                signature = None
+            with self._lock:
+                self._paths[watched] = signature
+        if self._observer is not None:
+            self._schedule(os.path.dirname(path))
+
+    def unwatch(self, file_path: str) -> None:
+        path = os.path.realpath(file_path)
+        with self._lock:
+            self._paths.pop(path, None)
+            self._paths.pop(path + ModelIntegrityValidator.CHECKSUM_FILE_SUFFIX, None)
+
+    def _changed(self, path: str) -> None:
+        with self._lock:
+            if path not in self._paths:
+                return
+        self.cache.mark_dirty(path)
+        if self.on_change:
+            try:
+                self.on_change(path)
+            except Exception as e:
+                logger.error(f"Integrity watcher callback failed for {path}: {e}")
+
+    def _schedule(self, directory: str) -> None:
+        if directory not in self._watched_dirs:
+            self._observer.schedule(_WatchHandler(self), directory, recursive=False)
+            self._watched_dirs.add(directory)
+
+    def start(self) -> "IntegrityWatcher":
+        if self._thread is not None or self._observer is not None:
+            return self
+        self._stop.clear()
+        if self.use_notifications:
+            self._observer = Observer()
+            self._watched_dirs = set()
+            with self._lock:
+                directories = {os.path.dirname(p) for p in self._paths}
+            for directory in directories:
+                self._schedule(directory)
+            self._observer.daemon = True
+            self._observer.start()
+        else:
+            self._thread = threading.Thread(target=self._poll_loop, daemon=True)
+            self._thread.start()
+        logger.info(f"Integrity watcher started ({self.mode})")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def poll_once(self) -> List[str]:
+        """Compare every watched file's signature with the last one seen"""
+        with self._lock:
+            watched = list(self._paths.items())
+
+        changed = []
+        for path, previous in watched:
+            try:
+                signature = file_signature(path)
+            except OSError:
+                signature = None
+            if signature != previous:
+                with self._lock:
+                    if path in self._paths:
+                        self._paths[path] = signature
+                changed.append(path)
+                self._changed(path)
+        return changed
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll_once()
+
+
+if Observer is not None:
+    class _WatchHandler(FileSystemEventHandler):
+        """Forwards watchdog events for watched files to the watcher"""
+
+        def __init__(self, watcher: IntegrityWatcher):
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+                if path:
+                    self.watcher._changed(os.path.realpath(path))
+
+
+_integrity_cache: Optional[IntegrityCache] = None
+_integrity_cache_lock = threading.Lock()
+
+
+def get_integrity_cache() -> IntegrityCache:
+    """Get the global integrity cache instance"""
+    global _integrity_cache
+    with _integrity_cache_lock:
+        if _integrity_cache is None:
+            _integrity_cache = IntegrityCache()
+        return _integrity_cache
+
+
 class ModelIntegrityValidator:
     """Validates model file integrity"""
 
@@ -53,39 +580,40 @@ class ModelIntegrityValidator:
     METADATA_FILE_SUFFIX = ".metadata.json"
 
     @staticmethod
-    def calculate_file_checksum(file_path: str, algorithm: str = "sha256") -> str:
+    def calculate_file_checksum(file_path: str, algorithm: str = "sha256",
+                                use_cache: bool = True) -> str:
         """
         Calculate checksum for file.
 
         Args:
             file_path: Path to file
             algorithm: Hash algorithm ('sha256', 'sha512', 'md5')
+            use_cache: Reuse the digest while the file's metadata is unchanged
 
         Returns:
             Hex-encoded checksum
         """
-        if algorithm == "sha256":
-            hash_obj = hashlib.sha256()
-        elif algorithm == "sha512":
-            hash_obj = hashlib.sha512()
-        elif algorithm == "md5":
-            hash_obj = hashlib.md5()
-        else:
-            raise ValueError(f"Unsupported algorithm: {algorithm}")
-
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_obj.update(chunk)
-
-        return hash_obj.hexdigest()
+        service = ChecksumService(algorithm)
+        if not use_cache:
+            return service.file_digest(file_path)
+
+        cache = get_integrity_cache()
+        digest, signature = cache.get(file_path, algorithm)
+        if digest is None:
+            digest = service.file_digest(file_path)
+            if signature is not None:
+                cache.put(file_path, digest, signature, algorithm)
+        return digest
 
     @staticmethod
-    def generate_model_checksum(model_path: str) -> ModelChecksum:
+    def generate_model_checksum(model_path: str, merkle: bool = True) -> ModelChecksum:
         """
         Generate checksum for model file.
 
         Args:
             model_path: Path to model file
+            merkle: Also record per-chunk Merkle digests (same single read),
+                enabling parallel and partial re-verification
 
         Returns:
             ModelChecksum object
@@ -93,14 +621,20 @@ class ModelIntegrityValidator:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found: {model_path}")
 
-        checksum = ModelIntegrityValidator.calculate_file_checksum(model_path)
+        service = get_checksum_service()
+        tree = None
+        if merkle:
+            checksum, tree = service.digest_with_merkle(model_path)
+        else:
+            checksum = service.file_digest(model_path)
         file_size = os.path.getsize(model_path)
 
         return ModelChecksum(
             file_path=str(model_path),
             checksum_sha256=checksum,
             file_size=file_size,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            merkle=tree.to_dict() if tree is not None else None
         )
 
     @staticmethod
@@ -136,27 +670,45 @@ class ModelIntegrityValidator:
         """
         checksum_path = model_path + ModelIntegrityValidator.CHECKSUM_FILE_SUFFIX
 
-        if not os.path.exists(checksum_path):
+        cache = get_integrity_cache()
+        checksum, signature = cache.get(checksum_path, "checksum_file")
+        if checksum is not None:
+            return checksum
+        if signature is None:
             return None
 
         try:
             with open(checksum_path, "r") as f:
                 data = json.load(f)
-                return ModelChecksum(**data)
+                checksum = ModelChecksum(**data)
         except Exception as e:
             logger.error(f"Error loading checksum: {e}")
             return None
 
+        cache.put(checksum_path, checksum, signature, "checksum_file")
+        return checksum
+
     @staticmethod
-    def verify_model_integrity(model_path: str) -> Tuple[bool, Dict[str, Any]]:
+    def verify_model_integrity(model_path: str, chunk_indices: List[int] = None,
+                               parallel: bool = True, use_cache: bool = True,
+                               tamper_detection: "TamperDetection" = None) -> Tuple[bool, Dict[str, Any]]:
         """
         Verify model integrity by comparing checksums.
 
         Args:
             model_path: Path to model file
+            chunk_indices: Only re-hash these Merkle chunks (partial check)
+            parallel: Hash Merkle chunks on the checksum service's thread pool
+            use_cache: Skip rehashing while the file's metadata is unchanged
+            tamper_detection: Log newly detected mismatches here
 
         Returns:
             Tuple of (is_valid, details)
+
+        Checksums recorded with Merkle digests are verified chunk by chunk in
+        parallel; older checksum files fall back to a whole-file digest. A
+        full verification is remembered in the integrity cache, so repeated
+        checks of an untouched file only cost a stat().
         """
         stored_checksum = ModelIntegrityValidator.load_checksum(model_path)
 
@@ -167,29 +719,101 @@ class ModelIntegrityValidator:
                 "model": model_path
             }
 
-        current_checksum = ModelIntegrityValidator.generate_model_checksum(
-            model_path)
+        service = get_checksum_service()
+        cache = get_integrity_cache()
+        actual_checksum = None
+        if use_cache and chunk_indices is None:
+            actual_checksum, signature = cache.get(model_path)
+            if signature is None:
+                raise FileNotFoundError(f"Model file not found: {model_path}")
+        else:
+            signature = file_signature(model_path)
+        cached = actual_checksum is not None
+        actual_size = signature[2]
+        mismatched_chunks = None
+
+        if cached:
+            is_valid = actual_checksum == stored_checksum.checksum_sha256
+        elif stored_checksum.merkle:
+            tree = MerkleTree.from_dict(stored_checksum.merkle)
+            mismatched_chunks = service.verify_chunks(model_path, tree, chunk_indices, parallel)
+            is_valid = not mismatched_chunks and actual_size == stored_checksum.file_size
+            verified_chunks = tree.chunk_count if chunk_indices is None else len(chunk_indices)
+            if is_valid:
+                actual_checksum = stored_checksum.checksum_sha256
+                if chunk_indices is None:
+                    cache.put(model_path, actual_checksum, signature)
+        else:
+            actual_checksum = service.file_digest(model_path)
+            cache.put(model_path, actual_checksum, signature)
+            is_valid = actual_checksum == stored_checksum.checksum_sha256
 
-        if stored_checksum.checksum_sha256 == current_checksum.checksum_sha256:
-            return True, {
+        if is_valid:
+            details = {
                 "status": "valid",
                 "message": "Model integrity verified",
                 "model": model_path,
-                "checksum": current_checksum.checksum_sha256,
+                "checksum": actual_checksum,
+                "cached": cached,
                 "stored_timestamp": stored_checksum.timestamp,
                 "verify_timestamp": datetime.now().isoformat()
             }
+            if mismatched_chunks is not None:
+                details["verified_chunks"] = verified_chunks
+                details["partial"] = chunk_indices is not None
+            return True, details
         else:
-            return False, {
+            if actual_checksum is None:
+                actual_checksum = service.file_digest(model_path)
+                cache.put(model_path, actual_checksum, signature)
+            details = {
                 "status": "invalid",
                 "message": "Model has been modified (checksum mismatch)",
                 "model": model_path,
                 "expected_checksum": stored_checksum.checksum_sha256,
-                "actual_checksum": current_checksum.checksum_sha256,
+                "actual_checksum": actual_checksum,
                 "stored_size": stored_checksum.file_size,
-                "actual_size": current_checksum.file_size,
+                "actual_size": actual_size,
+                "cached": cached,
                 "warning": "⚠️ POTENTIAL TAMPERING DETECTED"
             }
+            if mismatched_chunks is not None:
+                details["mismatched_chunks"] = mismatched_chunks[:100]
+            # Report each mismatch once per file version, however it was first hashed
+            if tamper_detection is not None and cache.claim_report(
+                    model_path, signature, stored_checksum.checksum_sha256):
+                tamper_detection.log_tamper_attempt(
+                    model_path, stored_checksum.checksum_sha256, actual_checksum)
+            return False, details
+
+    @staticmethod
+    def verify_models(model_paths: List[str], workers: int = None,
+                      tamper_detection: "TamperDetection" = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Verify many model files concurrently.
+
+        Args:
+            model_paths: Model files to verify
+            workers: Concurrent files (default: checksum service workers)
+            tamper_detection: Log newly detected mismatches here
+
+        Returns:
+            Dict of model path -> verification details (with a "valid" flag)
+        """
+        paths = list(dict.fromkeys(str(p) for p in model_paths))
+        workers = workers or get_checksum_service().workers
+
+        def verify(path: str) -> Dict[str, Any]:
+            try:
+                # Parallelism comes from the files; hash each one sequentially
+                is_valid, details = ModelIntegrityValidator.verify_model_integrity(
+                    path, parallel=len(paths) == 1, tamper_detection=tamper_detection)
+            except Exception as e:
+                is_valid, details = False, {"status": "error", "message": str(e), "model": path}
+            return {**details, "valid": is_valid}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths) or 1))) as pool:
+            return dict(zip(paths, pool.map(verify, paths)))
 
     @staticmethod
     def create_model_with_integrity(model_path: str, author: str = "system",
@@ -234,32 +858,206 @@ class ModelIntegrityValidator:
             return False, f"Error: {str(e)}"
 
 
+VERSION_FIELDS = tuple(ModelVersion.__dataclass_fields__)
+
+# Guards lineage queries against accidental parent cycles
+MAX_LINEAGE_DEPTH = 10000
+
+
+class ModelVersionStore:
+    """
+    SQLite-backed model version registry.
+
+    Versions are keyed by version_id and indexed by (model_name, seq), so
+    lookups and per-model histories are index reads, registering a version
+    writes one row, and lineage is a single recursive query. Registration
+    runs in a BEGIN IMMEDIATE transaction, so concurrent registrars (threads
+    or CI jobs sharing the file) never hand out the same version number.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._depth = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                                     timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_database()
+
+    def _init_database(self):
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS model_versions (
+                version_id TEXT PRIMARY KEY,
+                model_name TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                model_path TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                author TEXT,
+                description TEXT,
+                parent_version TEXT,
+                integrity_verified INTEGER DEFAULT 0
+            )
+        ''')
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_model_versions_model ON model_versions (model_name, seq)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_model_versions_parent ON model_versions (parent_version)")
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one commit; nested uses join the outer transaction."""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self
+            except Exception:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _to_version(row: sqlite3.Row) -> Dict[str, Any]:
+        version = {f: row[f] for f in VERSION_FIELDS}
+        version["integrity_verified"] = bool(version["integrity_verified"])
+        return version
+
+    def _insert(self, model_name: str, seq: int, version: Dict[str, Any]):
+        self._conn.execute(
+            f"INSERT INTO model_versions (model_name, seq, {', '.join(VERSION_FIELDS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(VERSION_FIELDS))})",
+            [model_name, seq] + [version.get(f) for f in VERSION_FIELDS])
+
+    def register(self, model_name: str, build: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Allocate the next version of a model and store it.
+
+        Args:
+            model_name: Model the version belongs to
+            build: Called with the allocated version_id inside the
+                transaction; returns the version record to store
+
+        Returns:
+            The stored version record
+        """
+        with self.transaction():
+            seq = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM model_versions WHERE model_name = ?",
+                (model_name,)).fetchone()[0]
+            version = build(f"{model_name}_v{seq}")
+            self._insert(model_name, seq, version)
+        return version
+
+    def import_registry(self, registry: Dict[str, List[Dict[str, Any]]]) -> int:
+        """Import a legacy {model_name: [versions]} registry, keeping version ids"""
+        imported = 0
+        with self.transaction():
+            for model_name, versions in registry.items():
+                for seq, version in enumerate(versions, start=1):
+                    exists = self._conn.execute(
+                        "SELECT 1 FROM model_versions WHERE version_id = ?",
+                        (version["version_id"],)).fetchone()
+                    if not exists:
+                        self._insert(model_name, seq, version)
+                        imported += 1
+        return imported
+
+    def get(self, version_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM model_versions WHERE version_id = ?", (version_id,)).fetchone()
+        return self._to_version(row) if row else None
+
+    def history(self, model_name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM model_versions WHERE model_name = ? ORDER BY seq", (model_name,)).fetchall()
+        return [self._to_version(row) for row in rows]
+
+    def all_versions(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(model_name, version) pairs grouped by model in registration order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM model_versions ORDER BY model_name, seq").fetchall()
+        return [(row["model_name"], self._to_version(row)) for row in rows]
+
+    def lineage(self, version_id: str) -> List[Tuple[str, Optional[str]]]:
+        """(version_id, parent_version) from the version up to its root"""
+        with self._lock:
+            rows = self._conn.execute('''
+                WITH RECURSIVE lineage(version_id, parent_version, depth) AS (
+                    SELECT version_id, parent_version, 0
+                    FROM model_versions WHERE version_id = ?
+                    UNION ALL
+                    SELECT v.version_id, v.parent_version, l.depth + 1
+                    FROM model_versions v JOIN lineage l ON v.version_id = l.parent_version
+                    WHERE l.depth < ?
+                )
+                SELECT version_id, parent_version FROM lineage ORDER BY depth
+            ''', (version_id, MAX_LINEAGE_DEPTH)).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def children(self, version_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM model_versions WHERE parent_version = ? ORDER BY timestamp",
+                (version_id,)).fetchall()
+        return [self._to_version(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM model_versions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 class ModelVersioning:
     """Manages model versions and provenance"""
 
-    def __init__(self, version_registry_path: str = "data/model_versions.json"):
+    def __init__(self, version_registry_path: str = "data/model_versions.json",
+                 tamper_detection: "TamperDetection" = None, registry_db_path: str = None):
         self.registry_path = Path(version_registry_path)
         self.registry_path.parent.mkdir(parents=True, exist_ok=True)
-        self.versions = self._load_registry()
-
-    def _load_registry(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Load model version registry"""
-        if self.registry_path.exists():
-            try:
-                with open(self.registry_path, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading registry: {e}")
-                return {}
-        return {}
-
-    def _save_registry(self):
-        """Save model version registry"""
+        self.store = ModelVersionStore(
+            str(registry_db_path or self.registry_path.with_suffix(".db")))
+        self.tamper_detection = tamper_detection
+        self._migrate_legacy_registry()
+
+    def _migrate_legacy_registry(self):
+        """Import model_versions.json into the store and retire it"""
+        if not self.registry_path.exists():
+            return
         try:
-            with open(self.registry_path, "w") as f:
-                json.dump(self.versions, f, indent=2)
+            with open(self.registry_path, "r") as f:
+                registry = json.load(f)
+            imported = self.store.import_registry(registry)
+            os.replace(self.registry_path, f"{self.registry_path}.migrated")
+            logger.info(f"Migrated {imported} model versions from {self.registry_path}")
         except Exception as e:
-            logger.error(f"Error saving registry: {e}")
+            logger.error(f"Error migrating registry: {e}")
+
+    @property
+    def versions(self) -> Dict[str, List[Dict[str, Any]]]:
+        """All versions grouped by model name"""
+        registry: Dict[str, List[Dict[str, Any]]] = {}
+        for model_name, version in self.store.all_versions():
+            registry.setdefault(model_name, []).append(version)
+        return registry
 
     def register_model_version(self, model_name: str, model_path: str,
                                author: str, description: str,
@@ -280,42 +1078,31 @@ class ModelVersioning:
         # Calculate checksum
         checksum = ModelIntegrityValidator.calculate_file_checksum(model_path)
 
-        # Generate version ID
-        version_id = f"{model_name}_v{len(self.versions.get(model_name, [])) + 1}"
+        timestamp = datetime.now().isoformat()
 
-        # Create version entry
-        version = ModelVersion(
+        # Version ID is allocated inside the store's write transaction
+        version = self.store.register(model_name, lambda version_id: ModelVersion(
             version_id=version_id,
             model_path=str(model_path),
             checksum=checksum,
-            timestamp=datetime.now().isoformat(),
+            timestamp=timestamp,
             author=author,
             description=description,
             parent_version=parent_version,
             integrity_verified=True
-        )
-
-        # Store in registry
-        if model_name not in self.versions:
-            self.versions[model_name] = []
-
-        self.versions[model_name].append(version.to_dict())
-        self._save_registry()
+        ).to_dict())
+        version_id = version["version_id"]
 
         logger.info(f"Model version registered: {version_id}")
         return version_id
 
     def get_model_history(self, model_name: str) -> List[Dict[str, Any]]:
         """Get version history for model"""
-        return self.versions.get(model_name, [])
+        return self.store.history(model_name)
 
     def get_version(self, version_id: str) -> Optional[Dict[str, Any]]:
         """Get specific version details"""
-        for model_versions in self.versions.values():
-            for version in model_versions:
-                if version["version_id"] == version_id:
-                    return version
-        return None
+        return self.store.get(version_id)
 
     def verify_version_integrity(self, version_id: str) -> Tuple[bool, Dict[str, Any]]:
         """Verify integrity of specific version"""
@@ -326,7 +1113,7 @@ class ModelVersioning:
 
         model_path = version["model_path"]
         is_valid, details = ModelIntegrityValidator.verify_model_integrity(
-            model_path)
+            model_path, tamper_detection=self.tamper_detection)
 
         return is_valid, {
             **details,
@@ -335,6 +1122,30 @@ class ModelVersioning:
             "file_checksum": version["checksum"]
         }
 
+    def verify_all_versions(self, workers: int = None) -> Dict[str, Dict[str, Any]]:
+        """Verify every registered version's model file concurrently"""
+        versions = [version for _, version in self.store.all_versions()]
+        by_path = ModelIntegrityValidator.verify_models(
+            [v["model_path"] for v in versions], workers=workers,
+            tamper_detection=self.tamper_detection)
+
+        return {
+            v["version_id"]: {
+                **by_path[str(v["model_path"])],
+                "version_id": v["version_id"],
+                "registered_checksum": v["checksum"]
+            }
+            for v in versions
+        }
+
+    def watch_versions(self, interval: float = 5.0,
+                       on_change: Callable[[str], None] = None) -> IntegrityWatcher:
+        """Start a watcher that invalidates cached results for every registered model"""
+        watcher = IntegrityWatcher(interval=interval, on_change=on_change)
+        for _, version in self.store.all_versions():
+            watcher.watch(version["model_path"])
+        return watcher.start()
+
     def generate_provenance_report(self, model_name: str) -> str:
         """Generate model provenance report"""
         history = self.get_model_history(model_name)
@@ -364,16 +1175,20 @@ Version ID: {version['version_id']}
 
     def get_model_lineage(self, version_id: str) -> List[str]:
         """Get full lineage/ancestry of a model version"""
-        lineage = [version_id]
-        version = self.get_version(version_id)
-
-        while version and version.get("parent_version"):
-            parent_id = version["parent_version"]
-            lineage.append(parent_id)
-            version = self.get_version(parent_id)
-
+        chain = self.store.lineage(version_id)
+        if not chain:
+            return [version_id]
+
+        lineage = [vid for vid, _ in chain]
+        # A parent that was never registered still ends the lineage
+        if chain[-1][1] and chain[-1][1] not in lineage:
+            lineage.append(chain[-1][1])
         return lineage
 
+    def get_descendants(self, version_id: str) -> List[Dict[str, Any]]:
+        """Versions registered with this version as their parent"""
+        return self.store.children(version_id)
+
 
 class TamperDetection:
     """Detects and logs model tampering attempts"""
@@ -381,6 +1196,7 @@ class TamperDetection:
     def __init__(self, log_path: str = "data/tamper_attempts.json"):
         self.log_path = Path(log_path)
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
         self.attempts = self._load_log()
 
     def _load_log(self) -> List[Dict[str, Any]]:
@@ -395,10 +1211,17 @@ class TamperDetection:
         return []
 
     def _save_log(self):
-        """Save tamper attempt log"""
+        """Save tamper attempt log (caller holds self._lock)"""
         try:
-            with open(self.log_path, "w") as f:
-                json.dump(self.attempts, f, indent=2)
+            fd, temp_path = tempfile.mkstemp(dir=self.log_path.parent,
+                                             prefix=f"{self.log_path.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self.attempts, f, indent=2)
+                os.replace(temp_path, self.log_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
         except Exception as e:
             logger.error(f"Error saving tamper log: {e}")
 
@@ -422,8 +1245,9 @@ class TamperDetection:
             "detected": True
         }
 
-        self.attempts.append(attempt)
-        self._save_log()
+        with self._lock:
+            self.attempts.append(attempt)
+            self._save_log()
 
         logger.warning(f"TAMPER ATTEMPT DETECTED: {model_path}")
         logger.warning(f"  Expected: {expected_checksum}")
@@ -473,3 +1297,72 @@ Older Attempts: {len(self.attempts) - len(recent)} detected
 """
 
         return report
+
+
+def benchmark_checksums(sizes_gb: Tuple[float, ...] = (1, 5, 20), directory: str = None,
+                        legacy: bool = True) -> List[Dict[str, Any]]:
+    """
+    Time checksum strategies on synthetic model files of the given sizes.
+
+    For each size a file is written to `directory` (default: the system temp
+    dir) and removed afterwards. Reports seconds and GB/s for the old 4 KB
+    read loop, the streaming whole-file digest, the single-pass digest plus
+    Merkle tree, full parallel Merkle verification and a one-chunk partial
+    verification. Note that files smaller than free RAM are mostly served
+    from the page cache.
+    """
+    import tempfile
+
+    service = get_checksum_service()
+    block = os.urandom(1024 * 1024)
+    results = []
+
+    for size_gb in sizes_gb:
+        fd, path = tempfile.mkstemp(suffix=".bin", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for _ in range(int(size_gb * 1024)):
+                    f.write(block)
+            gigabytes = os.path.getsize(path) / 1024 ** 3
+            timings = {}
+
+            def timed(name: str, fn: Callable[[], Any]) -> Any:
+                start = time.perf_counter()
+                value = fn()
+                timings[name] = round(time.perf_counter() - start, 3)
+                return value
+
+            if legacy:
+                def read_4k():
+                    hash_obj = hashlib.sha256()
+                    with open(path, "rb") as f:
+                        for chunk in iter(lambda: f.read(4096), b""):
+                            hash_obj.update(chunk)
+                    return hash_obj.hexdigest()
+                timed("legacy_4k", read_4k)
+            timed("file_digest", lambda: service.file_digest(path))
+            _, tree = timed("digest_with_merkle", lambda: service.digest_with_merkle(path))
+            mismatched = timed("merkle_verify_parallel", lambda: service.verify_chunks(path, tree))
+            timed("merkle_verify_one_chunk", lambda: service.verify_chunks(path, tree, [tree.chunk_count // 2]))
+
+            results.append({
+                "size_gb": round(gigabytes, 2),
+                "chunks": tree.chunk_count,
+                "workers": service.workers,
+                "verified": not mismatched,
+                "seconds": timings,
+                "gb_per_second": {k: round(gigabytes / v, 2) if v > 0 else None for k, v in timings.items()}
+            })
+        finally:
+            os.remove(path)
+
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    sizes = tuple(float(s) for s in sys.argv[1:]) or (1, 5, 20)
+    for result in benchmark_checksums(sizes):
+        print(f"{result['size_gb']} GB ({result['chunks']} chunks, {result['workers']} workers): "
+              + ", ".join(f"{k} {v}s" for k, v in result["seconds"].items()))